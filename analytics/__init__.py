@@ -2,16 +2,27 @@
 Paquete de señales y scoring.
 
     from memebot2.analytics import filters, trend, insider
+    from memebot2.analytics import exit_sweep       # barrido de TP/SL (CLI)
+    from memebot2.analytics import weight_opt       # pesos/umbral del score (CLI)
 """
 
+from __future__ import annotations
+
 from importlib import import_module
 from types import ModuleType
-from typing import Dict
-
-_modules = ("filters", "trend", "insider")
 
-globals_: Dict[str, ModuleType] = globals()
-for _m in _modules:
-    globals_[_m] = import_module(f"{__name__}.{_m}")
+_modules = ("filters", "trend", "insider", "exit_sweep", "eval_log", "weight_opt")
 
 __all__ = list(_modules)
+
+
+def __getattr__(name: str) -> ModuleType:
+    # PEP 562: el sub-módulo se importa la primera vez que se pide
+    if name in _modules:
+        mod = globals()[name] = import_module(f"{__name__}.{name}")
+        return mod
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_modules})
@@ -0,0 +1,268 @@
+# memebot2/analytics/eval_log.py
+"""
+Registro columnar de evaluaciones (señales, score, decisión).
+
+Sólo los tokens que pasan el score acaban en la tabla `tokens`; este
+registro guarda **cada** evaluación del planner, compre o no, para poder
+medir después los pesos de `rules.json` (`analytics.weight_opt`).
+
+Con EVAL_LOG=1 (apagado por defecto) `run_bot` llama a
+`record(token, score, upper, go)` tras el scoring.  Las filas se acumulan en memoria por columnas y se vuelcan
+cada EVAL_LOG_FLUSH filas (o, en `flush()`, si la más antigua lleva
+más de MAX_PENDING_S en memoria) como un segmento
+`evals-<hora>.npz` (numpy comprimido, un array por columna) en
+EVAL_LOG_DIR (vacío → DATA_DIR/evals).  Añadir = escribir un segmento
+nuevo; el fichero se renombra al terminar, así que un segmento a medias
+nunca se lee.  Retención: al arrancar y tras cada segmento se borran los
+de más de EVAL_LOG_MAX_DAYS días y, si el total pasa de EVAL_LOG_MAX_MB,
+los más viejos (`prune`).
+
+Columnas:
+
+• t (epoch), address, price_usd, score, upper (cota del planner), go.
+• Un float por campo de las reglas de score/filtros (age_days incluido).
+  Señal no consultada por el cortocircuito = NaN (en `checks` no suma,
+  como en el planner); booleanos = 0/1.
+
+    cols = eval_log.load("data/evals")      # dict columna → np.ndarray
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import datetime as _dt
+import glob
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..config import DATA_DIR, EVAL_LOG_DIR, EVAL_LOG_FLUSH, EVAL_LOG_MAX_DAYS, EVAL_LOG_MAX_MB
+from ..db.candidate import TokenCandidate
+from . import rules as _rules
+from .filters import RULES
+
+log = logging.getLogger("eval_log")
+
+# campos de reglas que se registran (orden estable)
+FIELDS: tuple[str, ...] = tuple(sorted({r.field for r in (*RULES.filters, *RULES.score)}))
+BASE = ("t", "address", "price_usd", "score", "upper", "go")
+MAX_PENDING_S = 300.0             # segmentos de como mucho ~5 min si hay poco tráfico
+
+
+def _value(v) -> float:
+    return np.nan if v is None else float(v)
+
+
+class EvalLog:
+    def __init__(
+        self,
+        directory: str | pathlib.Path,
+        flush_every: int = EVAL_LOG_FLUSH,
+        max_days: float = EVAL_LOG_MAX_DAYS,
+        max_mb: float = EVAL_LOG_MAX_MB,
+    ) -> None:
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self.max_age_s = max_days * 86_400
+        self.max_bytes = int(max_mb * 2**20)
+        self._cols: Dict[str, list] = {c: [] for c in (*BASE, *FIELDS)}
+        self._lock = threading.Lock()
+        self._flushing: Optional[asyncio.Task] = None
+        self.rows = 0
+        self.segments = 0
+
+    def __len__(self) -> int:
+        return len(self._cols["t"])
+
+    def due(self) -> bool:
+        return bool(len(self)) and time.time() - self._cols["t"][0] >= MAX_PENDING_S
+
+    def record(self, tok: TokenCandidate, score: int, upper: int, go: bool) -> None:
+        now = _dt.datetime.utcnow().replace(tzinfo=_dt.timezone.utc)
+        cols = self._cols
+        cols["t"].append(time.time())
+        cols["address"].append(tok.address)
+        cols["price_usd"].append(tok.price_usd or np.nan)
+        cols["score"].append(score)
+        cols["upper"].append(upper)
+        cols["go"].append(go)
+        for field in FIELDS:
+            if field == "age_days":
+                cols[field].append(float((now - tok.created_at).days))
+            else:
+                cols[field].append(_value(getattr(tok, field)))
+        if len(self) >= self.flush_every and self._flushing is None:
+            self._flushing = asyncio.get_running_loop().create_task(self.flush())
+
+    def _take(self) -> Dict[str, np.ndarray]:
+        batch = self._cols
+        self._cols = {c: [] for c in batch}
+        out = {
+            "t": np.array(batch["t"], dtype=np.float64),
+            "address": np.array(batch["address"], dtype="U44"),
+            "price_usd": np.array(batch["price_usd"], dtype=np.float64),
+            "score": np.array(batch["score"], dtype=np.int16),
+            "upper": np.array(batch["upper"], dtype=np.int16),
+            "go": np.array(batch["go"], dtype=bool),
+        }
+        for field in FIELDS:
+            out[field] = np.array(batch[field], dtype=np.float64)
+        return out
+
+    def _write(self, cols: Dict[str, np.ndarray]) -> pathlib.Path:
+        with self._lock:
+            path = self.directory / f"evals-{_dt.datetime.utcnow():%Y%m%d-%H%M%S-%f}.npz"
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, **cols)
+            os.replace(tmp, path)
+            self.rows += len(cols["t"])
+            self.segments += 1
+            self.prune()
+            return path
+
+    def prune(self) -> int:
+        """
+        Borra segmentos de más de `max_age_s` y, si el directorio pasa de
+        `max_bytes`, los más viejos hasta bajar del límite.  Devuelve
+        cuántos borró.
+        """
+        files = []
+        for path in self.directory.glob("evals-*.npz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort()                                    # más viejo primero
+        now, total = time.time(), sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            old = self.max_age_s and now - mtime > self.max_age_s
+            big = self.max_bytes and total > self.max_bytes
+            if not (old or big):
+                break
+            try:
+                path.unlink()
+            except OSError as e:
+                log.warning("[eval_log] no se pudo borrar %s: %s", path.name, e)
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            log.info("[eval_log] retención: %s segmentos borrados", removed)
+        return removed
+
+    async def flush(self) -> int:
+        """Escribe las filas pendientes como un segmento.  Devuelve cuántas."""
+        try:
+            if not len(self):
+                return 0
+            cols = self._take()
+            try:
+                await asyncio.to_thread(self._write, cols)
+            except OSError as e:
+                log.warning("[eval_log] no se pudo escribir: %s", e)
+                return 0
+            return len(cols["t"])
+        finally:
+            self._flushing = None
+
+    def close(self) -> None:
+        """Vuelca lo pendiente de forma síncrona (atexit)."""
+        if len(self):
+            try:
+                self._write(self._take())
+            except OSError as e:
+                log.warning("[eval_log] no se pudo escribir: %s", e)
+
+
+_log: Optional[EvalLog] = None
+
+
+def start(directory: str | pathlib.Path | None = None) -> EvalLog:
+    global _log
+    if _log is None:
+        _log = EvalLog(directory or EVAL_LOG_DIR or DATA_DIR / "evals")
+        _log.prune()
+        atexit.register(_log.close)
+        log.info("Evaluaciones en %s", _log.directory)
+    return _log
+
+
+def record(tok: TokenCandidate, score: int, upper: int, go: bool) -> None:
+    """Añade una evaluación (no-op si el registro no está arrancado)."""
+    if _log is not None:
+        _log.record(tok, score, upper, go)
+
+
+async def flush() -> int:
+    """Vuelca si toca (ver MAX_PENDING_S); lo llama el loop principal."""
+    return await _log.flush() if _log is not None and _log.due() else 0
+
+
+# ───────────────────────── lectura ─────────────────────────────
+def segments(paths: Iterable[str]) -> List[str]:
+    """Ficheros .npz de `paths` (directorios, ficheros o globs)."""
+    out = set()
+    for p in paths:
+        if os.path.isdir(p):
+            out.update(glob.glob(os.path.join(p, "evals-*.npz")))
+        else:
+            out.update(q for q in glob.glob(p) or [p] if q.endswith(".npz"))
+    return sorted(out)
+
+
+def load(*paths: str) -> Dict[str, np.ndarray]:
+    """Concatena segmentos (columnas ausentes en alguno → NaN)."""
+    parts = []
+    for path in segments(paths or (str(EVAL_LOG_DIR or DATA_DIR / "evals"),)):
+        with np.load(path) as z:
+            parts.append({k: z[k] for k in z.files})
+    if not parts:
+        return {}
+    names = list(dict.fromkeys(k for part in parts for k in part))
+    out = {}
+    for name in names:
+        arrays = []
+        for part in parts:
+            n = len(part["t"])
+            arrays.append(part[name] if name in part else np.full(n, np.nan))
+        out[name] = np.concatenate(arrays)
+    order = np.argsort(out["t"], kind="stable")
+    return {k: v[order] for k, v in out.items()}
+
+
+def checks(cols: Dict[str, np.ndarray], ruleset: _rules.RuleSet = RULES) -> np.ndarray:
+    """
+    bool[n, len(ruleset.score)]: qué reglas de score cumple cada fila,
+    igual que `ScorePlanner.score_range`: una señal externa no consultada
+    (NaN) no suma; un campo on-chain ausente toma su `default`.
+    """
+    n = len(cols["t"])
+    out = np.zeros((n, len(ruleset.score)), dtype=bool)
+    for j, r in enumerate(ruleset.score):
+        v = cols.get(r.field)
+        if v is None:
+            v = np.full(n, np.nan)
+        missing = np.isnan(v)
+        with np.errstate(invalid="ignore"):
+            hit = r.op(np.where(missing, float(r.default), v), r.value)
+        out[:, j] = hit & ~missing if r.signal else hit
+    return out
+
+
+def skipped(cols: Dict[str, np.ndarray], ruleset: _rules.RuleSet = RULES) -> Dict[str, int]:
+    """Filas en las que cada señal externa no se consultó (cuentan como fallo)."""
+    n = len(cols["t"])
+    return {
+        r.field: int(np.isnan(cols[r.field]).sum()) if r.field in cols else n
+        for r in ruleset.score if r.signal
+    }
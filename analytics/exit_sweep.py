@@ -0,0 +1,316 @@
+# memebot2/analytics/exit_sweep.py
+"""
+Barrido de parámetros de salida sobre precios grabados.
+
+Reproduce las reglas de `run_bot._should_exit` (trailing, TP, SL y
+max-holding) para cada combinación de una rejilla
+TAKE_PROFIT_PCT × STOP_LOSS_PCT × TRAILING_PCT × MAX_HOLDING_H y cada
+operación, y ordena las combinaciones por PnL.
+
+• Precios: cintas de `utils.tape` (TAPE_RECORD=1).  Cada respuesta de
+  DexScreener grabada (polls del feed, `get_pair`, listados) aporta un
+  punto (hora, precio del pool principal) por token.
+• Entradas (`--entries`): `positions` (compras reales de la BD: hora y
+  precio de compra), `shadow` (las de `shadow_positions`, opcionalmente
+  de una `--strategy`) o `first` (cada token de la cinta comprado en su
+  primer precio, para explorar sin historial de compras).
+• Simulación vectorizada: por operación, las cuatro condiciones son
+  umbrales sobre series monótonas (máximo acumulado del PnL, de -PnL, de
+  la caída desde el máximo, y la edad), así que el primer tick que
+  dispara cada valor de cada eje sale de un `searchsorted`; la salida de
+  cada combinación es el mínimo de los cuatro índices, con broadcasting
+  sobre la rejilla entera.  Sin salida antes del último precio grabado,
+  la operación se liquida a ese precio (cuenta en `exit_rate`).
+• Las operaciones se reparten por lotes en un pool de procesos; cada
+  proceso devuelve sumas parciales por combinación.
+
+    python -m memebot2.analytics.exit_sweep --tape data/tape/202405*.jsonl.gz
+        [--entries positions|shadow|first] [--strategy NOMBRE]
+        [--tp 20:300:20] [--sl 10:60:5] [--trail 5:50:5] [--hold 1,2,3,4,6,8]
+        [--workers N] [--top 20] [--sort pnl_avg_pct] [--json]
+
+Los ejes aceptan "inicio:fin:paso" (fin incluido) o una lista "a,b,c".
+La rejilla por defecto tiene 9 900 combinaciones.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as _dt
+import glob
+import gzip
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..config import exits
+from ..fetcher.pair_index import primary
+from ..utils import fastjson
+
+log = logging.getLogger("exit_sweep")
+
+AXES = ("take_profit_pct", "stop_loss_pct", "trailing_pct", "max_holding_h")
+DEFAULT_GRID = {"tp": "20:300:20", "sl": "10:60:5", "trail": "5:50:5", "hold": "1,2,3,4,6,8"}
+DEX_PATH = "/latest/dex/"
+METRICS = ("pnl_avg_pct", "pnl_sum_pct", "win_rate", "worst_pct", "exit_rate", "hold_avg_h")
+
+
+class Trade(NamedTuple):
+    address: str
+    pnl: np.ndarray                  # % sobre el precio de compra, por tick
+    age_h: np.ndarray                # horas desde la compra, por tick
+
+
+# ───────────────────────── precios grabados ────────────────────
+def _points(body: dict) -> Iterator[Tuple[str, float]]:
+    """(mint, precio) del pool principal de cada token de la respuesta."""
+    pairs = body.get("pairs") or ([body["pair"]] if body.get("pair") else [])
+    mints = {(p.get("baseToken") or {}).get("address") for p in pairs}
+    for mint in filter(None, mints):
+        best = primary(pairs, mint)
+        if best is not None and best.get("priceUsd"):
+            try:
+                yield mint, float(best["priceUsd"])
+            except ValueError:
+                continue
+
+
+def load_prices(paths: Iterable[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """mint → (segundos epoch, precios USD) ordenados por hora."""
+    series: Dict[str, List[Tuple[float, float]]] = {}
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if DEX_PATH not in line:          # sin decodificar lo ajeno
+                        continue
+                    try:
+                        rec = fastjson.loads(line)
+                        if rec.get("s") != 200 or rec.get("b64"):
+                            continue
+                        body = fastjson.loads(rec["b"])
+                    except (ValueError, KeyError):
+                        continue
+                    if not isinstance(body, dict):
+                        continue
+                    for mint, price in _points(body):
+                        series.setdefault(mint, []).append((rec["t"], price))
+            except (EOFError, gzip.BadGzipFile):
+                log.warning("[exit_sweep] %s truncada; se usa lo leído", path)
+    out = {}
+    for mint, pts in series.items():
+        arr = np.array(sorted(pts), dtype=np.float64)
+        out[mint] = (arr[:, 0], arr[:, 1])
+    return out
+
+
+# ───────────────────────── entradas ────────────────────────────
+def _epoch(ts: _dt.datetime) -> float:
+    return ts.replace(tzinfo=_dt.timezone.utc).timestamp()     # BD en UTC naive
+
+
+async def db_entries(source: str, strategy: Optional[str] = None) -> List[Tuple[str, float, float]]:
+    """[(mint, hora de compra epoch, precio de compra)] de la BD."""
+    from sqlalchemy import select
+
+    from ..db.database import SessionLocal, async_init_db
+    from ..db.models import Position, ShadowPosition
+
+    await async_init_db()
+    if source == "positions":
+        stmt = select(Position.address, Position.opened_at, Position.buy_price_usd)
+    else:
+        stmt = select(ShadowPosition.address, ShadowPosition.opened_at,
+                      ShadowPosition.buy_price_usd).distinct()
+        if strategy:
+            stmt = stmt.where(ShadowPosition.strategy == strategy)
+    async with SessionLocal() as s:
+        rows = (await s.execute(stmt)).all()
+    return [(a, _epoch(t), p) for a, t, p in rows if t is not None and p]
+
+
+def first_entries(prices: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> List[Tuple[str, float, float]]:
+    return [(mint, t[0], p[0]) for mint, (t, p) in prices.items() if p[0] > 0]
+
+
+def build_trades(
+    prices: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    entries: Iterable[Tuple[str, float, float]],
+) -> List[Trade]:
+    """Serie de PnL/edad de cada entrada con precios desde su compra."""
+    trades = []
+    for mint, opened, buy_price in entries:
+        if mint not in prices:
+            continue
+        t, p = prices[mint]
+        i = int(np.searchsorted(t, opened))
+        if i >= len(t):
+            continue
+        trades.append(Trade(
+            mint,
+            (p[i:] - buy_price) / buy_price * 100,     # igual que _should_exit
+            (t[i:] - opened) / 3600,
+        ))
+    return trades
+
+
+# ───────────────────────── simulación ──────────────────────────
+def parse_axis(spec: str) -> np.ndarray:
+    """'inicio:fin:paso' (fin incluido) o 'a,b,c'."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array(sorted({float(x) for x in spec.split(",") if x.strip()}))
+
+
+def simulate(trade: Trade, grid: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (PnL de salida, horas en posición, ¿salió por regla?) por combinación,
+    con forma (len(tp), len(sl), len(trail), len(hold)).
+    """
+    tp, sl, trail, hold = grid
+    pnl, age = trade.pnl, trade.age_h
+    highest = np.maximum.accumulate(np.maximum(pnl, 0.0))   # highest_pnl_pct arranca en 0
+    first = (
+        np.searchsorted(np.maximum.accumulate(pnl), tp),                 # pnl ≥ TP
+        np.searchsorted(np.maximum.accumulate(-pnl), sl),                # pnl ≤ -SL
+        np.searchsorted(np.maximum.accumulate(highest - pnl), trail),    # caída ≥ trailing
+        np.searchsorted(age, hold),                                      # edad ≥ max-holding
+    )
+    idx = np.minimum(
+        np.minimum(first[0][:, None, None, None], first[1][None, :, None, None]),
+        np.minimum(first[2][None, None, :, None], first[3][None, None, None, :]),
+    )
+    exited = idx < len(pnl)
+    idx = np.minimum(idx, len(pnl) - 1)
+    return pnl[idx], age[idx], exited
+
+
+def _chunk(trades: List[Trade], grid: Tuple[np.ndarray, ...]) -> Dict[str, np.ndarray]:
+    shape = tuple(len(a) for a in grid)
+    acc = {
+        "pnl": np.zeros(shape), "wins": np.zeros(shape), "exited": np.zeros(shape),
+        "hold": np.zeros(shape), "worst": np.full(shape, np.inf),
+    }
+    for trade in trades:
+        pnl, hold, exited = simulate(trade, grid)
+        acc["pnl"] += pnl
+        acc["wins"] += pnl > 0
+        acc["exited"] += exited
+        acc["hold"] += hold
+        np.minimum(acc["worst"], pnl, out=acc["worst"])
+    return acc
+
+
+def sweep(trades: List[Trade], grid: Tuple[np.ndarray, ...], workers: int = 0) -> Dict[str, np.ndarray]:
+    """Sumas por combinación de todas las operaciones (en `workers` procesos)."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(trades) < 2 * workers:
+        return _chunk(trades, grid)
+    n = workers * 4                              # lotes pequeños: reparto parejo
+    chunks = [trades[i::n] for i in range(n)]
+    total: Optional[Dict[str, np.ndarray]] = None
+    with ProcessPoolExecutor(workers) as pool:
+        for part in pool.map(_chunk, chunks, repeat(grid)):
+            if total is None:
+                total = part
+                continue
+            for k in ("pnl", "wins", "exited", "hold"):
+                total[k] += part[k]
+            np.minimum(total["worst"], part["worst"], out=total["worst"])
+    return total
+
+
+def summarize(acc: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    return {
+        "pnl_avg_pct": acc["pnl"] / n,
+        "pnl_sum_pct": acc["pnl"],
+        "win_rate": acc["wins"] / n,
+        "worst_pct": acc["worst"],
+        "exit_rate": acc["exited"] / n,
+        "hold_avg_h": acc["hold"] / n,
+    }
+
+
+def rank(table: Dict[str, np.ndarray], grid: Tuple[np.ndarray, ...], top: int, key: str) -> List[dict]:
+    order = np.argsort(-table[key], axis=None, kind="stable")[:top]
+    out = []
+    for flat in order:
+        at = np.unravel_index(flat, table[key].shape)
+        row = {axis: float(values[i]) for axis, values, i in zip(AXES, grid, at)}
+        row.update({m: round(float(table[m][at]), 3) for m in METRICS})
+        out.append(row)
+    return out
+
+
+# ───────────────────────── CLI ─────────────────────────────────
+def _print(report: dict) -> None:
+    print(f"{report['trades']} operaciones × {report['combos']} combinaciones "
+          f"en {report['elapsed_s']} s ({report['workers']} procesos)")
+    head = f"{'TP%':>6} {'SL%':>6} {'trail%':>6} {'hold h':>6}  " + " ".join(f"{m:>12}" for m in METRICS)
+    print(head)
+    rows = [("actual", report["current"])] + [("", r) for r in report["top"]]
+    for tag, r in rows:
+        print(" ".join(f"{r[a]:>6g}" for a in AXES) + "  "
+              + " ".join(f"{r[m]:>12.3f}" for m in METRICS) + (f"  ← {tag}" if tag else ""))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Barrido de TP/SL/trailing/max-holding sobre precios grabados")
+    ap.add_argument("--tape", nargs="+", required=True, help="cintas .jsonl.gz (admite globs)")
+    ap.add_argument("--entries", choices=("positions", "shadow", "first"), default="positions")
+    ap.add_argument("--strategy", default="", help="con --entries shadow: sólo esa estrategia")
+    for axis, default in DEFAULT_GRID.items():
+        ap.add_argument(f"--{axis}", default=default)
+    ap.add_argument("--workers", type=int, default=0, help="procesos (0 = nº de CPUs)")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--sort", choices=METRICS, default="pnl_avg_pct")
+    ap.add_argument("--json", action="store_true", help="salida JSON en vez de tabla")
+    args = ap.parse_args()
+
+    paths = sorted({p for pattern in args.tape for p in (glob.glob(pattern) or [pattern])})
+    t0 = time.perf_counter()
+    prices = load_prices(paths)
+    if args.entries == "first":
+        entries = first_entries(prices)
+    else:
+        entries = asyncio.run(db_entries(args.entries, args.strategy or None))
+    trades = build_trades(prices, entries)
+    if not trades:
+        raise SystemExit(f"sin operaciones con precios: {len(entries)} entradas, "
+                         f"{len(prices)} tokens en las cintas")
+    loaded = time.perf_counter() - t0
+
+    grid = tuple(parse_axis(getattr(args, axis)) for axis in DEFAULT_GRID)
+    current = tuple(np.array([float(v)]) for v in (
+        exits.TAKE_PROFIT_PCT, exits.STOP_LOSS_PCT, exits.TRAILING_PCT, exits.MAX_HOLDING_H))
+    t1 = time.perf_counter()
+    table = summarize(sweep(trades, grid, args.workers), len(trades))
+    elapsed = time.perf_counter() - t1
+
+    report = {
+        "tapes": len(paths),
+        "trades": len(trades),
+        "ticks": int(sum(len(t.pnl) for t in trades)),
+        "combos": int(np.prod([len(a) for a in grid])),
+        "workers": args.workers or os.cpu_count() or 1,
+        "load_s": round(loaded, 2),
+        "elapsed_s": round(elapsed, 2),
+        "current": rank(summarize(_chunk(trades, current), len(trades)), current, 1, args.sort)[0],
+        "top": rank(table, grid, args.top, args.sort),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print(report)
+
+
+if __name__ == "__main__":
+    main()
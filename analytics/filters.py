@@ -3,60 +3,60 @@ analytics/filters.py
 ────────────────────
 Filtrado rápido + scoreado agregado antes de disparar la compra.
 
+Umbrales y pesos salen de `config/rules.json` (ver analytics.rules),
+compilados una vez al importar este módulo.
+
 • basic_filters()  → descarta cuanto antes tokens sin mínimos básicos.
 • total_score()    → suma ponderada de varias señales para ranking final.
-• should_buy()     → azúcar sintáctico = filtros + score >= MIN_SCORE_TOTAL
+• should_buy()     → azúcar sintáctico = filtros + score >= min_score
+• batch_filter()   → filtros + score de un lote entero en una pasada.
+• ScorePlanner     → calcula el score llamando a los proveedores externos
+                     de más barato a más caro y corta en cuanto la decisión
+                     ya no puede cambiar.
 """
 
 from __future__ import annotations
 
-import datetime as _dt
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from ..db.candidate import TokenCandidate
+from . import rules as _rules
+
+log = logging.getLogger("filters")
+
+RULES: _rules.RuleSet = _rules.load_rules()
+
+# señal externa → (peso, condición sobre el valor, valor por defecto si falta)
+SIGNAL_WEIGHTS: Dict[str, tuple[int, Callable[[Any], bool], Any]] = {
+    r.field: (r.weight, r.check, r.default) for r in RULES.score if r.signal
+}
 
-from ..config import (           # ← import directo gracias a __init__.py
-    MAX_AGE_DAYS,
-    MIN_HOLDERS,
-    MIN_LIQUIDITY_USD,
-    MIN_VOL_USD_24H,
-    MAX_24H_VOLUME,
-    MIN_SCORE_TOTAL,
-)
 
 # --------------------------------------------------------------------------- #
-def basic_filters(token: dict) -> bool:
+def basic_filters(token: TokenCandidate) -> bool:
     """
     Comprueba requisitos **mínimos** antes de rug-check, helius, etc.
 
-    token debe contener como mínimo:
-        • created_at   (datetime, tz-aware)
-        • holders      (int)
-        • liquidity    (float USD)
-        • vol24h       (float USD)
+    Usa de `token`: created_at (datetime, tz-aware), holders,
+    liquidity y vol24h (USD).
     """
-    # 1) antigüedad
-    age_days = (
-        _dt.datetime.utcnow().replace(tzinfo=_dt.timezone.utc)
-        - token["created_at"]
-    ).days
-    if age_days > MAX_AGE_DAYS:
-        return False
+    return _rules.passes(RULES, token)
 
-    # 2) liquidez + volumen
-    if token.get("liquidity", 0) < MIN_LIQUIDITY_USD:
-        return False
-    if token["vol24h"] < MIN_VOL_USD_24H or token["vol24h"] > MAX_24H_VOLUME:
-        return False
 
-    # 3) distribución mínima de holders
-    if token["holders"] < MIN_HOLDERS:
-        return False
-
-    return True
+def rejection_reason(token: TokenCandidate) -> tuple[str, bool] | None:
+    """(motivo, definitivo?) del primer filtro básico que falla, o None."""
+    rule = _rules.first_failure(RULES, token)
+    if rule is None:
+        return None
+    return rule.field, rule.hard
 
 
 # --------------------------------------------------------------------------- #
-def total_score(tok: dict) -> int:
+def total_score(tok: TokenCandidate) -> int:
     """
-    Suma ponderada de señales. Ajusta pesos a tu gusto:
+    Suma ponderada de señales (sección "score" de rules.json):
 
         – Métricas on-chain (liquidez, volumen, holders)
         – RugCheck score
@@ -64,23 +64,129 @@ def total_score(tok: dict) -> int:
         – Socials presentes
         – Ausencia de alertas de insiders
     """
-    score = 0
+    return _rules.score(RULES, tok)
+
+
+def onchain_score(tok: TokenCandidate) -> int:
+    """Parte del score que no requiere llamadas externas."""
+    return _rules.score(RULES, tok, signals=False)
 
-    # ——— on-chain básicos ———
-    score += 15 if tok.get("liquidity", 0) >= MIN_LIQUIDITY_USD * 2 else 0
-    score += 20 if tok["vol24h"] >= MIN_VOL_USD_24H * 3 else 0
-    score += 10 if tok["holders"] >= MIN_HOLDERS * 2 else 0
 
-    # ——— riesgo & señales ———
-    score += 15 if tok.get("rug_score", 0) >= 70 else 0
-    score += 15 if not tok.get("cluster_bad", False) else 0
-    score += 10 if tok.get("social_ok", False) else 0
-    score += 10 if not tok.get("insider_sig", False) else 0
+# --------------------------------------------------------------------------- #
+def should_buy(tok: TokenCandidate) -> bool:
+    """True si pasa basic_filters y score ≥ min_score."""
+    return basic_filters(tok) and total_score(tok) >= RULES.min_score
+
 
-    return score
+def batch_filter(tokens: list[TokenCandidate]) -> tuple[Any, Any]:
+    """(máscara de basic_filters, score on-chain+defaults) para todo el lote."""
+    return _rules.evaluate_batch(RULES, tokens)
 
 
 # --------------------------------------------------------------------------- #
-def should_buy(tok: dict) -> bool:
-    """True si pasa basic_filters y score ≥ MIN_SCORE_TOTAL."""
-    return basic_filters(tok) and total_score(tok) >= MIN_SCORE_TOTAL
+# precio relativo por llamada (APIs de pago pesan más que las públicas)
+SIGNAL_PRICE: Dict[str, float] = {
+    "rug_score": 3.0,
+    "cluster_bad": 3.0,
+    "social_ok": 1.0,
+    "insider_sig": 1.0,
+}
+EWMA_ALPHA = 0.2
+
+
+class ScorePlanner:
+    """
+    Score con cortocircuito según coste.
+
+    `providers` mapea cada señal de SIGNAL_WEIGHTS a `async f(address)`.
+    Se ejecutan ordenadas por coste esperado por punto de score
+    (latencia observada EWMA × SIGNAL_PRICE / peso) y se paran en cuanto:
+
+    • score + pesos restantes < umbral   → descarte seguro, o
+    • score actual ≥ umbral              → compra segura.
+
+    Las señales no ejecutadas no se escriben en `tok`; el score devuelto
+    es el acumulado de lo que sí se ejecutó.  `score_range` devuelve
+    además la cota superior (score + pesos no consultados).
+
+    `resolve(*umbrales)` añade umbrales secundarios (estrategias en
+    sombra): el corte sólo se hace cuando la decisión está tomada para
+    todos ellos.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Callable[[str], Awaitable[Any]]],
+        threshold: int | None = None,
+    ) -> None:
+        self.providers = {k: p for k, p in providers.items() if k in SIGNAL_WEIGHTS}
+        threshold = RULES.min_score if threshold is None else threshold
+        self.threshold = threshold
+        self.thresholds: tuple[int, ...] = (threshold,)
+        self.latency: Dict[str, float] = {k: 0.5 for k in self.providers}
+        self.stats: Dict[str, Dict[str, int]] = {
+            k: {"calls": 0, "skipped": 0, "errors": 0} for k in self.providers
+        }
+
+    def _order(self) -> list[str]:
+        def cost_per_point(k: str) -> float:
+            w = SIGNAL_WEIGHTS[k][0] or 1
+            return self.latency[k] * SIGNAL_PRICE.get(k, 1.0) / w
+        return sorted(self.providers, key=cost_per_point)
+
+    def resolve(self, *thresholds: int) -> None:
+        self.thresholds = tuple(sorted({self.threshold, *thresholds}))
+
+    def _decided(self, score: int, remaining: int) -> bool:
+        # para cada umbral: score ≥ umbral o score + restantes < umbral
+        return not any(score < th <= score + remaining for th in self.thresholds)
+
+    async def evaluate(self, tok: TokenCandidate) -> tuple[int, bool]:
+        """Devuelve (score, compra?) rellenando en `tok` las señales usadas."""
+        score, _ = await self.score_range(tok)
+        return score, score >= self.threshold
+
+    async def score_range(self, tok: TokenCandidate) -> tuple[int, int]:
+        """(score, cota superior) — iguales si se consultaron todas las señales."""
+        score = onchain_score(tok)
+        pending = self._order()
+        remaining = sum(SIGNAL_WEIGHTS[k][0] for k in pending)
+
+        while pending:
+            if self._decided(score, remaining):
+                for k in pending:
+                    self.stats[k]["skipped"] += 1
+                break
+            key = pending.pop(0)
+            weight, ok, _ = SIGNAL_WEIGHTS[key]
+            remaining -= weight
+
+            t0 = time.monotonic()
+            try:
+                value = await self.providers[key](tok.address)
+            except Exception as e:
+                self.stats[key]["errors"] += 1
+                log.debug("[planner] %s %s: %s", key, tok.address[:4], e)
+                continue
+            finally:
+                elapsed = time.monotonic() - t0
+                self.latency[key] += EWMA_ALPHA * (elapsed - self.latency[key])
+                self.stats[key]["calls"] += 1
+
+            setattr(tok, key, value)
+            if ok(value):
+                score += weight
+
+        return score, score + sum(SIGNAL_WEIGHTS[k][0] for k in pending)
+
+    def report(self) -> Dict[str, dict]:
+        """Llamadas hechas/ahorradas por señal y latencia media (ms)."""
+        out = {}
+        for k, st in self.stats.items():
+            total = st["calls"] + st["skipped"]
+            out[k] = {
+                **st,
+                "saved_pct": round(100 * st["skipped"] / total, 1) if total else 0.0,
+                "latency_ms": round(self.latency[k] * 1000, 1),
+            }
+        return out
@@ -1,52 +1,200 @@
 """
 analytics/insider.py
 ────────────────────
-Detección simplificada de actividad de insiders:
+Detección de actividad de insiders en tokens recién lanzados:
 
-• Marca como *alerta* (True) si en los primeros 20 min después del mint
-  hay ≥3 compras individuales mayores al 3 % de la liquidez inicial.
+• Marca como *alerta* (True) si, dentro de los primeros WINDOW_MINUTES
+  desde la primera operación vista, hay ≥ MIN_BIG_BUYS compras mayores
+  que BIG_BUY_PCT de la liquidez en una ventana deslizante de BIG_BUY_WINDOW_S.
 
-Fuente de datos: DexScreener `txns` 5 min + liquidez.
-(Es un heurístico, no exhaustivo).
+Fuente de datos: un stream de swaps enchufable (`TxSource`):
 
-Si no se puede obtener la info ⇒ devuelve False (sin alerta).
+    INSIDER_SOURCE=pumpfun          → TradeEvent del stream de Pump Fun
+    INSIDER_SOURCE=replay:fich.jsonl → reproducción local (SwapEvent por línea)
+
+`run(source)` consume los eventos en `detector` (O(1) amortizado por
+evento: deque por token con las compras grandes dentro de la ventana).
+`insider_alert()` es sólo una consulta en memoria: sin datos ⇒ False
+(sin alerta), igual que antes.
 """
 
 from __future__ import annotations
 
-import datetime as _dt
+import asyncio
+import json
 import logging
-from typing import Final
+import pathlib
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Final, NamedTuple, Optional
 
-from ..fetcher import dexscreener
+from ..config import INSIDER_SOURCE
+from ..config import config as _cfg
 
 log = logging.getLogger("insider")
 
 WINDOW_MINUTES: Final[int] = 20
 BIG_BUY_PCT: Final[float] = 0.03   # 3 % de la liquidez
+BIG_BUY_WINDOW_S: Final[int] = 300
+MIN_BIG_BUYS: Final[int] = 3
+MAX_TOKENS: Final[int] = 20_000    # tokens con ventana en memoria (LRU)
+
+
+class SwapEvent(NamedTuple):
+    mint: str
+    ts: float              # epoch s
+    is_buy: bool
+    amount: float          # tamaño del swap …
+    liquidity: float       # … y liquidez del pool, en la misma unidad
+    trader: str = ""
+
+
+class _Window:
+    __slots__ = ("first_ts", "big_buys", "alerted")
+
+    def __init__(self, ts: float) -> None:
+        self.first_ts = ts
+        self.big_buys: deque[float] = deque()
+        self.alerted = False
+
+
+class InsiderDetector:
+    """Contadores por token de compras grandes en ventana deslizante."""
+
+    def __init__(
+        self,
+        young_s: float = WINDOW_MINUTES * 60,
+        window_s: float = BIG_BUY_WINDOW_S,
+        big_buy_pct: float = BIG_BUY_PCT,
+        min_big_buys: int = MIN_BIG_BUYS,
+        max_tokens: int = MAX_TOKENS,
+    ) -> None:
+        self.young_s = young_s
+        self.window_s = window_s
+        self.big_buy_pct = big_buy_pct
+        self.min_big_buys = min_big_buys
+        self.max_tokens = max_tokens
+        self._tokens: "OrderedDict[str, _Window]" = OrderedDict()
+        self.stats = {"events": 0, "big_buys": 0, "old": 0, "alerts": 0}
+
+    def on_event(self, ev: SwapEvent) -> None:
+        self.stats["events"] += 1
+        w = self._tokens.get(ev.mint)
+        if w is None:
+            w = self._tokens[ev.mint] = _Window(ev.ts)
+            if len(self._tokens) > self.max_tokens:
+                self._tokens.popitem(last=False)
+        if ev.ts - w.first_ts > self.young_s:
+            self.stats["old"] += 1
+            return
+        if not ev.is_buy or ev.liquidity <= 0 or ev.amount < ev.liquidity * self.big_buy_pct:
+            return
+
+        self.stats["big_buys"] += 1
+        buys = w.big_buys
+        buys.append(ev.ts)
+        while buys and buys[0] <= ev.ts - self.window_s:
+            buys.popleft()
+        if len(buys) >= self.min_big_buys and not w.alerted:
+            w.alerted = True
+            self.stats["alerts"] += 1
+            log.debug("[insider] ALERT %s  big_buys=%s/%ss", ev.mint[:4], len(buys), self.window_s)
+
+    def alert(self, mint: str) -> bool:
+        w = self._tokens.get(mint)
+        return w is not None and w.alerted
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+# ───────────────────────── fuentes de swaps ────────────────────
+class TxSource:
+    """Fuente de `SwapEvent`s; las implementaciones definen `events()`."""
+
+    name = "base"
+
+    def events(self) -> AsyncIterator[SwapEvent]:
+        raise NotImplementedError
+
+
+class ReplaySource(TxSource):
+    """
+    Reproduce un JSONL de SwapEvent (un objeto por línea con sus campos).
+    `speed`=0 → sin esperas; 1 → ritmo original; 10 → 10× más rápido.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str | pathlib.Path, speed: float = 0.0) -> None:
+        self.path = pathlib.Path(path)
+        if not self.path.is_absolute():
+            self.path = _cfg.ROOT_DIR / self.path
+        self.speed = speed
+
+    async def events(self) -> AsyncIterator[SwapEvent]:
+        prev: Optional[float] = None
+        with self.path.open() as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                ev = SwapEvent(**json.loads(line))
+                if self.speed > 0 and prev is not None and ev.ts > prev:
+                    await asyncio.sleep((ev.ts - prev) / self.speed)
+                prev = ev.ts
+                yield ev
+
+
+class PumpFunTradeSource(TxSource):
+    """TradeEvent de `fetcher.pumpfun` (liquidez = reservas SOL de la curva)."""
+
+    name = "pumpfun"
+    QUEUE_MAX = 10_000
+
+    async def events(self) -> AsyncIterator[SwapEvent]:
+        from ..fetcher import pumpfun
+
+        queue: asyncio.Queue = asyncio.Queue(self.QUEUE_MAX)
+
+        def _on_trade(t: dict) -> None:
+            sol = t["sol_amount"]
+            before = t["virtual_sol_reserves"] - (sol if t["is_buy"] else -sol)
+            try:
+                queue.put_nowait(SwapEvent(t["mint"], t["ts"], t["is_buy"], sol, before, t["user"]))
+            except asyncio.QueueFull:
+                pass
+
+        ingest = pumpfun.stream()
+        ingest.on_trade = _on_trade
+        await ingest.start()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            ingest.on_trade = None
+
+
+def make_tx_source(spec: str = INSIDER_SOURCE) -> Optional[TxSource]:
+    """"pumpfun" | "replay:<ruta>[@velocidad]" | "off" (sin fuente)."""
+    kind, _, arg = spec.partition(":")
+    if kind == "pumpfun":
+        return PumpFunTradeSource()
+    if kind == "replay" and arg:
+        path, _, speed = arg.partition("@")
+        return ReplaySource(path, float(speed or 0))
+    if kind not in ("", "off"):
+        log.warning("[insider] INSIDER_SOURCE desconocida: %s", spec)
+    return None
+
+
+detector = InsiderDetector()
+
+
+async def run(source: TxSource, det: InsiderDetector = detector) -> None:
+    """Vuelca los swaps de `source` en el detector."""
+    log.info("[insider] fuente de swaps: %s", source.name)
+    async for ev in source.events():
+        det.on_event(ev)
 
 
 async def insider_alert(address: str) -> bool:
-    tok = await dexscreener.get_pair(address)
-    if not tok:
-        return False
-
-    # DexScreener no da log completo vía API pública
-    # así que simplificamos: usamos txns["last5m"]["buys"] como proxy
-    # y comprobamos si la métrica es desproporcionada justo tras el mint.
-    created = tok["created_at"]
-    age_min = (_dt.datetime.utcnow().replace(tzinfo=_dt.timezone.utc) - created).total_seconds() / 60
-    if age_min > WINDOW_MINUTES:
-        return False
-
-    try:
-        buys_5m = tok["txns_last_5min"] = tok.get("txns_last_5min") or 0  # de DexScreener chart endpoint no público
-    except KeyError:
-        return False
-
-    # Heurística: si hay más de 3 grandes compras en 5 min, alerta
-    threshold = max(3, int(tok["liquidity"] * BIG_BUY_PCT // 1))
-    alert = buys_5m >= threshold
-    if alert:
-        log.debug("[insider] ALERT %s  buys5m=%s thr=%s", address[:4], buys_5m, threshold)
-    return alert
+    return detector.alert(address)
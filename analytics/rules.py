@@ -0,0 +1,189 @@
+"""
+analytics/rules.py
+──────────────────
+Motor de reglas declarativo para filtros y score.
+
+• Las reglas viven en `config/rules.json` (o RULES_FILE): umbrales y pesos
+  se cambian sin tocar código.
+• `load_rules()` las compila **una vez**: cada regla queda como
+  (campo, operador, umbral, peso, default) con las referencias a config
+  ("MIN_HOLDERS*2") ya resueltas.
+• Evaluación escalar (`passes`, `score`) para un token suelto y por lotes
+  (`evaluate_batch`) sobre columnas numpy → (máscara, vector de score) en
+  una sola pasada.  numpy se importa sólo al usar el camino por lotes.
+
+Los tokens son `db.candidate.TokenCandidate`: cada `field` de una regla
+debe ser un atributo suyo (se comprueba al cargar → un typo en rules.json
+es un error de arranque, no un filtro que nunca salta).  Un atributo a
+None (señal sin calcular) toma el `default` de la regla.
+
+Campo derivado: `age_days` = días completos desde `created_at`.
+`"hard": true` marca filtros cuyo fallo es definitivo (p.ej. antigüedad).
+Los pesos de score son ≥ 0 (el cortocircuito de `ScorePlanner` lo asume).
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import operator
+import pathlib
+from typing import Any, Callable, Iterable, NamedTuple
+
+from ..config import RULES_FILE
+from ..config import config as _cfg
+from ..db.candidate import FIELDS as _FIELDS
+from ..db.candidate import TokenCandidate
+
+DERIVED = frozenset({"age_days"})
+
+OPS: dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class Rule(NamedTuple):
+    field: str
+    op: Callable[[Any, Any], Any]
+    value: Any
+    weight: int
+    default: Any
+    signal: bool            # requiere llamada externa (ScorePlanner)
+    hard: bool              # fallo definitivo: no merece re-evaluación
+
+    def check(self, v: Any) -> bool:
+        return bool(self.op(v, self.value))
+
+
+class RuleSet(NamedTuple):
+    filters: tuple[Rule, ...]
+    score: tuple[Rule, ...]
+    min_score: int
+
+
+# ───────────────────────── compilación ─────────────────────────
+def _resolve(v: Any) -> Any:
+    """Número/bool literal o referencia "NOMBRE[*factor]" a config."""
+    if not isinstance(v, str):
+        return v
+    name, _, factor = v.partition("*")
+    base = getattr(_cfg, name.strip())
+    return base * float(factor) if factor else base
+
+
+def _compile(raw: dict, *, scored: bool) -> Rule:
+    if raw["field"] not in _FIELDS | DERIVED:
+        raise ValueError(f"campo desconocido en regla: {raw['field']!r}")
+    weight = int(raw.get("weight", 0)) if scored else 0
+    if weight < 0:
+        # ScorePlanner acota el score con la suma de pesos pendientes
+        raise ValueError(f"peso negativo en regla {raw['field']!r}: {weight}")
+    return Rule(
+        field=raw["field"],
+        op=OPS[raw["op"]],
+        value=_resolve(raw["value"]),
+        weight=weight,
+        default=raw.get("default", 0),
+        signal=bool(raw.get("signal", False)),
+        hard=bool(raw.get("hard", False)),
+    )
+
+
+def load_rules(path: str | pathlib.Path = RULES_FILE) -> RuleSet:
+    path = pathlib.Path(path)
+    if not path.is_absolute():
+        path = _cfg.ROOT_DIR / path
+    try:
+        raw = json.loads(path.read_text())
+        return RuleSet(
+            filters=tuple(_compile(r, scored=False) for r in raw.get("filters", ())),
+            score=tuple(_compile(r, scored=True) for r in raw.get("score", ())),
+            min_score=int(_resolve(raw.get("min_score", "MIN_SCORE_TOTAL"))),
+        )
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"No se pudo leer reglas {path}: {e}") from e
+
+
+# ───────────────────────── evaluación escalar ──────────────────
+def _utcnow() -> _dt.datetime:
+    return _dt.datetime.utcnow().replace(tzinfo=_dt.timezone.utc)
+
+
+def _get(tok: TokenCandidate, rule: Rule, now: _dt.datetime) -> Any:
+    if rule.field == "age_days":
+        return (now - tok.created_at).days
+    v = getattr(tok, rule.field)
+    return rule.default if v is None else v
+
+
+def passes(rules: RuleSet, tok: TokenCandidate) -> bool:
+    now = _utcnow()
+    return all(r.check(_get(tok, r, now)) for r in rules.filters)
+
+
+def first_failure(rules: RuleSet, tok: TokenCandidate) -> Rule | None:
+    """Primer filtro que `tok` no cumple (None si pasa todos)."""
+    now = _utcnow()
+    return next((r for r in rules.filters if not r.check(_get(tok, r, now))), None)
+
+
+def score(rules: RuleSet, tok: TokenCandidate, *, signals: bool = True) -> int:
+    now = _utcnow()
+    return sum(
+        r.weight for r in rules.score
+        if (signals or not r.signal) and r.check(_get(tok, r, now))
+    )
+
+
+# ───────────────────────── evaluación por lotes ────────────────
+def columns(tokens: Iterable[TokenCandidate], fields: Iterable[tuple[str, Any]]) -> dict:
+    """
+    Tokens + [(campo, default)] → dict (campo, default) → np.ndarray.
+
+    Una columna por pareja: dos reglas sobre el mismo campo con distinto
+    `default` ven cada una el suyo.
+    """
+    import numpy as np
+
+    tokens = list(tokens)
+    now = _utcnow().timestamp()
+    cols: dict[str, Any] = {}
+    for field, default in fields:
+        if field == "age_days":
+            created = np.fromiter(
+                (t.created_at.timestamp() for t in tokens), float, len(tokens)
+            )
+            cols[field, default] = np.floor((now - created) / 86_400)
+        else:
+            get = operator.attrgetter(field)
+            cols[field, default] = np.array([
+                default if (v := get(t)) is None else v for t in tokens
+            ])
+    return cols
+
+
+def evaluate_batch(rules: RuleSet, tokens: list[TokenCandidate]) -> tuple[Any, Any]:
+    """
+    Evalúa filtros y score de todo el lote en una pasada vectorizada.
+
+    Devuelve (mask: bool[n], scores: int[n]).  Las señales externas que
+    falten en los tokens toman su `default`.
+    """
+    import numpy as np
+
+    n = len(tokens)
+    wanted = dict.fromkeys((r.field, r.default) for r in (*rules.filters, *rules.score))
+    cols = columns(tokens, wanted)
+
+    mask = np.ones(n, dtype=bool)
+    for r in rules.filters:
+        mask &= r.op(cols[r.field, r.default], r.value)
+    scores = np.zeros(n, dtype=np.int64)
+    for r in rules.score:
+        scores += r.weight * r.op(cols[r.field, r.default], r.value)
+    return mask, scores
@@ -23,6 +23,7 @@ import aiohttp
 import tenacity
 
 from ..config import DEX_API_BASE
+from ..utils import fastjson
 
 log = logging.getLogger("trend")
 
@@ -60,7 +61,7 @@ async def _prices(address: str) -> list[float]:
         async with s.get(url) as r:
             if r.status != 200:
                 raise RuntimeError(f"Status {r.status}")
-            data = await r.json()
+            data = await fastjson.read_json(r)
 
     # `data` es lista de dicts con "close"
     return [float(c["close"]) for c in data if c.get("close")]
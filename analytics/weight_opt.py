@@ -0,0 +1,253 @@
+# memebot2/analytics/weight_opt.py
+"""
+Optimizador de pesos y umbral del score sobre evaluaciones registradas.
+
+Une el registro de `analytics.eval_log` (EVAL_LOG=1) con lo que pasó
+después con el precio y busca en el espacio pesos × umbral de las reglas
+de score de `rules.json`:
+
+• Resultado de cada token: su primera evaluación se trata como una
+  compra a `price_usd` y se le aplican las salidas actuales
+  (config/exits.py, mismas reglas que `run_bot._should_exit`, vía
+  `analytics.exit_sweep`) sobre los precios posteriores: cintas de
+  `utils.tape` más los precios de las re-evaluaciones del propio
+  registro.  Es "buena compra" si el PnL supera --min-pnl.  Tokens sin
+  precios posteriores quedan fuera (se cuentan en `unlabeled`).
+• Qué reglas cumple cada fila: las de `rules.json` (operadores y valores
+  fijos).  Una señal que el cortocircuito no consultó no suma, igual que
+  en `ScorePlanner`: otra configuración de pesos podría haberla pedido,
+  así que sin --complete-only (sólo filas con todas las señales) las
+  configuraciones distintas de la actual salen pesimistas para esas
+  filas.  El informe dice cuántas filas tenía cada señal sin consultar.
+• Búsqueda: --samples combinaciones aleatorias de pesos (cada uno en
+  --weights) más la configuración actual, contra todos los umbrales de
+  --thresholds.  Score = matriz reglas×filas · pesos, en lotes repartidos
+  en un pool de procesos.
+
+Por configuración: precisión y recall de la decisión de compra, F1,
+compras y PnL medio de lo comprado.
+
+    python -m memebot2.analytics.weight_opt --tape data/tape/*.jsonl.gz
+        [--evals data/evals] [--weights 0:30:5] [--thresholds 0:100:5]
+        [--samples 20000] [--min-pnl 0] [--min-buys 10] [--sort f1]
+        [--workers N] [--top 15] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ..config import exits
+from . import eval_log
+from .exit_sweep import build_trades, load_prices, parse_axis, simulate
+from .filters import RULES
+
+SORTS = ("f1", "precision", "recall", "pnl_avg_pct")
+CELLS = 20_000_000                   # filas × pesos × umbrales por lote (memoria)
+
+
+# ───────────────────────── resultados ──────────────────────────
+def outcomes(
+    cols: Dict[str, np.ndarray], tapes: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (índice de la primera evaluación de cada token con resultado, PnL %)
+    aplicando las salidas actuales desde esa evaluación.
+    """
+    prices = load_prices(tapes)
+    # las re-evaluaciones también son puntos de precio
+    ok = ~np.isnan(cols["price_usd"])
+    extra: Dict[str, list] = {}
+    for addr, t, p in zip(cols["address"][ok], cols["t"][ok], cols["price_usd"][ok]):
+        extra.setdefault(str(addr), []).append((t, p))
+    for addr, pts in extra.items():
+        if addr in prices:
+            pts = pts + list(zip(*prices[addr]))
+        arr = np.array(sorted(pts), dtype=np.float64)
+        prices[addr] = (arr[:, 0], arr[:, 1])
+
+    _, first = np.unique(cols["address"], return_index=True)
+    first = first[ok[first]]
+    entries = [(str(cols["address"][i]), cols["t"][i], cols["price_usd"][i]) for i in first]
+    row_of = {addr: i for (addr, _, _), i in zip(entries, first)}
+    current = tuple(np.array([float(v)]) for v in (
+        exits.TAKE_PROFIT_PCT, exits.STOP_LOSS_PCT, exits.TRAILING_PCT, exits.MAX_HOLDING_H))
+
+    rows, pnl = [], []
+    for trade in build_trades(prices, entries):
+        if len(trade.pnl) < 2:                  # sólo el propio precio de entrada
+            continue
+        exit_pnl, _, _ = simulate(trade, current)
+        rows.append(row_of[trade.address])
+        pnl.append(float(exit_pnl.ravel()[0]))
+    return np.array(rows, dtype=np.int64), np.array(pnl)
+
+
+# ───────────────────────── búsqueda ────────────────────────────
+def _chunk(
+    checks: np.ndarray, good: np.ndarray, pnl: np.ndarray,
+    weights: np.ndarray, thresholds: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Conteos por (pesos, umbral) para un lote de configuraciones."""
+    scores = checks.astype(np.int32) @ weights.T.astype(np.int32)          # filas × pesos
+    buy = scores[:, :, None] >= thresholds[None, None, :]                  # filas × pesos × umbrales
+    return {
+        "buys": buy.sum(axis=0),
+        "hits": np.einsum("nbt,n->bt", buy, good.astype(np.int32)),
+        "pnl": np.einsum("nbt,n->bt", buy, pnl),
+    }
+
+
+def search(
+    checks: np.ndarray, good: np.ndarray, pnl: np.ndarray,
+    weights: np.ndarray, thresholds: np.ndarray, workers: int = 0,
+) -> Dict[str, np.ndarray]:
+    """Conteos (configuraciones × umbrales) repartidos en `workers` procesos."""
+    workers = workers or os.cpu_count() or 1
+    size = max(1, CELLS // max(1, len(checks) * len(thresholds)))
+    batches = [weights[i:i + size] for i in range(0, len(weights), size)]
+    args = (repeat(checks), repeat(good), repeat(pnl), batches, repeat(thresholds))
+    if workers == 1 or len(batches) == 1:
+        parts = list(map(_chunk, *args))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_chunk, *args))
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def score_table(counts: Dict[str, np.ndarray], positives: int) -> Dict[str, np.ndarray]:
+    buys, hits = counts["buys"], counts["hits"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(buys > 0, hits / buys, 0.0)
+        recall = hits / positives if positives else np.zeros_like(precision)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        pnl_avg = np.where(buys > 0, counts["pnl"] / buys, 0.0)
+    return {"precision": precision, "recall": recall, "f1": f1,
+            "pnl_avg_pct": pnl_avg, "buys": buys}
+
+
+def rank(
+    table: Dict[str, np.ndarray], weights: np.ndarray, thresholds: np.ndarray,
+    key: str, top: int, min_buys: int,
+) -> List[dict]:
+    value = np.where(table["buys"] >= min_buys, table[key], -np.inf)
+    order = np.argsort(-value, axis=None, kind="stable")[:top]
+    out = []
+    for flat in order:
+        b, t = np.unravel_index(flat, value.shape)
+        if not np.isfinite(value[b, t]):
+            break
+        out.append(_row(table, weights, thresholds, b, t))
+    return out
+
+
+def _row(table, weights, thresholds, b: int, t: int) -> dict:
+    return {
+        "weights": {r.field: int(w) for r, w in zip(RULES.score, weights[b])},
+        "min_score": int(thresholds[t]),
+        "precision": round(float(table["precision"][b, t]), 3),
+        "recall": round(float(table["recall"][b, t]), 3),
+        "f1": round(float(table["f1"][b, t]), 3),
+        "buys": int(table["buys"][b, t]),
+        "pnl_avg_pct": round(float(table["pnl_avg_pct"][b, t]), 2),
+    }
+
+
+# ───────────────────────── CLI ─────────────────────────────────
+def _print(report: dict) -> None:
+    print(f"{report['labeled']} tokens con resultado ({report['positives']} buenas compras, "
+          f"{report['unlabeled']} sin precios); {report['configs']} pesos × "
+          f"{report['thresholds']} umbrales en {report['elapsed_s']} s")
+    skipped = {k: v for k, v in report["skipped_signals"].items() if v}
+    if skipped:
+        print("señales no consultadas (cuentan como fallo): "
+              + ", ".join(f"{k}={v}/{report['labeled']}" for k, v in skipped.items()))
+    fields = [r.field for r in RULES.score]
+    print(" ".join(f"{f[:8]:>8}" for f in fields)
+          + f" {'umbral':>6} {'precis.':>7} {'recall':>6} {'f1':>6} {'compras':>7} {'pnl x̄%':>7}")
+    rows = [("actual", report["current"])] + [("", r) for r in report["top"]]
+    for tag, r in rows:
+        print(" ".join(f"{r['weights'][f]:>8}" for f in fields)
+              + f" {r['min_score']:>6} {r['precision']:>7.3f} {r['recall']:>6.3f} {r['f1']:>6.3f}"
+              + f" {r['buys']:>7} {r['pnl_avg_pct']:>7.1f}" + (f"  ← {tag}" if tag else ""))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Optimiza pesos/umbral del score con evaluaciones registradas")
+    ap.add_argument("--evals", nargs="*", default=[], help="segmentos o directorio (def. EVAL_LOG_DIR)")
+    ap.add_argument("--tape", nargs="*", default=[], help="cintas .jsonl.gz con precios (admite globs)")
+    ap.add_argument("--weights", default="0:30:5", help="valores de cada peso")
+    ap.add_argument("--thresholds", default="0:100:5")
+    ap.add_argument("--samples", type=int, default=20_000, help="combinaciones de pesos aleatorias")
+    ap.add_argument("--min-pnl", type=float, default=0.0, help="PnL %% mínimo de una buena compra")
+    ap.add_argument("--min-buys", type=int, default=10, help="descarta configuraciones con menos compras")
+    ap.add_argument("--complete-only", action="store_true", help="sólo filas con todas las señales")
+    ap.add_argument("--sort", choices=SORTS, default="f1")
+    ap.add_argument("--workers", type=int, default=0, help="procesos (0 = nº de CPUs)")
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="salida JSON en vez de tabla")
+    args = ap.parse_args()
+    values = parse_axis(args.weights).astype(np.int64)
+    if (values < 0).any():
+        raise SystemExit("--weights: los pesos deben ser ≥ 0 (ver analytics.rules)")
+
+    cols = eval_log.load(*args.evals)
+    if not cols:
+        raise SystemExit("sin evaluaciones registradas (EVAL_LOG=1)")
+    if args.complete_only:
+        signals = [r.field for r in RULES.score if r.signal and r.field in cols]
+        keep = ~np.isnan(np.column_stack([cols[f] for f in signals])).any(axis=1)
+        cols = {k: v[keep] for k, v in cols.items()}
+    tapes = sorted({p for pattern in args.tape for p in (glob.glob(pattern) or [pattern])})
+    rows, pnl = outcomes(cols, tapes)
+    tokens = len(np.unique(cols["address"]))
+    if not len(rows):
+        raise SystemExit(f"ningún token con precios posteriores ({tokens} evaluados)")
+    labeled = {k: v[rows] for k, v in cols.items()}
+    checks = eval_log.checks(labeled)
+    good = pnl > args.min_pnl
+
+    current = np.array([[r.weight for r in RULES.score]], dtype=np.int64)
+    rng = np.random.default_rng(args.seed)
+    sampled = rng.choice(values, size=(args.samples, len(RULES.score)))
+    weights = np.unique(np.vstack([current, sampled]), axis=0)
+    cur = int(np.flatnonzero((weights == current).all(axis=1))[0])
+    thresholds = parse_axis(args.thresholds).astype(np.int64)
+    if RULES.min_score not in thresholds:
+        thresholds = np.sort(np.append(thresholds, RULES.min_score))
+
+    t0 = time.perf_counter()
+    table = score_table(search(checks, good, pnl, weights, thresholds, args.workers), int(good.sum()))
+    elapsed = time.perf_counter() - t0
+
+    report = {
+        "evaluations": len(cols["t"]),
+        "labeled": len(rows),
+        "unlabeled": tokens - len(rows),
+        "positives": int(good.sum()),
+        "skipped_signals": eval_log.skipped(labeled),
+        "configs": len(weights),
+        "thresholds": len(thresholds),
+        "workers": args.workers or os.cpu_count() or 1,
+        "elapsed_s": round(elapsed, 2),
+        "current": _row(table, weights, thresholds, cur, int(np.flatnonzero(thresholds == RULES.min_score)[0])),
+        "top": rank(table, weights, thresholds, args.sort, args.top, args.min_buys),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Benchmarks y servidores *mock* locales (sin red).
+
+Cada módulo es ejecutable:
+
+    python -m memebot2.bench.price_feed_latency
+"""
@@ -0,0 +1,102 @@
+# memebot2/bench/import_time.py
+"""
+Tiempo de importación de los puntos de entrada (basado en `-X importtime`).
+
+Para cada módulo lanza un intérprete limpio con `python -X importtime -c
+"import <mod>"` (--reps veces, se queda con la mejor) y resume, sin contar
+lo que carga el arranque del intérprete (site, .pth…):
+
+• total_ms  : acumulado de los imports de primer nivel.
+• modules   : módulos que arrastra el import.
+• signing   : si se cargó la pila de firma (solders / solana).
+• top       : los --top imports más caros (acumulado, cualquier nivel).
+
+Uso:
+    python -m memebot2.bench.import_time [--reps 5] [--top 8] [módulo …]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+TARGETS = (
+    "memebot2.config",
+    "memebot2.db.database",
+    "memebot2.fetcher",
+    "memebot2.fetcher.dexscreener",
+    "memebot2.analytics.rules",
+    "memebot2.trader",
+    "memebot2.trader.gmgn",
+    "memebot2.run_bot",
+)
+SIGNING = ("solders", "solana")
+MARK = "-- memebot2.bench.import_time --"
+
+
+def _parse(stderr: str) -> list[tuple[int, int, str]]:
+    """Filas (profundidad, acumulado µs, módulo) posteriores a MARK."""
+    rows = []
+    lines = stderr.splitlines()
+    for line in lines[lines.index(MARK) + 1:]:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+    return rows
+
+
+def _measure(module: str) -> list[tuple[int, int, str]]:
+    proc = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            f"import sys; print({MARK!r}, file=sys.stderr, flush=True); import {module}",
+        ],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        raise RuntimeError(f"import {module} falló: {tail[0]}")
+    return _parse(proc.stderr)
+
+
+def bench(module: str, reps: int, top: int) -> dict:
+    best = None
+    for _ in range(reps):
+        rows = _measure(module)
+        total = sum(c for d, c, _ in rows if d == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+    names = {n for _, _, n in rows}
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 1),
+        "modules": len(rows),
+        "signing": any(n.split(".")[0] in SIGNING for n in names),
+        "top": [
+            [n, round(c / 1000, 1)]
+            for _, c, n in sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+        ],
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("modules", nargs="*", default=list(TARGETS))
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--top", type=int, default=8)
+    args = ap.parse_args()
+
+    report = [bench(m, args.reps, args.top) for m in args.modules]
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
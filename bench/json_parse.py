@@ -0,0 +1,93 @@
+# memebot2/bench/json_parse.py
+"""
+Coste de decodificar las respuestas grandes de los proveedores.
+
+Para cada backend JSON disponible (json, orjson, msgspec) y cada payload
+(descubrimiento con 500 pares y listado de perfiles) compara:
+
+• generic – `fastjson.loads` (árbol de dicts completo)
+• typed   – decodificador tipado del bot (`descubridor_pares.decode_items`,
+            `socials.decode_profiles`): sólo los campos que se usan
+
+Informa de CPU por parseo (process_time), memoria pico durante el parseo
+y memoria retenida por el resultado (tracemalloc).
+
+Los payloads son sintéticos con la forma real de DexScreener salvo que se
+pasen respuestas grabadas con --discovery / --profiles.
+
+Uso:
+    python -m memebot2.bench.json_parse [--reps 50] [--discovery fich.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import pathlib
+import time
+import tracemalloc
+
+from .mocks import dex_pairs_payload, profiles_payload
+
+
+def _measure(fn, raw: bytes, reps: int) -> dict:
+    fn(raw)                                   # warm-up
+    t0 = time.process_time()
+    for _ in range(reps):
+        fn(raw)
+    cpu_ms = (time.process_time() - t0) * 1000 / reps
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn(raw)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"cpu_ms": round(cpu_ms, 3), "peak_kb": peak // 1024, "retained_kb": retained // 1024}
+
+
+def main(reps: int, discovery: str | None, profiles: str | None) -> None:
+    from memebot2.fetcher import socials
+    from memebot2.utils import descubridor_pares, fastjson
+
+    payloads = {
+        "discovery": (
+            pathlib.Path(discovery).read_bytes() if discovery
+            else json.dumps(dex_pairs_payload(500)).encode()
+        ),
+        "profiles": (
+            pathlib.Path(profiles).read_bytes() if profiles
+            else json.dumps(profiles_payload(500)).encode()
+        ),
+    }
+    typed = {
+        "discovery": descubridor_pares.decode_items,
+        "profiles": socials.decode_profiles,
+    }
+
+    results = []
+    for backend in ("json", "orjson", "msgspec"):
+        try:
+            fastjson._select(backend)
+        except ValueError:
+            continue
+        for name, raw in payloads.items():
+            results.append({
+                "backend": backend,
+                "payload": name,
+                "size_kb": len(raw) // 1024,
+                "generic": _measure(lambda b: fastjson.loads(b), raw, reps),
+                "typed": _measure(typed[name], raw, reps),
+            })
+    fastjson._select()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--reps", type=int, default=50)
+    ap.add_argument("--discovery", help="respuesta grabada de una fuente de descubrimiento")
+    ap.add_argument("--profiles", help="respuesta grabada de token-profiles/latest/v1")
+    args = ap.parse_args()
+    main(args.reps, args.discovery, args.profiles)
@@ -0,0 +1,95 @@
+# memebot2/bench/loop_compare.py
+"""
+asyncio vs uvloop sobre el pipeline completo con proveedores mock.
+
+Lanza `bench.pipeline` en un proceso limpio por loop y repetición
+(alternando loops para repartir el ruido de la máquina) con un perfil que
+satura al bot: muchos pares por segundo, lotes grandes y latencias de red
+bajas, para que pese el coste del propio loop y no la espera.
+
+Por loop informa la mediana de las repeticiones de:
+
+• requests_per_s / candidates_per_s   (más es mejor)
+• loop_lag_ms p50 / p99               (menos es mejor)
+• time_to_buy_ms p50                  (menos es mejor)
+
+y `ratio` = uvloop / asyncio de cada una.
+
+Uso:
+    python -m memebot2.bench.loop_compare [--reps 3] [--duration 20]
+        [-- <argumentos extra para bench.pipeline>]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from statistics import median
+
+LOOPS = ("asyncio", "uvloop")
+PROFILE = ["--pairs", "2000", "--rate", "60", "--batch", "60", "--latency-ms", "5",
+           "--hold-s", "1", "--good-pct", "0.3"]
+METRICS = {
+    "requests_per_s": ("requests_per_s",),
+    "candidates_per_s": ("candidates_per_s",),
+    "loop_lag_p50_ms": ("loop_lag_ms", "p50"),
+    "loop_lag_p99_ms": ("loop_lag_ms", "p99"),
+    "time_to_buy_p50_ms": ("time_to_buy_ms", "p50"),
+}
+
+
+def _run(loop: str, duration: float, extra: list[str]) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-m", "memebot2.bench.pipeline", "--loop", loop,
+         "--duration", str(duration), *PROFILE, *extra],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        raise RuntimeError(f"pipeline --loop {loop} falló: {tail[0]}")
+    out = proc.stdout
+    return json.loads(out[out.index("{"):])       # saltar prints previos (BD)
+
+
+def _get(result: dict, path: tuple[str, ...]):
+    for part in path:
+        result = result.get(part) if isinstance(result, dict) else None
+    return result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="asyncio vs uvloop en el pipeline con mocks")
+    ap.add_argument("--reps", type=int, default=3)
+    ap.add_argument("--duration", type=float, default=20.0, help="segundos por ejecución")
+    ap.add_argument("extra", nargs=argparse.REMAINDER, help="-- argumentos para bench.pipeline")
+    args = ap.parse_args()
+    extra = [a for a in args.extra if a != "--"]
+
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        raise SystemExit("uvloop no está instalado (pip install uvloop)")
+
+    runs: dict[str, list[dict]] = {loop: [] for loop in LOOPS}
+    for _ in range(args.reps):
+        for loop in LOOPS:
+            runs[loop].append(_run(loop, args.duration, extra))
+
+    report: dict = {"profile": PROFILE + extra, "reps": args.reps, "duration_s": args.duration}
+    for loop, results in runs.items():
+        report[loop] = {}
+        for name, path in METRICS.items():
+            values = [v for v in (_get(r, path) for r in results) if v is not None]
+            report[loop][name] = round(median(values), 2) if values else None
+    report["ratio"] = {
+        name: round(report["uvloop"][name] / report["asyncio"][name], 2)
+        if report["asyncio"][name] and report["uvloop"][name] is not None else None
+        for name in METRICS
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
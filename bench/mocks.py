@@ -0,0 +1,453 @@
+# memebot2/bench/mocks.py
+"""
+Servidores locales que imitan a los proveedores externos:
+
+• MockDexScreener – GET /latest/dex/pairs/solana/{id},
+                    /latest/dex/tokens/{mints} (pares por mint; "solana" =
+                    listado de descubrimiento), /token-profiles/latest[/v1]
+                    y /chart/solana/{mint}
+• MockRugCheck    – GET /score/{mint}
+• MockHelius      – GET /v0/token/{mint}/holders
+• MockGMGN        – GET /defi/router/v1/sol/tx/get_swap_route (tx v0 real
+                    sin firmar, con nuestra clave como fee payer)
+• MockSolanaRPC   – WebSocket JSON-RPC con accountSubscribe/Unsubscribe
+                    y logsSubscribe (mints Pump Fun sintéticos) y HTTP
+                    JSON-RPC con getTokenSupply / sendTransaction (fills)
+                    / getSignatureStatuses ("confirmed" tras confirm_s)
+
+`Faults` inyecta latencia y errores 500 como middleware de la app.
+
+Se levantan con `serve(app)` en un puerto libre de 127.0.0.1 y se apuntan
+al bot vía variables de entorno (DEX_API_BASE, SOL_WS_URL…) **antes** de
+importar los módulos de memebot2.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import itertools
+import os
+import random
+import struct
+import time
+from typing import Callable, Optional
+
+from aiohttp import WSMsgType, web
+
+PUMPFUN_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+SOL_MINT = "So11111111111111111111111111111111111111112"
+
+
+# ───────────────────────── helpers ─────────────────────────────
+def bonding_curve_bytes(price_sol: float, v_token: int = 1_000_000_000_000_000) -> bytes:
+    """Cuenta bonding curve sintética cuyo precio (SOL/token) es `price_sol`."""
+    v_sol = int(price_sol * (v_token / 1e6) * 1e9)
+    return (
+        b"\x00" * 8
+        + struct.pack("<QQQQQ", v_token, v_sol, v_token, v_sol, v_token)
+        + b"\x00"                                  # complete = False
+    )
+
+
+def create_event_log(name: str, symbol: str, mint: bytes | None = None) -> str:
+    """Línea "Program data: …" con un CreateEvent de Pump Fun sintético."""
+    def _s(v: str) -> bytes:
+        raw = v.encode()
+        return struct.pack("<I", len(raw)) + raw
+
+    payload = (
+        hashlib.sha256(b"event:CreateEvent").digest()[:8]
+        + _s(name) + _s(symbol) + _s("https://example.invalid/meta.json")
+        + (mint or os.urandom(32)) + os.urandom(32) + os.urandom(32)
+        + os.urandom(32) + struct.pack("<q", int(time.time()))
+    )
+    return "Program data: " + base64.b64encode(payload).decode()
+
+
+def pair_json(mint: str, price_usd: float, created_ms: int | None = None) -> dict:
+    """Par con la forma que devuelve DexScreener (campos que usa el bot)."""
+    return {
+        "pairAddress": f"PAIR{mint[:8]}",
+        "baseToken": {"address": mint, "symbol": mint[:4].upper(), "name": mint},
+        "pairCreatedAt": created_ms or int(time.time() * 1000) - 600_000,
+        "priceUsd": f"{price_usd:.12f}",
+        "volume": {"usd": 50_000},
+        "liquidity": {"usd": 20_000},
+        "txns": {"h24": {"buys": 150, "sells": 90}, "m5": {"buys": 4}},
+    }
+
+
+def dex_pairs_payload(n: int = 500) -> dict:
+    """Respuesta tipo `/latest/dex/tokens` con `n` pares y todos sus campos."""
+    now_ms = int(time.time() * 1000)
+    pairs = []
+    for i in range(n):
+        mint = base64.b32encode(os.urandom(25)).decode()[:44]
+        p = pair_json(mint, 1e-5 * (i + 1), now_ms - i * 60_000)
+        p.update({
+            "chainId": "solana",
+            "dexId": "raydium",
+            "url": f"https://dexscreener.com/solana/{p['pairAddress']}",
+            "quoteToken": {"address": "So11111111111111111111111111111111111111112",
+                           "name": "Wrapped SOL", "symbol": "SOL"},
+            "priceNative": "0.0000001",
+            "txns": {k: {"buys": i % 97, "sells": i % 89}
+                     for k in ("m5", "h1", "h6", "h24")},
+            "volume": {k: 1000.0 + i for k in ("m5", "h1", "h6", "h24")} | {"usd": 50_000},
+            "priceChange": {k: (i % 21) - 10.5 for k in ("m5", "h1", "h6", "h24")},
+            "liquidity": {"usd": 20_000.0 + i, "base": 1e9, "quote": 120.5},
+            "fdv": 150_000, "marketCap": 150_000,
+            "info": {
+                "imageUrl": f"https://cdn.example.invalid/{mint}.png",
+                "websites": [{"label": "Website", "url": "https://example.invalid"}],
+                "socials": [{"type": "twitter", "url": "https://x.com/example"}],
+            },
+        })
+        pairs.append(p)
+    return {"schemaVersion": "1.0.0", "pairs": pairs}
+
+
+def profiles_payload(n: int = 500, linked_pct: float = 0.6) -> list[dict]:
+    """Listado tipo `token-profiles/latest/v1` con `n` perfiles."""
+    out = []
+    for i in range(n):
+        mint = base64.b32encode(os.urandom(25)).decode()[:44]
+        links = (
+            [{"type": "twitter", "url": "https://x.com/example"},
+             {"label": "Website", "url": "https://example.invalid"}]
+            if i < n * linked_pct else []
+        )
+        out.append({
+            "url": f"https://dexscreener.com/solana/{mint}",
+            "chainId": "solana",
+            "tokenAddress": mint,
+            "icon": f"https://cdn.example.invalid/{mint}.png",
+            "header": f"https://cdn.example.invalid/{mint}-h.png",
+            "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+            "links": links,
+        })
+    return out
+
+
+async def serve(app: web.Application, port: int = 0) -> tuple[web.AppRunner, str]:
+    """Arranca `app` y devuelve (runner, base_url)."""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    sock = site._server.sockets[0]            # type: ignore[union-attr]
+    return runner, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+class Faults:
+    """Latencia fija y tasa de error (HTTP 500) para todas las rutas de una app."""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.injected = 0
+
+    def middleware(self):
+        @web.middleware
+        async def _faults(request: web.Request, handler):
+            self.requests += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.injected += 1
+                return web.json_response({"error": "injected"}, status=500)
+            return await handler(request)
+
+        return _faults
+
+    def app(self) -> web.Application:
+        return web.Application(middlewares=[self.middleware()])
+
+
+# ───────────────────────── DexScreener ─────────────────────────
+class MockDexScreener:
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.pairs: dict[str, dict] = {}
+        self.listed: list[str] = []            # mints de descubrimiento (orden de alta)
+        self.listed_at: dict[str, float] = {}  # mint → time.monotonic() del alta
+        self.linked: set[str] = set()          # mints con perfil + enlaces
+        self.hits = 0
+
+    def list_pair(self, mint: str, price_usd: float, pad_bytes: int = 0) -> dict:
+        """Da de alta un par nuevo en el listado de descubrimiento."""
+        p = pair_json(mint, price_usd, int(time.time() * 1000)) | {"chainId": "solana"}
+        if pad_bytes:
+            p["info"] = {"description": "x" * pad_bytes}
+        self.pairs[mint] = p
+        self.listed.append(mint)
+        self.listed_at[mint] = time.monotonic()
+        return p
+
+    def set_price(self, mint: str, price_usd: float) -> None:
+        self.pairs[mint]["priceUsd"] = f"{price_usd:.12f}"
+
+    async def _pair(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        pid = request.match_info["pid"]
+        pair = self.pairs.get(pid) or next(
+            (p for p in self.pairs.values() if p.get("pairAddress") == pid), None
+        )
+        if pair is None:
+            return web.json_response({"pairs": None}, status=404)
+        return web.json_response({"pairs": [pair]})
+
+    async def _tokens(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.match_info["mints"] == "solana":          # descubrimiento
+            limit = int(request.query.get("limit", 500))
+            newest = self.listed[::-1][:limit]
+            return web.json_response({"pairs": [self.pairs[m] for m in newest]})
+        mints = request.match_info["mints"].split(",")
+        pairs = [self.pairs[m] for m in mints if m in self.pairs]
+        return web.json_response({"pairs": pairs or None})
+
+    async def _profiles(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        return web.json_response([
+            {"chainId": "solana", "tokenAddress": m,
+             "links": [{"type": "twitter", "url": "https://x.com/example"}]}
+            for m in self.linked
+        ])
+
+    async def _chart(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        pair = self.pairs.get(request.match_info["mint"])
+        if pair is None:
+            return web.json_response([], status=404)
+        return web.json_response([{"close": pair["priceUsd"]}] * 60)
+
+    def routes(self) -> list[web.RouteDef]:
+        return [
+            web.get("/latest/dex/pairs/solana/{pid}", self._pair),
+            web.get("/latest/dex/tokens/{mints}", self._tokens),
+            web.get("/token-profiles/latest/v1", self._profiles),
+            web.get("/token-profiles/latest", self._profiles),
+            web.get("/chart/solana/{mint}", self._chart),
+        ]
+
+
+# ───────────────────────── RugCheck ────────────────────────────
+class MockRugCheck:
+    def __init__(self) -> None:
+        self.scores: dict[str, int] = {}
+        self.hits = 0
+
+    async def _score(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        mint = request.match_info["mint"]
+        if mint not in self.scores:
+            return web.json_response({}, status=404)
+        return web.json_response({"score": self.scores[mint]})
+
+    def routes(self) -> list[web.RouteDef]:
+        return [web.get("/score/{mint}", self._score)]
+
+
+# ───────────────────────── Helius ──────────────────────────────
+class MockHelius:
+    def __init__(self) -> None:
+        self.holders: dict[str, list[int]] = {}    # mint → saldos (raw)
+        self.hits = 0
+
+    def set_holders(self, mint: str, top_share: float, n: int = 60, supply: int = 10**9) -> None:
+        """Un holder con `top_share` del supply y el resto repartido en n-1."""
+        top = int(supply * top_share)
+        rest = (supply - top) // max(1, n - 1)
+        self.holders[mint] = [top] + [rest] * (n - 1)
+
+    async def _holders(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        amounts = self.holders.get(request.match_info["mint"], [])
+        return web.json_response([
+            {"owner": f"Holder{i:04d}", "amountRaw": str(a)} for i, a in enumerate(amounts)
+        ])
+
+    def routes(self) -> list[web.RouteDef]:
+        return [web.get("/v0/token/{mint}/holders", self._holders)]
+
+
+# ───────────────────────── GMGN router ─────────────────────────
+class MockGMGN:
+    """
+    Devuelve una VersionedTransaction v0 sin firmar (transferencia de 1
+    lamport a uno mismo) con blockhash único por ruta; `rpc.sendTransaction`
+    lo usa para saber de qué orden es cada fill.
+    """
+
+    def __init__(self, rpc: "MockSolanaRPC") -> None:
+        self.rpc = rpc
+        self._seq = itertools.count()
+        self.hits = 0
+
+    async def _route(self, request: web.Request) -> web.Response:
+        from solders.hash import Hash
+        from solders.message import MessageV0
+        from solders.pubkey import Pubkey
+        from solders.signature import Signature
+        from solders.system_program import TransferParams, transfer
+        from solders.transaction import VersionedTransaction
+
+        self.hits += 1
+        q = request.query
+        token_in, token_out = q["token_in_address"], q["token_out_address"]
+        side, mint = ("buy", token_out) if token_in == SOL_MINT else ("sell", token_in)
+        payer = Pubkey.from_string(q["from_address"])
+        blockhash = Hash(hashlib.sha256(f"route{next(self._seq)}".encode()).digest())
+        msg = MessageV0.try_compile(
+            payer, [transfer(TransferParams(from_pubkey=payer, to_pubkey=payer, lamports=1))],
+            [], blockhash,
+        )
+        tx = VersionedTransaction.populate(msg, [Signature.default()])
+        self.rpc.orders[str(blockhash)] = (side, mint)
+        in_amount = int(q["in_amount"])
+        return web.json_response({
+            "code": 0,
+            "msg": "success",
+            "data": {
+                "quote": {"inAmount": str(in_amount), "outAmount": str(in_amount * 1000)},
+                "raw_tx": {
+                    "swapTransaction": base64.b64encode(bytes(tx)).decode(),
+                    "lastValidBlockHeight": 1,
+                },
+            },
+        })
+
+    def routes(self) -> list[web.RouteDef]:
+        return [web.get("/defi/router/v1/sol/tx/get_swap_route", self._route)]
+
+
+# ───────────────────────── Solana RPC (WS) ─────────────────────
+class MockSolanaRPC:
+    def __init__(self) -> None:
+        self.accounts: dict[str, bytes] = {}
+        self.owner = PUMPFUN_PROGRAM
+        self._ids = itertools.count(1)
+        self._subs: dict[int, tuple[web.WebSocketResponse, str]] = {}
+        self._log_subs: dict[int, web.WebSocketResponse] = {}
+        # HTTP JSON-RPC
+        self.supply: dict[str, int] = {}
+        self.orders: dict[str, tuple[str, str]] = {}      # blockhash → (side, mint)
+        self.fills: list[tuple[float, str, str]] = []     # (monotonic, side, mint)
+        self.on_fill: Optional[Callable[[str, str], None]] = None
+        self.sent: dict[str, float] = {}                   # firma → monotonic
+        self.confirm_s = 0.4                               # envío → "confirmed"
+
+    def _notification(self, sub: int, pool: str) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "method": "accountNotification",
+            "params": {
+                "subscription": sub,
+                "result": {
+                    "context": {"slot": 1},
+                    "value": {
+                        "owner": self.owner,
+                        "data": [base64.b64encode(self.accounts[pool]).decode(), "base64"],
+                    },
+                },
+            },
+        }
+
+    async def set_account(self, pool: str, data: bytes) -> None:
+        """Actualiza la cuenta y notifica a los suscriptores."""
+        self.accounts[pool] = data
+        for sub, (ws, p) in list(self._subs.items()):
+            if p == pool and not ws.closed:
+                await ws.send_json(self._notification(sub, pool))
+
+    async def emit_logs(self, logs: list[str], signature: str = "sig") -> None:
+        """Publica una transacción a los suscriptores de logsSubscribe."""
+        for sub, ws in list(self._log_subs.items()):
+            if ws.closed:
+                continue
+            await ws.send_json({
+                "jsonrpc": "2.0",
+                "method": "logsNotification",
+                "params": {
+                    "subscription": sub,
+                    "result": {
+                        "context": {"slot": 1},
+                        "value": {"signature": signature, "err": None, "logs": logs},
+                    },
+                },
+            })
+
+    async def drop_all(self) -> None:
+        """Cierra todas las conexiones (simula caída del stream)."""
+        sockets = {ws for ws, _ in self._subs.values()} | set(self._log_subs.values())
+        for ws in sockets:
+            await ws.close()
+        self._subs.clear()
+        self._log_subs.clear()
+
+    async def _ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            req = msg.json()
+            method = req.get("method")
+            if method == "accountSubscribe":
+                sub = next(self._ids)
+                self._subs[sub] = (ws, req["params"][0])
+                await ws.send_json({"jsonrpc": "2.0", "id": req["id"], "result": sub})
+            elif method == "logsSubscribe":
+                sub = next(self._ids)
+                self._log_subs[sub] = ws
+                await ws.send_json({"jsonrpc": "2.0", "id": req["id"], "result": sub})
+            elif method == "accountUnsubscribe":
+                self._subs.pop(req["params"][0], None)
+                await ws.send_json({"jsonrpc": "2.0", "id": req["id"], "result": True})
+        for sub in [k for k, (w, _) in self._subs.items() if w is ws]:
+            self._subs.pop(sub, None)
+        for sub in [k for k, w in self._log_subs.items() if w is ws]:
+            self._log_subs.pop(sub, None)
+        return ws
+
+    async def _http(self, request: web.Request) -> web.Response:
+        req = await request.json()
+        method, params = req.get("method"), req.get("params") or []
+        if method == "getTokenSupply":
+            amount = self.supply.get(params[0], 10**9)
+            result: object = {"context": {"slot": 1},
+                              "value": {"amount": str(amount), "decimals": 6, "uiAmount": amount / 1e6}}
+        elif method == "sendTransaction":
+            from solders.transaction import VersionedTransaction
+
+            tx = VersionedTransaction.from_bytes(base64.b64decode(params[0]))
+            side, mint = self.orders.pop(str(tx.message.recent_blockhash), ("?", "?"))
+            self.fills.append((time.monotonic(), side, mint))
+            if self.on_fill is not None:
+                self.on_fill(side, mint)
+            result = str(tx.signatures[0])
+            self.sent[result] = time.monotonic()
+        elif method == "getSignatureStatuses":
+            now = time.monotonic()
+            result = {"context": {"slot": 1}, "value": [
+                {"slot": 1, "confirmations": None, "err": None, "status": {"Ok": None},
+                 "confirmationStatus": "confirmed"}
+                if now - self.sent.get(sig, now) >= self.confirm_s else None
+                for sig in params[0]
+            ]}
+        else:
+            return web.json_response({"jsonrpc": "2.0", "id": req.get("id"),
+                                      "error": {"code": -32601, "message": method}})
+        return web.json_response({"jsonrpc": "2.0", "id": req.get("id"), "result": result})
+
+    def routes(self) -> list[web.RouteDef]:
+        return [web.get("/ws", self._ws), web.post("/", self._http)]
@@ -0,0 +1,307 @@
+# memebot2/bench/pipeline.py
+"""
+Benchmark extremo a extremo del pipeline real de `run_bot`.
+
+Levanta en local MockDexScreener, MockRugCheck, MockHelius, MockGMGN y
+MockSolanaRPC (cada uno en su puerto, con latencia / tasa de error propias)
+y ejecuta `run_bot.main_loop` contra ellos con una clave efímera y
+TRADE_AMOUNT_SOL > 0, así que compra y vende de verdad (contra los mocks):
+
+  alta del par → descubrimiento → filtros/score → ruta GMGN → firma →
+  sendTransaction  ···  salto de precio → feed → salida → venta
+
+Se listan --pairs tokens a --rate por segundo; --good-pct de ellos pasan
+el score (rug alto, holders repartidos, socials) y el resto no.  Cada
+compra dispara, --hold-s después, un salto de precio ×2 (take-profit).
+
+Resultados (JSON):
+
+• candidates_per_s  : pares sacados de la cola de validación por segundo.
+• requests_per_s    : peticiones servidas por los mocks por segundo.
+• time_to_buy_ms    : alta del par → sendTransaction de la compra.
+• time_to_exit_ms   : salto de precio → sendTransaction de la venta.
+• loop_lag_ms       : retraso del event loop (muestreo cada 20 ms).
+• providers         : peticiones y errores inyectados por mock.
+• stages / events   : `utils.metrics` (duración por etapa, decisiones).
+• trace_hops_ms     : p50 por salto de `utils.trace` (compra y venta).
+• shadow            : libros de las estrategias en sombra (--shadow FILE).
+
+Pensado para CI: --out guarda el resultado y --baseline compara con uno
+anterior; si alguna métrica empeora más de --tolerance sale con código 1.
+
+Uso:
+    python -m memebot2.bench.pipeline [--pairs 120] [--rate 4] [--duration 40]
+        [--latency-ms 30,rugcheck=150] [--error-rate 0.02] [--pad-bytes 0]
+        [--loop asyncio|uvloop] [--shadow config/shadow.json] [--out res.json] [--baseline base.json --tolerance 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from statistics import median
+
+from .mocks import (
+    Faults,
+    MockDexScreener,
+    MockGMGN,
+    MockHelius,
+    MockRugCheck,
+    MockSolanaRPC,
+    serve,
+)
+
+PROVIDERS = ("dexscreener", "rugcheck", "helius", "gmgn", "rpc")
+LAG_SAMPLE_S = 0.02
+
+# métrica → True si "más alto es mejor"
+COMPARED = {
+    "candidates_per_s": True,
+    "time_to_buy_ms.p50": False,
+    "time_to_exit_ms.p50": False,
+    "loop_lag_ms.p99": False,
+}
+
+
+def _per_provider(spec: str, cast=float) -> dict[str, float]:
+    """"30" → todos 30; "30,rugcheck=150" → 30 salvo rugcheck."""
+    out = dict.fromkeys(PROVIDERS, cast(0))
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.rpartition("=")
+        if not name:
+            out = dict.fromkeys(PROVIDERS, cast(value))
+        elif name in out:
+            out[name] = cast(value)
+        else:
+            raise SystemExit(f"proveedor desconocido: {name} (usa {', '.join(PROVIDERS)})")
+    return out
+
+
+def _pct(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    v = sorted(values)
+    return {
+        "n": len(v),
+        "p50": round(median(v), 1),
+        "p90": round(v[int(0.9 * (len(v) - 1))], 1),
+        "p99": round(v[int(0.99 * (len(v) - 1))], 1),
+        "max": round(v[-1], 1),
+    }
+
+
+def _mint(rng: random.Random) -> str:
+    return base64.b32encode(rng.randbytes(25)).decode()[:44]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _lag_sampler(out: list[float]) -> None:
+    while True:
+        t = time.perf_counter()
+        await asyncio.sleep(LAG_SAMPLE_S)
+        out.append((time.perf_counter() - t - LAG_SAMPLE_S) * 1000)
+
+
+async def main(args: argparse.Namespace) -> dict:
+    from solders.keypair import Keypair
+
+    rng = random.Random(args.seed)
+    latency = _per_provider(args.latency_ms)
+    errors = _per_provider(args.error_rate)
+    faults = {p: Faults(latency[p] / 1000, errors[p], seed=args.seed) for p in PROVIDERS}
+
+    dex, rug, helius, rpc = MockDexScreener(), MockRugCheck(), MockHelius(), MockSolanaRPC()
+    gmgn_mock = MockGMGN(rpc)
+    bases, runners = {}, []
+    for name, mock in zip(PROVIDERS, (dex, rug, helius, gmgn_mock, rpc)):
+        app = faults[name].app()
+        app.add_routes(mock.routes())
+        runner, bases[name] = await serve(app)
+        runners.append(runner)
+
+    data_dir = tempfile.mkdtemp(prefix="memebot2-bench-")
+    os.environ.update({
+        "DEX_API_BASE": bases["dexscreener"],
+        "RUGCHECK_API_BASE": bases["rugcheck"],
+        "RUGCHECK_API_KEY": "bench",
+        "HELIUS_API_BASE": bases["helius"],
+        "HELIUS_API_KEY": "bench",
+        "SOL_RPC_URL": bases["rpc"],
+        "SOL_WS_URL": bases["rpc"].replace("http://", "ws://") + "/ws",
+        "SOL_PRIVATE_KEY": json.dumps(list(bytes(Keypair())), separators=(",", ":")),
+        "TRADE_AMOUNT_SOL": "0.01",
+        "DATA_DIR": data_dir,
+        "SQLITE_DB": os.path.join(data_dir, "bench.db"),
+        "DISCOVERY_INTERVAL": "1",
+        "SLEEP_SECONDS": "1",
+        "PRICE_POLL_SECONDS": "1",
+        "PRICE_FEED_MODE": "poll",
+        "PUMPFUN_STREAM": "0",
+        "INSIDER_SOURCE": "off",
+        "VALIDATION_BATCH_SIZE": str(args.batch),
+        "TAPE_RECORD": "0",
+        "METRICS_PORT": str(_free_port()),
+        "TRACE": "1",
+        "TRACE_FILE": os.path.join(data_dir, "trace.jsonl"),
+        "SHADOW_FILE": args.shadow,
+    })
+    from memebot2 import run_bot
+    from memebot2.trader import gmgn
+    from memebot2.utils import metrics, trace
+
+    gmgn.GMGN_HOST = bases["gmgn"]
+
+    pulled = 0
+    _next = run_bot.siguientes_pares
+
+    def _counting(n: int):
+        nonlocal pulled
+        batch = _next(n)
+        pulled += len(batch)
+        return batch
+
+    run_bot.siguientes_pares = _counting
+
+    jumps: dict[str, float] = {}
+
+    def _on_fill(side: str, mint: str) -> None:
+        if side == "buy" and mint in dex.pairs:
+            loop.call_later(args.hold_s, _jump, mint)
+
+    def _jump(mint: str) -> None:
+        dex.set_price(mint, float(dex.pairs[mint]["priceUsd"]) * 2)
+        jumps[mint] = time.monotonic()
+
+    rpc.on_fill = _on_fill
+    loop = asyncio.get_running_loop()
+
+    async def _lister() -> None:
+        for i in range(args.pairs):
+            mint = _mint(rng)
+            good = rng.random() < args.good_pct
+            dex.list_pair(mint, 1e-5 * (1 + i % 50), args.pad_bytes)
+            rug.scores[mint] = 85 if good else 5
+            helius.set_holders(mint, 0.05 if good else 0.6)
+            if good:
+                dex.linked.add(mint)
+            await asyncio.sleep(1 / args.rate)
+
+    lag: list[float] = []
+    t0 = time.monotonic()
+    tasks = [
+        asyncio.create_task(run_bot.main_loop(), name="bench-main-loop"),
+        asyncio.create_task(_lister(), name="bench-lister"),
+        asyncio.create_task(_lag_sampler(lag), name="bench-lag"),
+    ]
+    done, _ = await asyncio.wait(tasks[:1], timeout=args.duration)
+    elapsed = time.monotonic() - t0
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await trace.close()
+    for r in runners:
+        await r.cleanup()
+    if done:                                # main_loop no debería terminar
+        tasks[0].result()
+
+    records = trace.load([os.environ["TRACE_FILE"]])
+    buys = {m: t for t, side, m in rpc.fills if side == "buy"}
+    requests = sum(f.requests for f in faults.values())
+    sells = {m: t for t, side, m in rpc.fills if side == "sell"}
+    return {
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        "elapsed_s": round(elapsed, 1),
+        "listed": len(dex.listed),
+        "candidates": pulled,
+        "candidates_per_s": round(pulled / elapsed, 2),
+        "requests_per_s": round(requests / elapsed, 1),
+        "loop": type(asyncio.get_running_loop()).__module__.split(".")[0],
+        "bought": len(buys),
+        "sold": len(sells),
+        "time_to_buy_ms": _pct([(t - dex.listed_at[m]) * 1000 for m, t in buys.items()]),
+        "time_to_exit_ms": _pct([(t - jumps[m]) * 1000 for m, t in sells.items() if m in jumps]),
+        "loop_lag_ms": _pct(lag),
+        "providers": {
+            p: {"requests": faults[p].requests, "errors_injected": faults[p].injected}
+            for p in PROVIDERS
+        },
+        "stages": metrics.STAGES.summary(),
+        "events": metrics.EVENTS.snapshot(),
+        "trace_hops_ms": {
+            ph: {k: v["p50"] for k, v in trace.breakdown(records, ph)["hops_ms"].items()}
+            for ph in ("buy", "sell")
+        },
+        "scoring": run_bot.planner.report(),
+        "shadow": run_bot.shadow_engine.report() if run_bot.shadow_engine is not None else None,
+    }
+
+
+def _metric(result: dict, path: str):
+    for part in path.split("."):
+        result = result.get(part) if isinstance(result, dict) else None
+    return result
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Métricas que empeoran más de `tolerance` respecto a `baseline`."""
+    worse = []
+    for path, higher_better in COMPARED.items():
+        now, base = _metric(result, path), _metric(baseline, path)
+        if not isinstance(now, (int, float)) or not isinstance(base, (int, float)) or not base:
+            continue
+        change = (now - base) / base
+        if (-change if higher_better else change) > tolerance:
+            worse.append(f"{path}: {base} → {now} ({change:+.0%})")
+    return worse
+
+
+def cli() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark extremo a extremo con proveedores mock")
+    ap.add_argument("--pairs", type=int, default=120, help="pares que se listan")
+    ap.add_argument("--rate", type=float, default=4.0, help="pares listados por segundo")
+    ap.add_argument("--good-pct", type=float, default=0.3, help="fracción que pasa el score")
+    ap.add_argument("--duration", type=float, default=40.0, help="segundos de ejecución")
+    ap.add_argument("--hold-s", type=float, default=2.0, help="compra → salto de precio")
+    ap.add_argument("--batch", type=int, default=5, help="VALIDATION_BATCH_SIZE")
+    ap.add_argument("--latency-ms", default="30", help="ms por petición: '30' o '30,rugcheck=150'")
+    ap.add_argument("--error-rate", default="0", help="fracción de 500s: '0.02' o '0,helius=0.1'")
+    ap.add_argument("--pad-bytes", type=int, default=0, help="relleno por par en respuestas DexScreener")
+    ap.add_argument("--loop", default="asyncio", choices=("asyncio", "uvloop", "auto"),
+                    help="event loop (utils.eventloop)")
+    ap.add_argument("--shadow", default="", help="SHADOW_FILE con estrategias en sombra")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default="", help="guardar el resultado JSON")
+    ap.add_argument("--baseline", default="", help="resultado anterior con el que comparar")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="empeoramiento admitido (0.25 = 25 %%)")
+    args = ap.parse_args()
+
+    from memebot2.utils import eventloop
+
+    result = eventloop.run(main(args), args.loop)
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if result.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
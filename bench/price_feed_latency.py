@@ -0,0 +1,117 @@
+# memebot2/bench/price_feed_latency.py
+"""
+Latencia cambio-de-precio → decisión de salida, polling vs stream.
+
+Levanta MockDexScreener + MockSolanaRPC en local, mueve el precio de un
+token N veces y mide, para cada modo del feed:
+
+• change→decision : desde que el precio cambia en origen hasta que la
+                    lógica de salida lo evalúa (lo que pagamos en mercado).
+• tick→decision   : `feed.latency` (coste interno del consumidor).
+
+Uso:
+    python -m memebot2.bench.price_feed_latency [--rounds 10] [--poll 2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from statistics import median
+
+from aiohttp import web
+
+from .mocks import MockDexScreener, MockSolanaRPC, bonding_curve_bytes, pair_json, serve
+
+MINT = "BenchMint1111111111111111111111111111111111"
+POOL = "BenchPool111111111111111111111111111111111"
+SOL_USD = 150.0
+
+
+async def _run_mode(mode: str, rounds: int, poll: float, dex, rpc, ws_url: str) -> dict:
+    from memebot2.config import exits
+    from memebot2.fetcher import price_feed
+
+    if mode == "ws":
+        feed = price_feed.StreamPriceFeed(url=ws_url, interval=poll)
+    else:
+        feed = price_feed.PollingPriceFeed(interval=poll)
+
+    price = 1e-6
+    await rpc.set_account(POOL, bonding_curve_bytes(price))
+    dex.pairs[MINT] = pair_json(MINT, price * SOL_USD)
+    await feed.start()
+    feed.subscribe(MINT, pool=POOL)
+    buy_usd = price * SOL_USD
+
+    # espera a la primera cotización (ancla USD en modo ws)
+    while feed.latest(MINT) is None:
+        await feed.next_tick(timeout=poll)
+    if mode == "ws":
+        while not feed.connected:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        await rpc.set_account(POOL, bonding_curve_bytes(price))   # ancla USD
+        await feed.next_tick(timeout=poll)
+
+    samples: list[float] = []
+    for _ in range(rounds):
+        await asyncio.sleep(random.uniform(0, poll))     # fase aleatoria
+        price *= random.choice((0.9, 1.1))
+        target = price * SOL_USD
+        dex.pairs[MINT] = pair_json(MINT, target)
+        t0 = time.monotonic()
+        await rpc.set_account(POOL, bonding_curve_bytes(price))
+        while True:
+            tick = await feed.next_tick(timeout=poll * 3)
+            if tick is None:
+                break
+            # decisión equivalente a run_bot._should_exit (SL duro)
+            pnl = (tick.price_usd - buy_usd) / buy_usd * 100
+            _ = pnl <= -exits.STOP_LOSS_PCT
+            feed.latency.record(tick.source, time.monotonic() - tick.ts)
+            if abs(tick.price_usd - target) / target < 1e-6:
+                samples.append(time.monotonic() - t0)
+                break
+
+    await feed.close()
+    ordered = sorted(samples) or [float("nan")]
+    return {
+        "mode": mode,
+        "rounds": len(samples),
+        "change_to_decision_p50_ms": round(median(ordered) * 1000, 2),
+        "change_to_decision_max_ms": round(ordered[-1] * 1000, 2),
+        "tick_to_decision": feed.latency.summary(),
+        "dex_requests": dex.hits,
+    }
+
+
+async def main(rounds: int, poll: float) -> None:
+    dex, rpc = MockDexScreener(), MockSolanaRPC()
+    app = web.Application()
+    app.add_routes(dex.routes() + rpc.routes())
+    runner, base = await serve(app)
+
+    os.environ["DEX_API_BASE"] = base
+    os.environ["SOL_WS_URL"] = base.replace("http://", "ws://") + "/ws"
+
+    results = []
+    for mode in ("poll", "ws"):
+        dex.hits = 0
+        results.append(
+            await _run_mode(mode, rounds, poll, dex, rpc, os.environ["SOL_WS_URL"])
+        )
+    await runner.cleanup()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rounds", type=int, default=10)
+    ap.add_argument("--poll", type=float, default=2.0, help="PRICE_POLL_SECONDS")
+    args = ap.parse_args()
+    asyncio.run(main(args.rounds, args.poll))
@@ -0,0 +1,129 @@
+# memebot2/bench/pumpfun_burst.py
+"""
+Ráfaga de mints Pump Fun contra el ingestor en streaming.
+
+Publica `--mints` CreateEvent a `--rate` mints/min desde MockSolanaRPC
+(con un % de duplicados) mientras un consumidor los evalúa como
+`run_bot._pumpfun_consumer`: primero pide sus métricas de mercado a
+MockDexScreener (`dexscreener.get_pair`, con `--dex-ms` de latencia) y
+luego simula el coste del scoring (`--eval-ms`).  Informa de latencia
+llegada → métricas listas para los filtros, descartes por cola llena /
+antigüedad y memoria pico (tracemalloc).
+
+Uso:
+    python -m memebot2.bench.pumpfun_burst [--mints 600] [--rate 600]
+        [--eval-ms 50] [--dex-ms 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from statistics import median
+
+import base58
+from aiohttp import web
+
+from .mocks import MockDexScreener, MockSolanaRPC, create_event_log, serve
+
+
+async def main(
+    mints: int, rate: float, eval_ms: float, dup_pct: float, max_age: float,
+    dex_ms: float = 0.0,
+) -> None:
+    rpc, dex = MockSolanaRPC(), MockDexScreener(latency=dex_ms / 1000)
+    app = web.Application()
+    app.add_routes(rpc.routes() + dex.routes())
+    runner, base = await serve(app)
+    os.environ.update({
+        "SOL_WS_URL": base.replace("http://", "ws://") + "/ws",
+        "DEX_API_BASE": base,
+        "DATA_DIR": tempfile.mkdtemp(prefix="memebot2-bench-"),
+    })
+
+    from memebot2.fetcher import dexscreener
+    from memebot2.fetcher.pumpfun import PumpFunStream
+
+    tracemalloc.start()
+    ingest = PumpFunStream(max_age_s=max_age)
+    await ingest.start()
+    while not rpc._log_subs:
+        await asyncio.sleep(0.01)
+
+    sent_at: dict[str, float] = {}
+    lat: list[float] = []
+    unpriced = 0
+    done = asyncio.Event()
+
+    async def _producer() -> None:
+        gap = 60.0 / rate
+        recent: list[bytes] = []
+        for i in range(mints):
+            if recent and random.random() < dup_pct:
+                mint = random.choice(recent)
+            else:
+                mint = os.urandom(32)
+                recent = (recent + [mint])[-50:]
+            dex.list_pair(base58.b58encode(mint).decode(), 1e-6)
+            t = time.monotonic()
+            await rpc.emit_logs(
+                ["Program log: Instruction: Create", create_event_log(f"tok{i}", f"T{i}", mint)]
+            )
+            sent_at.setdefault(base58.b58encode(mint).decode(), t)
+            await asyncio.sleep(gap)
+        await asyncio.sleep(1)
+        done.set()
+
+    async def _consumer() -> None:
+        nonlocal unpriced
+        while True:
+            tok = await ingest.next_mint(timeout=0.5)
+            if tok is None:
+                if done.is_set():
+                    break
+                continue
+            pair = await dexscreener.get_pair(tok.address)
+            if pair is not None and pair.liquidity:
+                lat.append(time.monotonic() - sent_at.get(tok.address, time.monotonic()))
+            else:
+                unpriced += 1
+            await asyncio.sleep(eval_ms / 1000)          # coste del scoring
+
+    t0 = time.monotonic()
+    await asyncio.gather(_producer(), _consumer())
+    elapsed = time.monotonic() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await ingest.close()
+    await runner.cleanup()
+
+    ordered = sorted(lat) or [float("nan")]
+    print(json.dumps({
+        "mints_sent": mints,
+        "rate_per_min": rate,
+        "evaluated": len(lat),
+        "without_market_data": unpriced,
+        "elapsed_s": round(elapsed, 2),
+        "arrival_to_metrics_p50_ms": round(median(ordered) * 1000, 2),
+        "arrival_to_metrics_p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 2),
+        "stats": ingest.stats,
+        "peak_mem_kb": peak // 1024,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--mints", type=int, default=600)
+    ap.add_argument("--rate", type=float, default=600, help="mints por minuto")
+    ap.add_argument("--eval-ms", type=float, default=50, help="coste simulado del scoring")
+    ap.add_argument("--dex-ms", type=float, default=0, help="latencia de MockDexScreener")
+    ap.add_argument("--dup-pct", type=float, default=0.05)
+    ap.add_argument("--max-age", type=float, default=60, help="PUMPFUN_MAX_AGE_S")
+    args = ap.parse_args()
+    asyncio.run(main(args.mints, args.rate, args.eval_ms, args.dup_pct, args.max_age, args.dex_ms))
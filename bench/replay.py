@@ -0,0 +1,96 @@
+# memebot2/bench/replay.py
+"""
+Reproduce una sesión grabada (TAPE_RECORD=1) con `run_bot.main_loop` real,
+sin red y a tiempo acelerado.
+
+Cada ejecución usa un DATA_DIR y una BD nuevos (temporales o --data-dir),
+con feed de precios por polling, stream Pump Fun apagado e insiders off
+(los websockets no se graban).  Termina al agotar la cinta o --minutes
+virtuales e informa de:
+
+• wall_s / virtual_s / speedup : tiempo real vs tiempo de sesión cubierto.
+• tape                         : respuestas servidas, errores, peticiones
+                                 que la sesión grabada no hizo (miss).
+• tokens / positions           : filas que dejó el bot en la BD.
+• scoring                      : `planner.report()` (llamadas por señal).
+
+El reloj virtual avanza a ritmo fijo: si el trabajo real de una vuelta
+del bucle supera SLEEP_SECONDS/--speed la reproducción "se adelanta" al
+bot y sirve menos respuestas de las grabadas (compárese `served` con
+`responses`); en ese caso bajar --speed.
+
+Uso:
+    python -m memebot2.bench.replay --tape data/tape/20240501.jsonl.gz [--speed 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+
+async def main(tape_path: str, speed: float, minutes: float, data_dir: str) -> dict:
+    os.environ.update({
+        "DATA_DIR": data_dir,
+        "SQLITE_DB": os.path.join(data_dir, "replay.db"),
+        "PRICE_FEED_MODE": "poll",
+        "PUMPFUN_STREAM": "0",
+        "INSIDER_SOURCE": "off",
+        "TAPE_RECORD": "0",
+    })
+    from sqlalchemy import func, select
+
+    from memebot2 import run_bot
+    from memebot2.db.models import Position, Token
+    from memebot2.utils import tape
+
+    rp = await tape.replay(tape_path, speed)
+    limit = rp.tape.start + minutes * 60 if minutes else rp.tape.end
+    t0 = time.perf_counter()
+    bot = asyncio.create_task(run_bot.main_loop(), name="replay-main-loop")
+    try:
+        while not bot.done() and rp.clock.time() <= limit:
+            await asyncio.sleep(0.1)
+    finally:
+        bot.cancel()
+        await asyncio.gather(bot, return_exceptions=True)
+        wall = time.perf_counter() - t0
+        virtual = rp.clock.elapsed()
+        await rp.close()
+    if bot.done() and not bot.cancelled() and bot.exception():
+        raise bot.exception()
+
+    async with run_bot.SessionLocal() as s:
+        tokens = await s.scalar(select(func.count()).select_from(Token))
+        positions = await s.scalar(select(func.count()).select_from(Position))
+    return {
+        "tape": {"file": tape_path, "responses": len(rp.tape), **rp.tape.stats},
+        "wall_s": round(wall, 1),
+        "virtual_s": round(virtual, 1),
+        "speedup": round(virtual / wall, 1) if wall else None,
+        "tokens": tokens,
+        "positions": positions,
+        "scoring": run_bot.planner.report(),
+    }
+
+
+def cli() -> None:
+    ap = argparse.ArgumentParser(description="Reproduce una sesión grabada sin red")
+    ap.add_argument("--tape", required=True, help="fichero .jsonl.gz de TAPE_RECORD")
+    ap.add_argument("--speed", type=float, default=300.0, help="segundos virtuales por segundo real")
+    ap.add_argument("--minutes", type=float, default=0.0, help="parar tras N min virtuales (0 = toda la cinta)")
+    ap.add_argument("--data-dir", default="", help="estado/BD de la reproducción (vacío = temporal)")
+    args = ap.parse_args()
+
+    tape_path = os.path.abspath(args.tape)
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="memebot2-replay-")
+    report = asyncio.run(main(tape_path, args.speed, args.minutes, os.path.abspath(data_dir)))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    cli()
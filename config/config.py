@@ -51,12 +51,36 @@ GMGN_API_KEY     : str = os.getenv("GMGN_API_KEY", "")
 SOL_PRIVATE_KEY  : str = os.getenv("SOL_PRIVATE_KEY", "")
 SOL_PUBLIC_KEY   : str = os.getenv("SOL_PUBLIC_KEY", "")
 SOL_RPC_URL      : str = os.getenv("SOL_RPC_URL", "https://api.mainnet-beta.solana.com")
+SOL_WS_URL       : str = os.getenv("SOL_WS_URL", "")   # vacío → se deriva de SOL_RPC_URL
+# 1 = enviar sin simulación previa (más rápido, pero un swap que falla
+# llega a la cadena y paga comisión); por defecto se simula
+SOL_SKIP_PREFLIGHT: bool = _env_int("SOL_SKIP_PREFLIGHT", 0) == 1
 
 # ───────────────────────── BD & timers ─────────────────────────
+# estado local (colas, índices, cursores…); relativo → bajo memebot2/
+DATA_DIR               : Path  = ROOT_DIR / os.getenv("DATA_DIR", "data").split()[0]
 SQLITE_DB              : str   = os.getenv("SQLITE_DB", "data/memebotdatabase.db")
 SLEEP_SECONDS          : int   = _env_int("SLEEP_SECONDS", 10)
 DISCOVERY_INTERVAL     : int   = _env_int("DISCOVERY_INTERVAL", 60)
 VALIDATION_BATCH_SIZE  : int   = _env_int("VALIDATION_BATCH_SIZE", 5)
+PROCESSED_TTL_H        : int   = _env_int("PROCESSED_TTL_H", 0)   # 0 = no caducan
+PENDING_CAPACITY       : int   = _env_int("PENDING_CAPACITY", 2000)
+PENDING_MAX_AGE_S      : int   = _env_int("PENDING_MAX_AGE_S", 1800)
+REJECT_BACKOFF_S       : tuple[int, ...] = tuple(
+    int(x) for x in os.getenv("REJECT_BACKOFF_S", "120,600,3600").split()[0].split(",")
+    if x.strip().isdigit()
+)
+# caché de señales externas: "señal=ttl_s,…" (ttl 0 = no cachear esa señal)
+SIGNAL_CACHE_TTL_S     : dict[str, int] = {
+    k.strip(): int(v)
+    for k, _, v in (
+        kv.partition("=") for kv in os.getenv(
+            "SIGNAL_CACHE_TTL_S",
+            "rug_score=21600,cluster_bad=1800,social_ok=3600,insider_sig=0",
+        ).split()[0].split(",")
+    )
+    if v.strip().isdigit()
+}
 
 # ───────────────── Filtros de descubrimiento ───────────────────
 MAX_AGE_DAYS        : int   = _env_int  ("MAX_AGE_DAYS",        700)
@@ -65,10 +89,84 @@ MIN_LIQUIDITY_USD   : float = _env_float("MIN_LIQUIDITY_USD", 5000.0)
 MIN_VOL_USD_24H     : float = _env_float("MIN_VOL_USD_24H",   10000.0)
 MAX_24H_VOLUME      : float = _env_float("MAX_24H_VOLUME",  1500000.0)
 MIN_SCORE_TOTAL     : int   = _env_int  ("MIN_SCORE_TOTAL",     65)
+RULES_FILE          : str   = os.getenv("RULES_FILE", "config/rules.json")
 
 # ─────────────────── Tamaño de posición ───────────────────────
 TRADE_AMOUNT_SOL    : float = _env_float("TRADE_AMOUNT_SOL", 0.0)
 
+# ─────────────────── Feed de precios (salidas) ─────────────────
+PRICE_FEED_MODE     : str   = os.getenv("PRICE_FEED_MODE", "poll").split()[0].lower()
+PRICE_POLL_SECONDS  : int   = _env_int("PRICE_POLL_SECONDS", 10)
+
+# ─────────────────── Stream PumpFun (mints nuevos) ─────────────
+PUMPFUN_STREAM      : bool  = _env_int("PUMPFUN_STREAM", 0) == 1
+PUMPFUN_QUEUE_MAX   : int   = _env_int("PUMPFUN_QUEUE_MAX", 500)
+PUMPFUN_MAX_AGE_S   : int   = _env_int("PUMPFUN_MAX_AGE_S", 60)
+
+# ─────────────────── JSON (backend rápido opcional) ────────────
+# "" = el mejor instalado (orjson → msgspec → json); o forzar uno
+JSON_BACKEND        : str   = os.getenv("JSON_BACKEND", "").split("#")[0].strip().lower()
+
+# ─────────────────── Swaps para detección de insiders ──────────
+# "pumpfun" | "replay:<fichero.jsonl>[@velocidad]" | "off"
+INSIDER_SOURCE      : str   = (
+    os.getenv("INSIDER_SOURCE") or ("pumpfun" if PUMPFUN_STREAM else "off")
+).split("#")[0].strip()
+
+# ─────────────────── Grabación de sesiones (tape) ──────────────
+# TAPE_RECORD=1 graba cada petición HTTP saliente (fetchers + trader/gmgn)
+# para reproducirla offline con `python -m memebot2.bench.replay`.
+TAPE_RECORD         : bool  = _env_int("TAPE_RECORD", 0) == 1
+TAPE_FILE           : str   = os.getenv("TAPE_FILE", "").split("#")[0].strip()
+
+# ─────────────────── Métricas (Prometheus) ─────────────────────
+# METRICS_PORT > 0 expone http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_PORT        : int   = _env_int("METRICS_PORT", 0)
+METRICS_HOST        : str   = os.getenv("METRICS_HOST", "127.0.0.1").split()[0]
+
+# ─────────────────── Trazas por token (JSONL) ──────────────────
+# TRACE=1 escribe descubrimiento → compra → venta por token; análisis con
+# `python -m memebot2.utils.trace <fichero>`
+TRACE_ENABLED       : bool  = _env_int("TRACE", 0) == 1
+TRACE_FILE          : str   = os.getenv("TRACE_FILE", "").split("#")[0].strip()
+
+# ─────────────────── Salud del event loop ──────────────────────
+# lag + vigía de bloqueos; perfilador con SIGUSR1 o LOOP_PROFILE_S
+LOOP_MONITOR        : bool  = _env_int("LOOP_MONITOR", 1) == 1
+LOOP_STALL_MS       : int   = _env_int("LOOP_STALL_MS", 250)
+LOOP_PROFILE_S      : int   = _env_int("LOOP_PROFILE_S", 0)
+LOOP_PROFILE_INTERVAL_MS: int = _env_int("LOOP_PROFILE_INTERVAL_MS", 5)
+
+# ─────────────────── Logging ───────────────────────────────────
+# cola + hilo escritor; LOG_RATE = registros/s por plantilla (< WARNING)
+LOG_LEVEL           : str   = os.getenv("LOG_LEVEL", "INFO").split()[0].upper()
+LOG_FORMAT          : str   = os.getenv("LOG_FORMAT", "text").split()[0].lower()
+LOG_LEVELS          : str   = os.getenv("LOG_LEVELS", "").split("#")[0].strip()
+LOG_RATE            : float = _env_float("LOG_RATE", 20.0)
+LOG_QUEUE_MAX       : int   = _env_int("LOG_QUEUE_MAX", 10_000)
+
+# ─────────────────── Event loop ────────────────────────────────
+# "auto" = uvloop si está instalado | "uvloop" | "asyncio"
+EVENT_LOOP          : str   = os.getenv("EVENT_LOOP", "auto").split()[0].lower()
+
+# ─────────────────── Estrategias en sombra ─────────────────────
+# SHADOW_FILE = JSON con estrategias alternativas (paper trading sobre los
+# mismos candidatos y ticks); vacío = apagado.  SHADOW_RESOLVE=1 deja que
+# el scoring consulte señales extra para decidir también por ellas.
+SHADOW_FILE         : str   = os.getenv("SHADOW_FILE", "").split("#")[0].strip()
+SHADOW_RESOLVE      : bool  = _env_int("SHADOW_RESOLVE", 0) == 1
+
+# ─────────────────── Registro de evaluaciones ──────────────────
+# EVAL_LOG=1 guarda cada evaluación del scoring (señales, score, decisión)
+# en segmentos columnares .npz para `python -m memebot2.analytics.weight_opt`.
+# Retención: se borran los segmentos de más de EVAL_LOG_MAX_DAYS días y los
+# más viejos si el total pasa de EVAL_LOG_MAX_MB (0 = sin límite).
+EVAL_LOG            : bool  = _env_int("EVAL_LOG", 0) == 1
+EVAL_LOG_DIR        : str   = os.getenv("EVAL_LOG_DIR", "").split("#")[0].strip()
+EVAL_LOG_FLUSH      : int   = _env_int("EVAL_LOG_FLUSH", 1_000)
+EVAL_LOG_MAX_DAYS   : float = _env_float("EVAL_LOG_MAX_DAYS", 30)
+EVAL_LOG_MAX_MB     : float = _env_float("EVAL_LOG_MAX_MB", 1_024)
+
 # ─────────────────── export control 🔒 ─────────────────────────
 __all__ = [
     # helpers
@@ -79,12 +177,38 @@ __all__ = [
     "HELIUS_API_BASE", "GMGN_API_BASE",
     "BITQUERY_TOKEN", "RUGCHECK_API_KEY", "HELIUS_API_KEY", "GMGN_API_KEY",
     # wallet
-    "SOL_PRIVATE_KEY", "SOL_PUBLIC_KEY", "SOL_RPC_URL",
+    "SOL_PRIVATE_KEY", "SOL_PUBLIC_KEY", "SOL_RPC_URL", "SOL_WS_URL", "SOL_SKIP_PREFLIGHT",
     # db / timers
-    "SQLITE_DB", "SLEEP_SECONDS", "DISCOVERY_INTERVAL", "VALIDATION_BATCH_SIZE",
+    "DATA_DIR", "SQLITE_DB", "SLEEP_SECONDS", "DISCOVERY_INTERVAL", "VALIDATION_BATCH_SIZE",
+    "PROCESSED_TTL_H", "PENDING_CAPACITY", "PENDING_MAX_AGE_S", "REJECT_BACKOFF_S",
+    "SIGNAL_CACHE_TTL_S",
     # filtros
     "MAX_AGE_DAYS", "MIN_HOLDERS", "MIN_LIQUIDITY_USD", "MIN_VOL_USD_24H",
-    "MAX_24H_VOLUME", "MIN_SCORE_TOTAL",
+    "MAX_24H_VOLUME", "MIN_SCORE_TOTAL", "RULES_FILE",
     # trading
     "TRADE_AMOUNT_SOL",
+    # feed de precios
+    "PRICE_FEED_MODE", "PRICE_POLL_SECONDS",
+    # pumpfun
+    "PUMPFUN_STREAM", "PUMPFUN_QUEUE_MAX", "PUMPFUN_MAX_AGE_S",
+    # insiders
+    "INSIDER_SOURCE",
+    # json
+    "JSON_BACKEND",
+    # tape
+    "TAPE_RECORD", "TAPE_FILE",
+    # métricas
+    "METRICS_PORT", "METRICS_HOST",
+    # trazas
+    "TRACE_ENABLED", "TRACE_FILE",
+    # event loop
+    "LOOP_MONITOR", "LOOP_STALL_MS", "LOOP_PROFILE_S", "LOOP_PROFILE_INTERVAL_MS",
+    # logging
+    "LOG_LEVEL", "LOG_FORMAT", "LOG_LEVELS", "LOG_RATE", "LOG_QUEUE_MAX",
+    # event loop
+    "EVENT_LOOP",
+    # estrategias en sombra
+    "SHADOW_FILE", "SHADOW_RESOLVE",
+    # registro de evaluaciones
+    "EVAL_LOG", "EVAL_LOG_DIR", "EVAL_LOG_FLUSH", "EVAL_LOG_MAX_DAYS", "EVAL_LOG_MAX_MB",
 ]
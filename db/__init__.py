@@ -3,10 +3,37 @@ Sub-paquete de persistencia.
 
 Importar así:
 
-    from memebot2.db import async_init_db, SessionLocal, Token, Position
+    from memebot2.db import async_init_db, SessionLocal, Token, Position, SignalCache
+    from memebot2.db import TokenCandidate      # token en vuelo (no es tabla)
 """
 
-from .database import async_init_db, SessionLocal, Base  # noqa: F401
-from .models import Token, Position                      # noqa: F401
+from __future__ import annotations
 
-__all__ = ["async_init_db", "SessionLocal", "Base", "Token", "Position"]
+from importlib import import_module
+from typing import Any
+
+# nombre exportado → sub-módulo (se importa al primer acceso: `candidate`
+# no arrastra SQLAlchemy hasta que hace falta una fila ORM)
+_exports = {
+    "async_init_db": "database",
+    "SessionLocal": "database",
+    "Base": "database",
+    "Token": "models",
+    "Position": "models",
+    "SignalCache": "models",
+    "ShadowPosition": "models",
+    "TokenCandidate": "candidate",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _exports:
+        value = globals()[name] = getattr(import_module(f"{__name__}.{_exports[name]}"), name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_exports})
@@ -0,0 +1,108 @@
+# memebot2/db/candidate.py
+"""
+Token en vuelo por el pipeline (no es tabla).
+
+`TokenCandidate` es lo que devuelven `dexscreener.get_pair` y el stream de
+Pump Fun y lo que recorren filtros, scoring y compra: un dataclass con
+`__slots__` (sin dict por instancia, los campos mal escritos fallan con
+AttributeError) que se va completando en sitio — no hay copias por etapa.
+
+• Señales aún no calculadas = None (las reglas usan su `default`).
+• `symbol`, `discovered_via` se internan: miles de candidatos comparten
+  las mismas cadenas.
+• `to_token()` / `to_position()` lo convierten a las filas ORM (los
+  modelos se importan ahí: el resto del módulo no carga SQLAlchemy).
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import sys
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .models import Position, Token
+
+
+def _utcnow() -> _dt.datetime:
+    return _dt.datetime.utcnow()
+
+
+@dataclass(slots=True, eq=False)
+class TokenCandidate:
+    address: str
+    created_at: _dt.datetime
+    symbol: str = ""
+    name: str = ""
+    pair_address: Optional[str] = None
+
+    # ——— mercado ———
+    price_usd: float = 0.0
+    liquidity: float = 0.0
+    vol24h: float = 0.0
+    holders: int = 0
+    txns_last_5min: int = 0
+
+    # ——— señales (None = sin calcular) ———
+    rug_score: Optional[int] = None
+    cluster_bad: Optional[bool] = None
+    social_ok: Optional[bool] = None
+    insider_sig: Optional[bool] = None
+    trend: Optional[str] = None
+    score_total: int = 0
+
+    # ——— descubrimiento ———
+    discovered_via: str = "dexscreener"
+    discovered_at: _dt.datetime = field(default_factory=_utcnow)
+
+    def __post_init__(self) -> None:
+        self.symbol = sys.intern(self.symbol)
+        self.discovered_via = sys.intern(self.discovered_via)
+
+    @property
+    def label(self) -> str:
+        """Símbolo o, si no hay, prefijo de la dirección (para logs)."""
+        return self.symbol or self.address[:4]
+
+    # ───────────────────────── conversión ORM ──────────────────
+    def to_token(self) -> Token:
+        from .models import Token
+
+        return Token(
+            address=self.address,
+            symbol=self.symbol or None,
+            name=self.name or None,
+            created_at=self.created_at,
+            liquidity=self.liquidity,
+            vol24h=self.vol24h,
+            holders=self.holders,
+            rug_score=self.rug_score or 0,
+            cluster_bad=bool(self.cluster_bad),
+            social_ok=bool(self.social_ok),
+            trend=self.trend,
+            insider_sig=bool(self.insider_sig),
+            score_total=self.score_total,
+            discovered_via=self.discovered_via,
+            discovered_at=self.discovered_at,
+        )
+
+    def to_position(
+        self,
+        qty: float,
+        buy_price_usd: float,
+        opened_at: Optional[_dt.datetime] = None,
+    ) -> Position:
+        from .models import Position
+
+        return Position(
+            address=self.address,
+            symbol=self.symbol or None,
+            qty=qty,
+            buy_price_usd=buy_price_usd,
+            opened_at=opened_at or _utcnow(),
+            highest_pnl_pct=0.0,
+        )
+
+
+FIELDS: frozenset[str] = frozenset(f.name for f in fields(TokenCandidate))
@@ -2,8 +2,10 @@
 """
 Declaración de tablas SQLAlchemy (async).
 
-• Token     – metadata y señales de cada par evaluado
-• Position  – posiciones abiertas/cerradas por el bot
+• Token        – metadata y señales de cada par evaluado
+• Position     – posiciones abiertas/cerradas por el bot
+• SignalCache  – resultado de cada proveedor externo por token (caché)
+• ShadowPosition – posiciones virtuales de las estrategias en sombra
 """
 
 from __future__ import annotations
@@ -85,3 +87,40 @@ class Position(Base):
     def __repr__(self) -> str:  # pragma: no cover
         state = "closed" if self.closed else "open"
         return f"<Position {self.symbol or self.address[:4]} qty={self.qty} {state}>"
+
+
+class SignalCache(Base):
+    __tablename__ = "signal_cache"
+
+    address: Mapped[str] = mapped_column(String, primary_key=True)
+    signal: Mapped[str] = mapped_column(String(16), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=1)
+    value: Mapped[str] = mapped_column(String)             # JSON
+    fetched_at: Mapped[_dt.datetime] = mapped_column(DateTime, index=True)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<SignalCache {self.signal} {self.address[:4]} v{self.version}>"
+
+
+class ShadowPosition(Base):
+    __tablename__ = "shadow_positions"
+
+    strategy: Mapped[str] = mapped_column(String(32), primary_key=True)
+    address: Mapped[str] = mapped_column(String, primary_key=True)
+    opened_at: Mapped[_dt.datetime] = mapped_column(DateTime, primary_key=True)
+
+    symbol: Mapped[Optional[str]] = mapped_column(String(16))
+    score: Mapped[int] = mapped_column(Integer, default=0)
+    buy_price_usd: Mapped[float] = mapped_column(Float)
+    highest_pnl_pct: Mapped[float] = mapped_column(Float, default=0.0)
+
+    # ——— cierre ———
+    closed: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    closed_at: Mapped[Optional[_dt.datetime]] = mapped_column(DateTime)
+    close_price_usd: Mapped[Optional[float]] = mapped_column(Float)
+    pnl_pct: Mapped[Optional[float]] = mapped_column(Float)
+    reason: Mapped[Optional[str]] = mapped_column(String(16))
+
+    def __repr__(self) -> str:  # pragma: no cover
+        state = "closed" if self.closed else "open"
+        return f"<ShadowPosition {self.strategy} {self.symbol or self.address[:4]} {state}>"
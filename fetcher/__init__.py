@@ -6,9 +6,10 @@ Agrupa los wrappers de APIs externas para poder hacer:
 `__all__` expone sólo los módulos públicos.
 """
 
+from __future__ import annotations
+
 from importlib import import_module
 from types import ModuleType
-from typing import Dict
 
 _modules = (
     "dexscreener",
@@ -16,10 +17,21 @@ _modules = (
     "rugcheck",
     "pumpfun",
     "socials",
+    "price_feed",
+    "signal_cache",
+    "pair_index",
 )
 
-globals_: Dict[str, ModuleType] = globals()
-for _m in _modules:
-    globals_[_m] = import_module(f"{__name__}.{_m}")
-
 __all__ = list(_modules)
+
+
+def __getattr__(name: str) -> ModuleType:
+    # PEP 562: el sub-módulo se importa la primera vez que se pide
+    if name in _modules:
+        mod = globals()[name] = import_module(f"{__name__}.{name}")
+        return mod
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_modules})
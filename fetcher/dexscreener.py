@@ -1,62 +1,101 @@
 # memebot2/fetcher/dexscreener.py
 """
-Wrapper minimal de la API DexScreener → dict normalizado.
+Wrapper minimal de la API DexScreener → `TokenCandidate`.
 
-Devuelve `None` si el par no existe o falla los filtros rápidos
-(antigüedad superior a MAX_AGE_DAYS).
+Devuelve `None` sólo si el par no existe (o no se puede leer).  La
+antigüedad no se filtra aquí: la regla `age_days` de rules.json la
+rechaza como fallo duro, sin re-evaluaciones.  Sólo se reintenta ante
+429/5xx o errores de red; un 4xx devuelve `None` a la primera.
 """
 
 from __future__ import annotations
 
+import asyncio
 import datetime as _dt
 
 import aiohttp
 import pytz
 import tenacity
 
-from ..config import DEX_API_BASE, MAX_AGE_DAYS
+from ..config import DEX_API_BASE
+from ..db.candidate import TokenCandidate
+from ..utils import fastjson
+from . import pair_index
 
 PAIR_URL = f"{DEX_API_BASE.rstrip('/')}/latest/dex/pairs/solana"
+TOKENS_URL = f"{DEX_API_BASE.rstrip('/')}/latest/dex/tokens"
 
 
-@tenacity.retry(wait=tenacity.wait_fixed(2), stop=tenacity.stop_after_attempt(3))
-async def get_pair(pair_id: str) -> dict | None:
-    async with aiohttp.ClientSession() as s:
-        async with s.get(f"{PAIR_URL}/{pair_id}") as r:
-            if r.status == 404:
-                return None
-            r.raise_for_status()
-            data = await r.json()
+class _Retryable(Exception):
+    """429 / 5xx: merece reintento (un 4xx no va a cambiar)."""
 
-    # DexScreener puede devolver {"pair": {…}} o {"pairs": [{…}]}
-    pair_data = (
-        data.get("pair")
-        or (data.get("pairs")[0] if data.get("pairs") else None)
-    )
-    if not pair_data:
-        return None
 
-    created_ts = int(pair_data["pairCreatedAt"]) / 1000
-    age_days = (
-        _dt.datetime.utcnow() - _dt.datetime.utcfromtimestamp(created_ts)
-    ).days
-    if age_days > MAX_AGE_DAYS:
-        return None
+@tenacity.retry(
+    retry=tenacity.retry_if_exception_type(
+        (_Retryable, aiohttp.ClientConnectionError, asyncio.TimeoutError)
+    ),
+    wait=tenacity.wait_fixed(2),
+    stop=tenacity.stop_after_attempt(3),
+    reraise=True,
+)
+async def _get_json(s: aiohttp.ClientSession, url: str) -> dict | None:
+    async with s.get(url) as r:
+        if r.status == 429 or r.status >= 500:
+            raise _Retryable(f"{r.status} {url}")
+        if r.status >= 400:
+            return None
+        return await fastjson.read_json(r)
 
-    return {
-        "address": pair_data["baseToken"]["address"],
-        "symbol": pair_data["baseToken"]["symbol"],
-        "name": pair_data["baseToken"]["name"],
-        "created_at": _dt.datetime.utcfromtimestamp(created_ts).replace(
+
+def _normalize(pair_data: dict) -> TokenCandidate:
+    created_ts = int(pair_data["pairCreatedAt"]) / 1000
+    return TokenCandidate(
+        address=pair_data["baseToken"]["address"],
+        pair_address=pair_data.get("pairAddress"),
+        symbol=pair_data["baseToken"]["symbol"],
+        name=pair_data["baseToken"]["name"],
+        created_at=_dt.datetime.utcfromtimestamp(created_ts).replace(
             tzinfo=pytz.UTC
         ),
-        "vol24h": float(pair_data["volume"]["usd"]),
-        "liquidity": float(pair_data.get("liquidity", {}).get("usd", 0.0)),
-        "holders": int(
+        vol24h=float(pair_data["volume"]["usd"]),
+        liquidity=float(pair_data.get("liquidity", {}).get("usd", 0.0)),
+        holders=int(
             pair_data["txns"]["h24"]["buys"]
             + pair_data["txns"]["h24"]["sells"]
         ),
-        "txns_last_5min": int(pair_data["txns"].get("m5", {}).get("buys", 0)),
+        txns_last_5min=int(pair_data["txns"].get("m5", {}).get("buys", 0)),
         # precio spot (USD) por comodidad de la lógica de salidas
-        "price_usd": float(pair_data.get("priceUsd") or 0),
-    }
+        price_usd=float(pair_data.get("priceUsd") or 0),
+    )
+
+
+async def get_pair(pair_id: str) -> TokenCandidate | None:
+    """
+    `pair_id` es normalmente el mint: se traduce a su par principal con
+    `pair_index` (una sola petición al endpoint de pares).  Si el mint no
+    está indexado o su entrada caducó, se resuelve con el endpoint de
+    tokens (todos sus pools en la misma respuesta) y se indexa.
+    """
+    async with aiohttp.ClientSession() as s:
+        pair = pair_index.lookup(pair_id)
+        if pair is None:
+            data = await _get_json(s, f"{TOKENS_URL}/{pair_id}")
+            pairs = (data or {}).get("pairs") or []
+            pair_index.note_pairs(pairs, authoritative=True)
+            best = pair_index.primary(pairs, pair_id)
+            if best is not None:
+                return _normalize(best)
+            pair = pair_id              # quizá ya es la dirección de un par
+        data = await _get_json(s, f"{PAIR_URL}/{pair}")
+    if not data:
+        return None
+
+    # DexScreener puede devolver {"pair": {…}} o {"pairs": [{…}]}
+    pair_data = (
+        data.get("pair")
+        or (data.get("pairs")[0] if data.get("pairs") else None)
+    )
+    if not pair_data:
+        return None
+    pair_index.note_pairs([pair_data])
+    return _normalize(pair_data)
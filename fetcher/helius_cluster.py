@@ -1,59 +1,267 @@
 # memebot2/fetcher/helius_cluster.py
 # ------------------------------------------------------------------
 # Replacement for BubbleMaps: returns cluster_bad = True|False
+#
+# Holder distribution is tracked per token (HolderTracker):
+#   • each refresh applies only the holder rows that changed since the
+#     previous snapshot to a sorted balance book (bisect),
+#   • concentration = top-N share of the *real* supply (getTokenSupply),
+#     plus Gini of the visible holders and the change since last snapshot,
+#   • watched tokens (open positions) are refreshed in the background
+#     on a schedule proportional to their activity (price ticks);
+#     other tokens are served from their snapshot and only fetched when
+#     they have none or it is older than REFRESH_MAX_S.
 # ------------------------------------------------------------------
 
 from __future__ import annotations
 
-import aiohttp
+import asyncio
+import bisect
 import logging
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+import aiohttp
 
-from ..config import HELIUS_API_BASE, HELIUS_API_KEY
+from ..config import HELIUS_API_BASE, HELIUS_API_KEY, SOL_RPC_URL
+from ..utils import fastjson
 
 # ---------- Tuning ----------
 MAX_SHARE_TOP10 = 0.20          # 20 % of total supply
+MAX_SHARE_JUMP = 0.05           # +5 pp of top-N share between snapshots
 TOP_N = 10                      # how many holders to sum
+HOLDERS_LIMIT = 100             # holder rows per refresh
 TIMEOUT = 10                    # seconds
+REFRESH_MIN_S = 30              # busiest watched token
+REFRESH_MAX_S = 900             # idle token / max snapshot age
+ACTIVITY_REF = 10.0             # events/min that halve the refresh interval
+SUPPLY_REFRESH_S = 3600         # supply barely moves (burns)
+MAX_TRACKED = 5000              # unwatched snapshots kept (LRU)
+MAX_CONCURRENCY = 4             # background refreshes in flight
 # -----------------------------------------------------------------
 
+log = logging.getLogger("helius")
+
+
+class HolderSnapshot(NamedTuple):
+    ts: float                   # time.monotonic() of the refresh
+    supply: int                 # real supply (or sum of rows if unknown)
+    holders: int                # holder rows seen
+    top_share: float            # top-N / supply
+    gini: float                 # over visible holders
+    delta_top: float            # top_share - previous snapshot (0 first time)
+
+
+class _Book:
+    """Per-token state: balances by owner + the same values kept sorted."""
+
+    __slots__ = (
+        "balances", "ordered", "supply", "supply_ts", "snap",
+        "events", "events_since", "next_due", "refreshing",
+    )
+
+    def __init__(self) -> None:
+        self.balances: Dict[str, int] = {}
+        self.ordered: list[int] = []
+        self.supply = 0
+        self.supply_ts = 0.0
+        self.snap: Optional[HolderSnapshot] = None
+        self.events = 0
+        self.events_since = time.monotonic()
+        self.next_due = 0.0
+        self.refreshing: Optional[asyncio.Task] = None
+
+    def apply(self, rows: Dict[str, int]) -> int:
+        """Apply the diff against the previous rows. Returns rows changed."""
+        changed = 0
+        for owner in self.balances.keys() - rows.keys():
+            self._move(self.balances.pop(owner), None)
+            changed += 1
+        for owner, amount in rows.items():
+            old = self.balances.get(owner)
+            if old != amount:
+                self._move(old, amount)
+                self.balances[owner] = amount
+                changed += 1
+        return changed
+
+    def _move(self, old: Optional[int], new: Optional[int]) -> None:
+        if old is not None:
+            del self.ordered[bisect.bisect_left(self.ordered, old)]
+        if new is not None:
+            bisect.insort(self.ordered, new)
+
+    def metrics(self, now: float) -> HolderSnapshot:
+        xs = self.ordered
+        n, total = len(xs), sum(xs)
+        supply = self.supply or total
+        top_share = sum(xs[-TOP_N:]) / supply if supply else 0.0
+        # Gini on ascending values: 2·Σ i·x_i / (n·Σx) − (n+1)/n
+        gini = (
+            2 * sum(i * x for i, x in enumerate(xs, 1)) / (n * total) - (n + 1) / n
+            if n and total else 0.0
+        )
+        prev = self.snap.top_share if self.snap else top_share
+        return HolderSnapshot(now, supply, n, top_share, gini, top_share - prev)
+
+    def rate_per_min(self, now: float) -> float:
+        elapsed = max(now - self.events_since, 1.0)
+        return self.events * 60.0 / elapsed
+
+
+class HolderTracker:
+    def __init__(self) -> None:
+        self._books: "OrderedDict[str, _Book]" = OrderedDict()
+        self._watched: set[str] = set()
+        self._sem = asyncio.Semaphore(MAX_CONCURRENCY)
+        self.stats = {"refresh": 0, "served": 0, "rows_changed": 0, "errors": 0}
+
+    # ---------- watch list ----------
+    def watch(self, mint: str) -> None:
+        self._watched.add(mint)
+        self._book(mint)
+
+    def unwatch(self, mint: str) -> None:
+        self._watched.discard(mint)
+
+    def touch(self, mint: str, n: int = 1) -> None:
+        """Activity signal (price tick, swap…) that speeds up refreshes."""
+        book = self._books.get(mint)
+        if book is not None:
+            book.events += n
+
+    def snapshot(self, mint: str) -> Optional[HolderSnapshot]:
+        book = self._books.get(mint)
+        return book.snap if book else None
+
+    def _book(self, mint: str) -> _Book:
+        book = self._books.get(mint)
+        if book is None:
+            book = self._books[mint] = _Book()
+            if len(self._books) > MAX_TRACKED:
+                for old in list(self._books):
+                    if old not in self._watched:
+                        del self._books[old]
+                        break
+        else:
+            self._books.move_to_end(mint)
+        return book
+
+    def _interval(self, book: _Book, now: float) -> float:
+        rate = book.rate_per_min(now)
+        return max(REFRESH_MIN_S, REFRESH_MAX_S / (1.0 + rate / ACTIVITY_REF))
+
+    # ---------- HTTP ----------
+    async def _fetch_holders(self, s: aiohttp.ClientSession, mint: str) -> Optional[Dict[str, int]]:
+        url = (
+            f"{HELIUS_API_BASE}/v0/token/{mint}/holders"
+            f"?limit={HOLDERS_LIMIT}&api-key={HELIUS_API_KEY}"
+        )
+        async with s.get(url, timeout=TIMEOUT) as r:
+            if r.status != 200:
+                log.warning("[Helius] %s %s", r.status, await r.text())
+                return None
+            data = await fastjson.read_json(r)
+        rows: Dict[str, int] = {}
+        for i, h in enumerate(data or ()):
+            owner = h.get("owner") or h.get("address") or str(i)
+            rows[owner] = rows.get(owner, 0) + int(h["amountRaw"])
+        return rows
+
+    async def _fetch_supply(self, s: aiohttp.ClientSession, mint: str) -> int:
+        body = {"jsonrpc": "2.0", "id": 1, "method": "getTokenSupply", "params": [mint]}
+        try:
+            async with s.post(SOL_RPC_URL, json=body, timeout=TIMEOUT) as r:
+                data = await fastjson.read_json(r)
+            return int(data["result"]["value"]["amount"])
+        except Exception as e:
+            log.debug("[Helius] supply %s: %s", mint[:4], e)
+            return 0
+
+    async def _refresh(self, mint: str, book: _Book) -> Optional[HolderSnapshot]:
+        book.next_due = time.monotonic() + REFRESH_MIN_S     # retry pace on failure
+        async with self._sem, aiohttp.ClientSession() as s:
+            try:
+                rows = await self._fetch_holders(s, mint)
+                now = time.monotonic()
+                if rows and (not book.supply or now - book.supply_ts > SUPPLY_REFRESH_S):
+                    book.supply = await self._fetch_supply(s, mint) or book.supply
+                    book.supply_ts = now
+            except Exception as e:
+                self.stats["errors"] += 1
+                log.warning("[Helius] error %s", e)
+                return book.snap
+        if not rows:
+            return book.snap
+
+        self.stats["refresh"] += 1
+        self.stats["rows_changed"] += book.apply(rows)
+        now = time.monotonic()
+        book.snap = book.metrics(now)
+        book.next_due = now + self._interval(book, now)
+        book.events, book.events_since = 0, now
+        log.debug(
+            "[Helius] %s top%s %.2f%% (Δ%+.2f) gini %.2f next %.0fs",
+            mint[:4], TOP_N, book.snap.top_share * 100,
+            book.snap.delta_top * 100, book.snap.gini, book.next_due - now,
+        )
+        return book.snap
+
+    async def refresh(self, mint: str) -> Optional[HolderSnapshot]:
+        """Refresh now (one request in flight per token)."""
+        book = self._book(mint)
+        if book.refreshing is None:
+            book.refreshing = asyncio.ensure_future(self._refresh(mint, book))
+            book.refreshing.add_done_callback(lambda _t, b=book: setattr(b, "refreshing", None))
+        return await asyncio.shield(book.refreshing)
+
+    async def get(self, mint: str) -> Optional[HolderSnapshot]:
+        """Snapshot if recent enough, otherwise refresh."""
+        book = self._books.get(mint)
+        if book and book.snap and time.monotonic() - book.snap.ts < REFRESH_MAX_S:
+            self.stats["served"] += 1
+            self._books.move_to_end(mint)
+            return book.snap
+        return await self.refresh(mint)
+
+    async def run(self) -> None:
+        """Background refresh of watched tokens when they come due."""
+        if not HELIUS_API_KEY or not HELIUS_API_BASE:
+            return
+        while True:
+            now = time.monotonic()
+            due = [
+                m for m in self._watched
+                if (b := self._books.get(m)) is not None
+                and b.refreshing is None and b.next_due <= now
+            ]
+            for mint in due:
+                asyncio.ensure_future(self.refresh(mint))
+            await asyncio.sleep(1.0)
+
+
+tracker = HolderTracker()
+
 
 async def suspicious_cluster(token_mint: str) -> bool:
     """
-    True → too much supply in Top-10 holders (potential rug),
+    True → too much supply in Top-10 holders, or a sudden jump in their
+    share since the last snapshot (potential rug),
     False → distribution looks healthy.
     """
     if not HELIUS_API_KEY or not HELIUS_API_BASE:
         logging.debug("[Helius] disabled (no API key)")
         return False            # neutral
 
-    url = (
-        f"{HELIUS_API_BASE}/v0/token/{token_mint}/holders"
-        f"?limit=20&api-key={HELIUS_API_KEY}"
-    )
-
-    try:
-        async with aiohttp.ClientSession() as s:
-            async with s.get(url, timeout=TIMEOUT) as r:
-                if r.status != 200:
-                    logging.warning("[Helius] %s %s", r.status, await r.text())
-                    return False
-                data = await r.json()
-    except Exception as e:
-        logging.warning("[Helius] error %s", e)
+    snap = await tracker.get(token_mint)
+    if snap is None:
         return False
 
-    if not data:
-        return False
-
-    total_supply = sum(int(h["amountRaw"]) for h in data)
-    top_sum = sum(int(h["amountRaw"]) for h in data[:TOP_N])
-
-    share = top_sum / total_supply if total_supply else 0
-    cluster_bad = share > MAX_SHARE_TOP10
-
+    cluster_bad = snap.top_share > MAX_SHARE_TOP10 or snap.delta_top > MAX_SHARE_JUMP
     logging.debug(
         "[Helius] share_top10 %.2f%% -> cluster_bad=%s",
-        share * 100,
+        snap.top_share * 100,
         cluster_bad,
     )
     return cluster_bad
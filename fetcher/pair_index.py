@@ -0,0 +1,151 @@
+# memebot2/fetcher/pair_index.py
+"""
+Índice persistente mint → par principal (pool con más liquidez).
+
+• Se alimenta de cualquier respuesta de DexScreener que traiga pares
+  (`note_pairs`): descubrimiento, `/latest/dex/tokens/{mints}` y las
+  consultas de `get_pair`.
+• Ante varios pools del mismo mint gana el de mayor liquidez USD; si la
+  liquidez se mueve a otro pool, el siguiente refresco lo cambia.
+• Una entrada con más de REFRESH_S se considera caducada: `get_pair`
+  vuelve a resolver por mint (todos sus pools) en lugar de ir directo al
+  par guardado.
+
+Persistido en DATA_DIR/pair_index.json (volcado cada SAVE_EVERY cambios y a
+la salida del proceso).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from ..config import DATA_DIR
+
+log = logging.getLogger("pair_index")
+
+STORE_FILE = DATA_DIR / "pair_index.json"
+REFRESH_S = 600                 # re-resolver el par principal cada 10 min
+SAVE_EVERY = 100                # cambios entre volcados
+MAX_ENTRIES = 50_000            # al superarlo se olvidan los más antiguos
+
+
+class PairEntry(NamedTuple):
+    pair: str
+    liquidity: float
+    updated: float              # epoch s de la última confirmación
+
+
+_index: dict[str, PairEntry] = {}
+_dirty = 0
+stats = {"hit": 0, "stale": 0, "miss": 0, "moved": 0}
+
+
+# ───────────────────────── persistencia ────────────────────────
+def _load() -> None:
+    try:
+        data = json.loads(STORE_FILE.read_text())
+    except (OSError, ValueError):
+        return
+    for mint, e in data.items():
+        _index[mint] = PairEntry(*e)
+
+
+def save() -> None:
+    global _dirty
+    if len(_index) > MAX_ENTRIES:
+        for mint, _ in sorted(_index.items(), key=lambda kv: kv[1].updated)[: len(_index) - MAX_ENTRIES]:
+            del _index[mint]
+    try:
+        STORE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = STORE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_index))
+        tmp.replace(STORE_FILE)
+        _dirty = 0
+    except OSError as e:
+        log.warning("[pair_index] no se pudo guardar: %s", e)
+
+
+_load()
+atexit.register(lambda: _dirty and save())
+
+
+# ───────────────────────── API pública ─────────────────────────
+def lookup(mint: str, max_age: float = REFRESH_S) -> Optional[str]:
+    """Par principal conocido y vigente de `mint` (None → resolver por mint)."""
+    e = _index.get(mint)
+    if e is None:
+        stats["miss"] += 1
+        return None
+    if time.time() - e.updated > max_age:
+        stats["stale"] += 1
+        return None
+    stats["hit"] += 1
+    return e.pair
+
+
+def record(mint: str, pair: str, liquidity: float, authoritative: bool = False) -> None:
+    """
+    Anota un pool de `mint`.  Sustituye al actual si es el mismo pool, si
+    tiene más liquidez o si `authoritative` (la respuesta incluía todos
+    los pools del mint y éste era el mejor).
+    """
+    global _dirty
+    now = time.time()
+    cur = _index.get(mint)
+    if cur is not None and cur.pair != pair and not authoritative and liquidity <= cur.liquidity:
+        return
+    if cur is not None and cur.pair != pair:
+        stats["moved"] += 1
+        log.debug("[pair_index] %s: %s → %s", mint[:4], cur.pair[:6], pair[:6])
+    # sólo una respuesta con todos los pools "confirma" la entrada
+    updated = cur.updated if cur is not None and cur.pair == pair and not authoritative else now
+    _index[mint] = PairEntry(pair, liquidity, updated)
+    _dirty += 1
+    if _dirty >= SAVE_EVERY:
+        save()
+
+
+def _liq(p: dict) -> float:
+    try:
+        return float((p.get("liquidity") or {}).get("usd") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def primary(pairs: Iterable[dict], mint: str) -> Optional[dict]:
+    """De una lista de pares DexScreener, el de más liquidez cuyo base es `mint`."""
+    best = None
+    for p in pairs:
+        if (p.get("baseToken") or {}).get("address") != mint or not p.get("pairAddress"):
+            continue
+        if best is None or _liq(p) > _liq(best):
+            best = p
+    return best
+
+
+def note_rows(
+    rows: Iterable[tuple[str, str, float]], authoritative: bool = False
+) -> None:
+    """Registra el par principal de cada mint en filas (mint, par, liquidez)."""
+    best: dict[str, tuple[str, float]] = {}
+    for mint, pair, liq in rows:
+        if mint not in best or liq > best[mint][1]:
+            best[mint] = (pair, liq)
+    for mint, (pair, liq) in best.items():
+        record(mint, pair, liq, authoritative)
+
+
+def note_pairs(pairs: Iterable[dict], authoritative: bool = False) -> None:
+    """Registra el par principal de cada mint presente en `pairs` (dicts)."""
+    note_rows((
+        (p["baseToken"]["address"], p["pairAddress"], _liq(p))
+        for p in pairs
+        if isinstance(p, dict)
+        and (p.get("baseToken") or {}).get("address")
+        and p.get("pairAddress")
+        and p.get("chainId", "solana") == "solana"
+    ), authoritative)
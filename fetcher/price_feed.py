@@ -0,0 +1,410 @@
+# memebot2/fetcher/price_feed.py
+"""
+Feed de precios para la lógica de salidas.
+
+Dos implementaciones con la misma interfaz (`PriceFeed`):
+
+• PollingPriceFeed – consulta `dexscreener.get_pair` cada PRICE_POLL_SECONDS
+  para cada token suscrito (comportamiento histórico del bot).
+• StreamPriceFeed  – `accountSubscribe` vía WebSocket RPC de Solana sobre la
+  cuenta del pool; cada cambio de reservas genera un tick al instante.
+  Si el stream cae (o el pool no es decodificable) el token pasa a
+  polling hasta que la suscripción se recupera.
+
+Los consumidores leen ticks con `await feed.next_tick()` y consultan el
+último precio conocido con `feed.latest(address)`.
+
+El precio que llega por WebSocket está en SOL (reservas del pool); se
+convierte a USD con un factor anclado en la última cotización DexScreener
+del mismo token, así las salidas siguen comparando contra `buy_price_usd`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import itertools
+import logging
+import struct
+import time
+from statistics import median
+from typing import Callable, Dict, NamedTuple, Optional
+
+import aiohttp
+
+from ..config import PRICE_FEED_MODE, PRICE_POLL_SECONDS, SOL_RPC_URL, SOL_WS_URL
+from ..db.candidate import TokenCandidate
+from ..utils import fastjson
+from . import dexscreener
+
+log = logging.getLogger("price_feed")
+
+PUMPFUN_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+QUEUE_MAX = 1_000              # ticks pendientes antes de descartar los viejos
+RECONNECT_MAX_S = 30           # back-off máximo entre reconexiones
+
+
+class PriceTick(NamedTuple):
+    address: str
+    price_usd: float
+    ts: float                  # time.monotonic() en la recepción
+    source: str                # "ws" | "poll"
+
+
+# ───────────────────────── métricas de latencia ────────────────
+class LatencyTracker:
+    """Latencia tick → decisión de salida, separada por origen del tick."""
+
+    def __init__(self, keep: int = 1_000) -> None:
+        self._keep = keep
+        self._samples: Dict[str, list[float]] = {}
+
+    def record(self, source: str, seconds: float) -> None:
+        buf = self._samples.setdefault(source, [])
+        buf.append(seconds)
+        if len(buf) > self._keep:
+            del buf[: len(buf) - self._keep]
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for source, buf in self._samples.items():
+            if not buf:
+                continue
+            ordered = sorted(buf)
+            out[source] = {
+                "n": len(ordered),
+                "p50_ms": round(median(ordered) * 1000, 2),
+                "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return out
+
+
+# ───────────────────────── interfaz base ───────────────────────
+class PriceFeed:
+    """Interfaz común.  Subclases implementan `start()` / `close()`."""
+
+    mode = "base"
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[PriceTick] = asyncio.Queue(maxsize=QUEUE_MAX)
+        self._latest: Dict[str, PriceTick] = {}
+        self._pools: Dict[str, Optional[str]] = {}
+        self.latency = LatencyTracker()
+
+    # ── suscripciones ──
+    def subscribe(self, address: str, pool: str | None = None) -> None:
+        if address not in self._pools or (pool and not self._pools[address]):
+            self._pools[address] = pool
+
+    def unsubscribe(self, address: str) -> None:
+        self._pools.pop(address, None)
+        self._latest.pop(address, None)
+
+    def subscribed(self) -> list[str]:
+        return list(self._pools)
+
+    # ── lectura ──
+    def latest(self, address: str) -> PriceTick | None:
+        return self._latest.get(address)
+
+    async def next_tick(self, timeout: float | None = None) -> PriceTick | None:
+        """Siguiente tick o None si vence `timeout`."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _emit(self, address: str, price_usd: float, source: str) -> None:
+        tick = PriceTick(address, price_usd, time.monotonic(), source)
+        self._latest[address] = tick
+        if self._queue.full():                 # preferimos el dato fresco
+            self._queue.get_nowait()
+        self._queue.put_nowait(tick)
+
+    # ── ciclo de vida ──
+    async def start(self) -> None:  # pragma: no cover - interfaz
+        raise NotImplementedError
+
+    async def close(self) -> None:  # pragma: no cover - interfaz
+        raise NotImplementedError
+
+
+# ───────────────────────── polling HTTP ────────────────────────
+class PollingPriceFeed(PriceFeed):
+    mode = "poll"
+
+    def __init__(self, interval: float = PRICE_POLL_SECONDS) -> None:
+        super().__init__()
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def _poll_targets(self) -> list[str]:
+        return self.subscribed()
+
+    async def _poll_once(self, address: str) -> None:
+        try:
+            pair = await dexscreener.get_pair(address)
+        except Exception as e:  # tenacity.RetryError incluido
+            log.debug("[feed] poll %s error: %s", address[:4], e)
+            return
+        if pair and pair.price_usd:
+            self._on_poll(address, pair)
+
+    def _on_poll(self, address: str, pair: TokenCandidate) -> None:
+        self._emit(address, pair.price_usd, "poll")
+
+    async def _run(self) -> None:
+        while True:
+            targets = self._poll_targets()
+            if targets:
+                await asyncio.gather(*(self._poll_once(a) for a in targets))
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="price-poll")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# ───────────────────────── stream WebSocket ────────────────────
+def decode_bonding_curve(data: bytes) -> float | None:
+    """
+    Precio (SOL por token) desde la cuenta *bonding curve* de Pump Fun.
+
+    Layout: 8 bytes discriminador + u64 virtualTokenReserves +
+    u64 virtualSolReserves + … + bool complete (offset 48).
+    Devuelve None si la curva ya migró o los datos no cuadran.
+    """
+    if len(data) < 49 or data[48]:
+        return None
+    v_token, v_sol = struct.unpack_from("<QQ", data, 8)
+    if not v_token:
+        return None
+    return (v_sol / 1e9) / (v_token / 1e6)     # lamports / unidades (6 dec)
+
+
+def bonding_curve_address(mint: str) -> str | None:
+    """PDA de la bonding curve de `mint` (None si solders no está disponible)."""
+    try:
+        from solders.pubkey import Pubkey
+    except ImportError:
+        return None
+    try:
+        pda, _ = Pubkey.find_program_address(
+            [b"bonding-curve", bytes(Pubkey.from_string(mint))],
+            Pubkey.from_string(PUMPFUN_PROGRAM),
+        )
+    except ValueError:
+        return None
+    return str(pda)
+
+
+def rpc_ws_url() -> str:
+    """URL WebSocket del RPC: SOL_WS_URL o SOL_RPC_URL con esquema ws(s)."""
+    if SOL_WS_URL:
+        return SOL_WS_URL
+    return SOL_RPC_URL.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+
+
+class StreamPriceFeed(PollingPriceFeed):
+    """
+    Suscripción push al pool con fallback a polling.
+
+    `decoder` transforma los bytes de la cuenta en precio nativo (SOL);
+    por defecto entiende la bonding curve de Pump Fun.
+    """
+
+    mode = "ws"
+
+    def __init__(
+        self,
+        url: str | None = None,
+        decoder: Callable[[bytes], float | None] = decode_bonding_curve,
+        owner: str | None = PUMPFUN_PROGRAM,
+        interval: float = PRICE_POLL_SECONDS,
+    ) -> None:
+        super().__init__(interval)
+        self.url = url or rpc_ws_url()
+        self.decoder = decoder
+        self.owner = owner
+        self.connected = False
+        self._ids = itertools.count(1)
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._req: Dict[int, str] = {}          # request id → address
+        self._subs: Dict[int, str] = {}         # subscription id → address
+        self._sub_of: Dict[str, int] = {}       # address → subscription id
+        self._poll_only: set[str] = set()       # pools no decodificables
+        self._native: Dict[str, float] = {}     # último precio SOL
+        self._scale: Dict[str, float] = {}      # USD por unidad nativa
+        self._anchoring: Dict[str, asyncio.Task] = {}   # address → _anchor en curso
+        self._ws_task: asyncio.Task | None = None
+
+    # ── suscripciones ──
+    def subscribe(self, address: str, pool: str | None = None) -> None:
+        known = address in self._pools
+        super().subscribe(address, pool)
+        if not self._pools[address]:
+            self._pools[address] = bonding_curve_address(address)
+        if not self._pools[address]:
+            self._poll_only.add(address)
+        elif not known and self._ws is not None and not self._ws.closed:
+            asyncio.ensure_future(self._send_subscribe(address))
+
+    def unsubscribe(self, address: str) -> None:
+        sub = self._sub_of.pop(address, None)
+        if sub is not None:
+            self._subs.pop(sub, None)
+            if self._ws is not None and not self._ws.closed:
+                asyncio.ensure_future(self._ws.send_json({
+                    "jsonrpc": "2.0", "id": next(self._ids),
+                    "method": "accountUnsubscribe", "params": [sub],
+                }))
+        self._poll_only.discard(address)
+        self._native.pop(address, None)
+        self._scale.pop(address, None)
+        task = self._anchoring.pop(address, None)
+        if task is not None:
+            task.cancel()
+        super().unsubscribe(address)
+
+    # ── polling sólo donde el stream no llega ──
+    def _poll_targets(self) -> list[str]:
+        if not self.connected:
+            return self.subscribed()
+        return [a for a in self._pools if a in self._poll_only or a not in self._sub_of]
+
+    def _on_poll(self, address: str, pair: TokenCandidate) -> None:
+        native = self._native.get(address)
+        if native:
+            self._scale[address] = pair.price_usd / native
+        super()._on_poll(address, pair)
+
+    # ── WebSocket ──
+    async def _send_subscribe(self, address: str) -> None:
+        pool = self._pools.get(address)
+        if not pool or self._ws is None or self._ws.closed:
+            return
+        rid = next(self._ids)
+        self._req[rid] = address
+        await self._ws.send_json({
+            "jsonrpc": "2.0", "id": rid, "method": "accountSubscribe",
+            "params": [pool, {"encoding": "base64", "commitment": "processed"}],
+        })
+
+    async def _anchor(self, address: str) -> None:
+        """
+        Primer precio nativo sin factor USD → cotización DexScreener *nueva*
+        (`_on_poll` la empareja con `_native`; una cotización vieja no vale).
+        Corre como tarea aparte (ver `_start_anchor`): la petición HTTP no
+        frena los ticks del resto de suscripciones.
+        """
+        await self._poll_once(address)
+
+    def _start_anchor(self, address: str) -> None:
+        """Lanza `_anchor` si no hay uno en curso para `address`."""
+        if address in self._anchoring:
+            return
+        task = asyncio.create_task(self._anchor(address), name=f"anchor-{address[:8]}")
+        self._anchoring[address] = task
+
+        def _done(t: asyncio.Task) -> None:
+            if self._anchoring.get(address) is t:      # no otro más reciente
+                del self._anchoring[address]
+
+        task.add_done_callback(_done)
+
+    async def _on_notification(self, params: dict) -> None:
+        address = self._subs.get(params.get("subscription"))
+        if address is None:
+            return
+        value = params.get("result", {}).get("value") or {}
+        if self.owner and value.get("owner") not in (None, self.owner):
+            self._poll_only.add(address)
+            return
+        try:
+            raw = base64.b64decode(value["data"][0])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return
+        native = self.decoder(raw)
+        if not native:
+            self._poll_only.add(address)       # p.ej. curva ya migrada
+            return
+        self._poll_only.discard(address)
+        self._native[address] = native
+        if address not in self._scale:
+            self._start_anchor(address)
+            return                             # _anchor emitirá el tick
+        scale = self._scale.get(address)
+        if scale:
+            self._emit(address, native * scale, "ws")
+
+    async def _consume(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+                continue
+            data = fastjson.loads(msg.data)
+            if data.get("method") == "accountNotification":
+                await self._on_notification(data.get("params", {}))
+            elif "id" in data and data["id"] in self._req:
+                address = self._req.pop(data["id"])
+                if "result" in data and address in self._pools:
+                    self._subs[data["result"]] = address
+                    self._sub_of[address] = data["result"]
+                else:
+                    self._poll_only.add(address)
+
+    async def _run_ws(self) -> None:
+        delay = 1.0
+        async with aiohttp.ClientSession() as s:
+            while True:
+                try:
+                    async with s.ws_connect(self.url, heartbeat=20) as ws:
+                        self._ws = ws
+                        self.connected = True
+                        delay = 1.0
+                        log.info("[feed] stream conectado → %s", self.url)
+                        for address in self.subscribed():
+                            await self._send_subscribe(address)
+                        await self._consume(ws)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.warning("[feed] stream error: %s", e)
+                finally:
+                    self.connected = False
+                    self._ws = None
+                    self._req.clear()
+                    self._subs.clear()
+                    self._sub_of.clear()
+                log.warning("[feed] stream caído → polling; reintento en %.0fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_S)
+
+    async def start(self) -> None:
+        await super().start()
+        if self._ws_task is None:
+            self._ws_task = asyncio.create_task(self._run_ws(), name="price-ws")
+
+    async def close(self) -> None:
+        if self._ws_task is not None:
+            self._ws_task.cancel()
+            self._ws_task = None
+        for task in self._anchoring.values():
+            task.cancel()
+        self._anchoring.clear()
+        await super().close()
+
+
+# ───────────────────────── factoría ────────────────────────────
+def make_price_feed(mode: str = PRICE_FEED_MODE) -> PriceFeed:
+    """Instancia el feed según PRICE_FEED_MODE ("poll" | "ws")."""
+    if mode == "ws":
+        return StreamPriceFeed()
+    return PollingPriceFeed()
@@ -1,11 +1,293 @@
-# memebot2/fetcher/pumpfun.py   –  stub temporal «sin Pump Fun»
+# memebot2/fetcher/pumpfun.py
 """
-Pump Fun desactivado: el módulo devuelve siempre una lista vacía
-para que el orquestador siga funcionando sin errores de Bitquery.
+Ingesta en tiempo real de mints nuevos de Pump Fun.
+
+• `logsSubscribe` (mentions = programa Pump Fun) sobre el WebSocket RPC,
+  con reconexión y back-off exponencial.
+• Cada `CreateEvent` (log "Program data: …", evento Anchor) se decodifica
+  a `TokenCandidate` y se encola al instante.
+• Cola acotada (PUMPFUN_QUEUE_MAX): en ráfagas se descartan los eventos
+  más viejos; al desencolar se tiran los que superan PUMPFUN_MAX_AGE_S.
+• Anti-duplicados con LRU acotado (memoria constante).
+• Los `TradeEvent` (compras/ventas en la curva) se entregan, si hay
+  alguien escuchando, a `PumpFunStream.on_trade` (p.ej. el detector de
+  insiders); no pasan por la cola.
+
+Con PUMPFUN_STREAM=0 el módulo queda inerte y `get_latest_pumpfun()`
+devuelve [] como antes.
 """
 
-from typing import List
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import datetime as _dt
+import hashlib
+import itertools
+import logging
+import struct
+import time
+from collections import OrderedDict, deque
+from typing import Callable, List, Optional
+
+import aiohttp
+import base58
+
+from ..config import PUMPFUN_MAX_AGE_S, PUMPFUN_QUEUE_MAX, PUMPFUN_STREAM
+from ..db.candidate import TokenCandidate
+from ..utils import fastjson
+from .price_feed import PUMPFUN_PROGRAM, RECONNECT_MAX_S, rpc_ws_url
+
+log = logging.getLogger("pumpfun")
+
+CREATE_EVENT_DISC = hashlib.sha256(b"event:CreateEvent").digest()[:8]
+TRADE_EVENT_DISC = hashlib.sha256(b"event:TradeEvent").digest()[:8]
+_TRADE = struct.Struct("<QQ?32sqQ")        # tras disc + mint
+SEEN_MAX = 50_000               # mints recordados para deduplicar
+
+
+# ───────────────────────── decodificación ──────────────────────
+def _read_str(buf: bytes, off: int) -> tuple[str, int]:
+    (n,) = struct.unpack_from("<I", buf, off)
+    off += 4
+    return buf[off : off + n].decode("utf-8", "replace"), off + n
+
+
+def _read_key(buf: bytes, off: int) -> tuple[str, int]:
+    if len(buf) < off + 32:
+        raise ValueError("pubkey truncada")
+    return base58.b58encode(buf[off : off + 32]).decode(), off + 32
+
+
+def decode_create_event(payload: bytes) -> TokenCandidate | None:
+    """
+    `CreateEvent` → `TokenCandidate` (como `dexscreener.get_pair`).
+
+    Layout: disc(8) · name · symbol · uri (strings borsh) · mint ·
+    bondingCurve · user (pubkeys) · [creator · timestamp i64] (versiones
+    nuevas).  Las métricas de mercado aún no existen → 0.
+    """
+    if not payload.startswith(CREATE_EVENT_DISC):
+        return None
+    try:
+        off = 8
+        name, off = _read_str(payload, off)
+        symbol, off = _read_str(payload, off)
+        _uri, off = _read_str(payload, off)
+        mint, off = _read_key(payload, off)
+        curve, off = _read_key(payload, off)
+        _user, off = _read_key(payload, off)
+    except (struct.error, ValueError):
+        return None
+
+    now = _dt.datetime.utcnow()
+    created = now.replace(tzinfo=_dt.timezone.utc)
+    if len(payload) >= off + 40:                 # creator + timestamp
+        (ts,) = struct.unpack_from("<q", payload, off + 32)
+        if 0 < ts <= time.time() + 60:
+            created = _dt.datetime.fromtimestamp(ts, tz=_dt.timezone.utc)
+
+    return TokenCandidate(
+        address=mint,
+        pair_address=curve,
+        symbol=symbol[:16],
+        name=name[:64],
+        created_at=created,
+        discovered_via="pumpfun",
+        discovered_at=now,
+    )
+
+
+def decode_trade_event(payload: bytes) -> dict | None:
+    """
+    `TradeEvent` → dict(mint, sol_amount, token_amount, is_buy, user, ts,
+    virtual_sol_reserves).  Importes en lamports / unidades mínimas.
+
+    Layout: disc(8) · mint · solAmount u64 · tokenAmount u64 · isBuy ·
+    user · timestamp i64 · virtualSolReserves u64 · … (campos nuevos).
+    """
+    if not payload.startswith(TRADE_EVENT_DISC) or len(payload) < 40 + _TRADE.size:
+        return None
+    mint, off = _read_key(payload, 8)
+    sol, tokens, is_buy, user, ts, v_sol = _TRADE.unpack_from(payload, off)
+    return {
+        "mint": mint,
+        "sol_amount": sol,
+        "token_amount": tokens,
+        "is_buy": is_buy,
+        "user": base58.b58encode(user).decode(),
+        "ts": float(ts) if ts > 0 else time.time(),
+        "virtual_sol_reserves": v_sol,
+    }
+
+
+def _payloads(logs: list[str]):
+    for line in logs:
+        if not line.startswith("Program data: "):
+            continue
+        try:
+            yield base64.b64decode(line[14:])
+        except (binascii.Error, ValueError):
+            continue
+
+
+def _events_from_logs(logs: list[str]) -> list[TokenCandidate]:
+    return [tok for p in _payloads(logs) if (tok := decode_create_event(p))]
+
+
+# ───────────────────────── cliente stream ──────────────────────
+class PumpFunStream:
+    """Cliente `logsSubscribe` con cola acotada y descarte de eventos viejos."""
+
+    def __init__(
+        self,
+        url: str | None = None,
+        queue_max: int = PUMPFUN_QUEUE_MAX,
+        max_age_s: float = PUMPFUN_MAX_AGE_S,
+    ) -> None:
+        self.url = url or rpc_ws_url()
+        self.max_age_s = max_age_s
+        self.connected = False
+        self.stats = {"events": 0, "dup": 0, "dropped_full": 0, "dropped_stale": 0}
+        self._queue: deque[tuple[float, TokenCandidate]] = deque(maxlen=queue_max)
+        self._ready = asyncio.Event()
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._task: asyncio.Task | None = None
+        self.on_trade: Optional[Callable[[dict], None]] = None
+
+    # ── cola ──
+    def _push(self, tok: TokenCandidate) -> None:
+        mint = tok.address
+        if mint in self._seen:
+            self.stats["dup"] += 1
+            return
+        self._seen[mint] = None
+        if len(self._seen) > SEEN_MAX:
+            self._seen.popitem(last=False)
+        if len(self._queue) == self._queue.maxlen:
+            self.stats["dropped_full"] += 1    # deque tira el más viejo
+        self._queue.append((time.monotonic(), tok))
+        self.stats["events"] += 1
+        self._ready.set()
+
+    def _pop_fresh(self) -> TokenCandidate | None:
+        now = time.monotonic()
+        while self._queue:
+            received, tok = self._queue.popleft()
+            if now - received <= self.max_age_s:
+                return tok
+            self.stats["dropped_stale"] += 1
+        self._ready.clear()
+        return None
+
+    async def next_mint(self, timeout: float | None = None) -> TokenCandidate | None:
+        """Siguiente mint fresco (espera hasta `timeout`; None si no llega)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            tok = self._pop_fresh()
+            if tok is not None:
+                return tok
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def drain(self) -> list[TokenCandidate]:
+        """Todos los mints frescos pendientes (no bloquea)."""
+        out = []
+        while (tok := self._pop_fresh()) is not None:
+            out.append(tok)
+        return out
+
+    # ── WebSocket ──
+    async def _consume(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+                continue
+            try:
+                self._on_message(msg.data)
+            except (ValueError, KeyError, TypeError, AttributeError, struct.error) as e:
+                log.debug("[PumpFun] mensaje ignorado: %s", e)
+
+    def _on_message(self, raw: str) -> None:
+        data = fastjson.loads(raw)
+        if data.get("method") != "logsNotification":
+            return
+        value = data["params"]["result"]["value"]
+        if value.get("err"):
+            return
+        for payload in _payloads(value.get("logs") or []):
+            if (tok := decode_create_event(payload)) is not None:
+                self._push(tok)
+            elif self.on_trade is not None:
+                trade = decode_trade_event(payload)
+                if trade is not None:
+                    self._deliver(trade)
+
+    def _deliver(self, trade: dict) -> None:
+        """Entrega un trade al consumidor; un fallo suyo no tumba el stream."""
+        try:
+            self.on_trade(trade)
+        except Exception as e:
+            log.warning("[PumpFun] on_trade falló: %s", e)
+
+    async def _run(self) -> None:
+        delay = 1.0
+        async with aiohttp.ClientSession() as s:
+            while True:
+                try:
+                    async with s.ws_connect(self.url, heartbeat=20) as ws:
+                        await ws.send_json({
+                            "jsonrpc": "2.0", "id": next(self._ids),
+                            "method": "logsSubscribe",
+                            "params": [{"mentions": [PUMPFUN_PROGRAM]},
+                                       {"commitment": "processed"}],
+                        })
+                        self.connected = True
+                        delay = 1.0
+                        log.info("[PumpFun] stream conectado → %s", self.url)
+                        await self._consume(ws)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.warning("[PumpFun] stream error: %s", e)
+                finally:
+                    self.connected = False
+                log.warning("[PumpFun] stream caído; reintento en %.0fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_S)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pumpfun-stream")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# ───────────────────────── API módulo ──────────────────────────
+_stream: PumpFunStream | None = None
+
+
+def stream() -> PumpFunStream:
+    """Instancia compartida del stream (se crea en el primer uso)."""
+    global _stream
+    if _stream is None:
+        _stream = PumpFunStream()
+    return _stream
+
 
-async def get_latest_pumpfun() -> List[dict]:  # noqa: D401
-    """Devuelve [].  Se puede reactivar más adelante sustituyendo este archivo."""
-    return []
+async def get_latest_pumpfun() -> List[TokenCandidate]:
+    """Mints frescos pendientes; [] si PUMPFUN_STREAM está desactivado."""
+    if not PUMPFUN_STREAM:
+        return []
+    return stream().drain()
@@ -1,19 +1,28 @@
 # memebot2/fetcher/rugcheck.py
 from __future__ import annotations
 
+import logging
+
 import aiohttp
 import tenacity
 
 from ..config import RUGCHECK_API_BASE, RUGCHECK_API_KEY
+from ..utils import fastjson
+
+log = logging.getLogger("rugcheck")
 
 if not (RUGCHECK_API_BASE and RUGCHECK_API_KEY):
+    _warned = False
 
     async def check_token(address: str) -> int:  # type: ignore
+        global _warned
+        if not _warned:      # se avisa en el primer uso, no al importar
+            _warned = True
+            log.warning(
+                "[RugCheck] Deshabilitado: añade RUGCHECK_API_BASE y RUGCHECK_API_KEY a .env"
+            )
         return 0             # puntuación nula si RugCheck desactivado
 
-    print(
-        "[RugCheck] Deshabilitado: añade RUGCHECK_API_BASE y RUGCHECK_API_KEY a .env"
-    )
 else:
     HEADERS = {"Authorization": f"Bearer {RUGCHECK_API_KEY}"}
 
@@ -25,5 +34,5 @@ else:
                 if r.status == 404:
                     return 0
                 r.raise_for_status()
-                data = await r.json()
+                data = await fastjson.read_json(r)
         return int(data.get("score", 0))
@@ -0,0 +1,194 @@
+# memebot2/fetcher/signal_cache.py
+"""
+Caché persistente de señales externas (RugCheck, Helius, socials…).
+
+• Un resultado por (señal, token) en la tabla `signal_cache` de la BD,
+  con `fetched_at` y `version`.
+• TTL por señal (SIGNAL_CACHE_TTL_S): pasado ese tiempo se vuelve a
+  consultar.  TTL 0 → la señal nunca se cachea.
+• SIGNAL_VERSION: si cambia la lógica de un proveedor se sube su versión
+  y las filas antiguas dejan de valer (y se purgan en el siguiente `warm`).
+• `warm()` carga al arrancar las filas vigentes en un dict en memoria; las
+  consultas posteriores no tocan la BD.  Las escrituras se acumulan y se
+  vuelcan por lotes (`flush`, upsert).
+• `wrap(señal, f)` devuelve `f` envuelta: mira la caché antes de salir a
+  la red y comparte la llamada en vuelo si dos evaluaciones piden a la vez
+  el mismo token.  Los errores no se cachean.
+
+Uso:
+
+    from memebot2.fetcher.signal_cache import cache
+    await cache.warm()
+    check = cache.wrap("rug_score", rugcheck.check_token)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from ..config import SIGNAL_CACHE_TTL_S
+from ..db.database import SessionLocal
+from ..db.models import SignalCache as _Row
+
+log = logging.getLogger("signal_cache")
+
+# sube la versión de una señal cuando cambie cómo se calcula
+SIGNAL_VERSION: Dict[str, int] = {
+    "rug_score": 1,
+    "cluster_bad": 2,            # v2: share sobre supply real + salto Δ
+    "social_ok": 1,
+    "insider_sig": 2,            # v2: ventana de swaps en memoria
+}
+FLUSH_EVERY = 50                 # escrituras pendientes antes de volcar solo
+
+Provider = Callable[[str], Awaitable[Any]]
+
+
+def _utcnow() -> _dt.datetime:
+    return _dt.datetime.utcnow()
+
+
+class SignalCache:
+    def __init__(
+        self,
+        ttl: Optional[Dict[str, int]] = None,
+        versions: Optional[Dict[str, int]] = None,
+        session_factory=SessionLocal,
+    ) -> None:
+        self.ttl = dict(SIGNAL_CACHE_TTL_S if ttl is None else ttl)
+        self.versions = dict(SIGNAL_VERSION if versions is None else versions)
+        self._session = session_factory
+        self._mem: Dict[tuple[str, str], tuple[Any, _dt.datetime]] = {}
+        self._dirty: Dict[tuple[str, str], tuple[Any, _dt.datetime]] = {}
+        self._inflight: Dict[tuple[str, str], asyncio.Future] = {}
+        self._flushing: Optional[asyncio.Task] = None
+        self.stats = {"hit": 0, "miss": 0, "expired": 0, "shared": 0}
+
+    # ───────────────────────── memoria ─────────────────────────
+    def _fresh(self, signal: str, fetched_at: _dt.datetime, now: _dt.datetime) -> bool:
+        ttl = self.ttl.get(signal, 0)
+        return ttl > 0 and (now - fetched_at).total_seconds() < ttl
+
+    def get(self, signal: str, address: str) -> tuple[bool, Any]:
+        """(hay_valor_vigente, valor)."""
+        entry = self._mem.get((signal, address))
+        if entry is None:
+            self.stats["miss"] += 1
+            return False, None
+        value, fetched_at = entry
+        if not self._fresh(signal, fetched_at, _utcnow()):
+            del self._mem[(signal, address)]
+            self.stats["expired"] += 1
+            return False, None
+        self.stats["hit"] += 1
+        return True, value
+
+    def put(self, signal: str, address: str, value: Any) -> None:
+        if self.ttl.get(signal, 0) <= 0:
+            return
+        entry = (value, _utcnow())
+        self._mem[(signal, address)] = entry
+        self._dirty[(signal, address)] = entry
+        if len(self._dirty) >= FLUSH_EVERY and self._flushing is None:
+            self._flushing = asyncio.get_running_loop().create_task(self.flush())
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+    # ───────────────────────── persistencia ─────────────────────
+    async def warm(self) -> int:
+        """Purga lo caducado/obsoleto y carga el resto en memoria."""
+        if not self.ttl:
+            return 0
+        now = _utcnow()
+        oldest = now - _dt.timedelta(seconds=max(self.ttl.values()))
+        async with self._session() as s:
+            await s.execute(delete(_Row).where(_Row.fetched_at < oldest))
+            rows = (await s.execute(select(_Row))).scalars().all()
+            stale = [
+                (r.signal, r.address) for r in rows
+                if r.version != self.versions.get(r.signal, 1)
+                or not self._fresh(r.signal, r.fetched_at, now)
+            ]
+            for signal, address in stale:
+                await s.execute(delete(_Row).where(
+                    _Row.signal == signal, _Row.address == address
+                ))
+            await s.commit()
+        stale_keys = set(stale)
+        for r in rows:
+            if (r.signal, r.address) not in stale_keys:
+                self._mem[(r.signal, r.address)] = (json.loads(r.value), r.fetched_at)
+        log.info("[signal_cache] %s señales en caché (%s purgadas)", len(self._mem), len(stale))
+        return len(self._mem)
+
+    async def flush(self) -> int:
+        """Vuelca (upsert) las escrituras pendientes.  Devuelve cuántas."""
+        try:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            rows = [
+                {
+                    "signal": signal,
+                    "address": address,
+                    "version": self.versions.get(signal, 1),
+                    "value": json.dumps(value),
+                    "fetched_at": fetched_at,
+                }
+                for (signal, address), (value, fetched_at) in batch.items()
+            ]
+            stmt = insert(_Row).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[_Row.address, _Row.signal],
+                set_={c: stmt.excluded[c] for c in ("version", "value", "fetched_at")},
+            )
+            try:
+                async with self._session() as s:
+                    await s.execute(stmt)
+                    await s.commit()
+            except Exception as e:
+                log.warning("[signal_cache] no se pudo volcar: %s", e)
+                self._dirty = {**batch, **self._dirty}
+                return 0
+            return len(rows)
+        finally:
+            self._flushing = None
+
+    # ───────────────────────── proveedores ──────────────────────
+    def _done(self, key: tuple[str, str], task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.put(key[0], key[1], task.result())
+
+    def wrap(self, signal: str, fn: Provider) -> Provider:
+        """`fn` con caché delante (tal cual si la señal no tiene TTL)."""
+        if self.ttl.get(signal, 0) <= 0:
+            return fn
+
+        async def cached(address: str) -> Any:
+            hit, value = self.get(signal, address)
+            if hit:
+                return value
+            key = (signal, address)
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn(address))
+                self._inflight[key] = task
+                task.add_done_callback(lambda t, k=key: self._done(k, t))
+            else:
+                self.stats["shared"] += 1
+            return await asyncio.shield(task)
+
+        cached.__name__ = getattr(fn, "__name__", signal)
+        return cached
+
+
+cache = SignalCache()
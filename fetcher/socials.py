@@ -1,25 +1,74 @@
 # memebot2/fetcher/socials.py
+"""
+¿Tiene el token perfil con enlaces sociales en DexScreener?
+
+El listado `token-profiles/latest/v1` es el mismo para todos los tokens:
+se descarga como mucho una vez cada PROFILES_TTL_S, se decodifica con
+`utils.fastjson` y se reduce a un `frozenset` de direcciones con enlaces;
+cada consulta es una búsqueda en ese conjunto.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import time
+from typing import Callable, Optional
+
 import aiohttp
 import tenacity
 
 from ..config import DEX_API_BASE
+from ..utils import fastjson
 
 PROFILE_URL = f"{DEX_API_BASE.rstrip('/')}/token-profiles/latest/v1"
+PROFILES_TTL_S = 60
+
+_linked: frozenset[str] = frozenset()
+_linked_at = float("-inf")
+_lock = asyncio.Lock()
+_struct_decode: Optional[Callable] = None
+
+
+def _build_struct_decoder() -> Callable:
+    """Esquema msgspec: sólo `tokenAddress` y si hay `links` (sin parsearlos)."""
+    import msgspec
+
+    _Profile = msgspec.defstruct("_Profile", [
+        ("tokenAddress", Optional[str], None),
+        ("links", Optional[list[msgspec.Raw]], None),
+    ])
+    return fastjson.struct_decoder(list[_Profile])
+
+
+def decode_profiles(raw: bytes | str) -> frozenset[str]:
+    """Listado de perfiles → direcciones (minúsculas) que tienen enlaces."""
+    global _struct_decode
+    if fastjson.TYPED:
+        if _struct_decode is None:
+            _struct_decode = _build_struct_decoder()
+        return frozenset(
+            p.tokenAddress.lower() for p in _struct_decode(raw)
+            if p.links and p.tokenAddress
+        )
+    return frozenset(
+        p["tokenAddress"].lower()
+        for p in fastjson.loads(raw)
+        if p.get("links") and p.get("tokenAddress")
+    )
+
+
+async def _linked_tokens() -> frozenset[str]:
+    global _linked, _linked_at
+    async with _lock:                      # una descarga aunque pidan varios
+        if time.monotonic() - _linked_at > PROFILES_TTL_S:
+            async with aiohttp.ClientSession() as s:
+                async with s.get(PROFILE_URL) as r:
+                    r.raise_for_status()
+                    raw = await r.read()
+            _linked, _linked_at = decode_profiles(raw), time.monotonic()
+    return _linked
 
 
-@tenacity.retry(wait=tenacity.wait_fixed(2))
+@tenacity.retry(wait=tenacity.wait_fixed(2), stop=tenacity.stop_after_attempt(3))
 async def has_socials(address: str) -> bool:
-    async with aiohttp.ClientSession() as s:
-        async with s.get(PROFILE_URL) as r:
-            r.raise_for_status()
-            data = await r.json()
-
-    for profile in data:
-        if (
-            profile["tokenAddress"].lower() == address.lower()
-            and profile.get("links")
-        ):
-            return True
-    return False
+    return address.lower() in await _linked_tokens()
@@ -32,28 +32,31 @@ from sqlalchemy.exc import SQLAlchemyError
 # ─── módulos internos ──────────────────────────────────────────
 from memebot2.config import config, exits
 from memebot2.db.database import SessionLocal, async_init_db
-from memebot2.db.models import Position, Token
+from memebot2.db.candidate import TokenCandidate
+from memebot2.db.models import Position
 from memebot2.fetcher import (
     dexscreener,
     helius_cluster as clusters,
+    price_feed,
     pumpfun,
     rugcheck,
+    signal_cache,
     socials,
 )
-from memebot2.analytics import filters, insider, trend
-from memebot2.trader import buyer, seller
-from memebot2.utils.descubridor_pares import fetch_candidate_pairs
-from memebot2.utils.lista_pares import agregar_si_nuevo, eliminar_par, obtener_pares
-
-# ─── logging global ────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s  %(levelname)-8s %(name)s: %(message)s",
-    datefmt="%H:%M:%S",
-    force=True,
+from memebot2.analytics import eval_log, filters, insider, trend
+from memebot2.trader import buyer, seller, shadow, sol_signer
+from memebot2.utils.descubridor_pares import iter_candidate_pairs
+from memebot2.utils import eventloop, log_setup, loop_monitor, metrics, rechazados, tape, trace
+from memebot2.utils.lista_pares import (
+    agregar_si_nuevo,
+    eliminar_par,
+    reencolar,
+    siguientes_pares,
 )
+
+# ─── logging global (cola + hilo escritor, ver utils.log_setup) ─
+log_setup.setup()
 log = logging.getLogger("run_bot")
-logging.getLogger("pumpfun").setLevel(logging.DEBUG)
 
 # ─── short-cuts de parámetros .env / config ───────────────────
 DISCOVERY_INTERVAL: int = config.DISCOVERY_INTERVAL
@@ -66,70 +69,123 @@ SL_PCT: float = exits.STOP_LOSS_PCT
 TRAILING_PCT: float = exits.TRAILING_PCT
 MAX_HOLDING_H: int = exits.MAX_HOLDING_H
 
+# ─── scoring con cortocircuito (señales externas por coste) ───
+# cada proveedor pasa antes por la caché persistente de señales
+# (las métricas `enrich_*` miden sólo las llamadas reales, no los aciertos)
+_signals = signal_cache.cache
+planner = filters.ScorePlanner({
+    "rug_score": _signals.wrap(
+        "rug_score", metrics.timed("enrich_rugcheck")(rugcheck.check_token)),
+    "cluster_bad": _signals.wrap(
+        "cluster_bad", metrics.timed("enrich_holders")(clusters.suspicious_cluster)),
+    "social_ok": _signals.wrap(
+        "social_ok", metrics.timed("enrich_socials")(socials.has_socials)),
+    "insider_sig": _signals.wrap(
+        "insider_sig", metrics.timed("enrich_insider")(insider.insider_alert)),
+})
+
+# ─── estrategias en sombra (paper trading sobre los mismos datos) ─
+shadow_engine = shadow.make_engine()
+if shadow_engine is not None and config.SHADOW_RESOLVE:
+    planner.resolve(*shadow_engine.thresholds())
+
 
 # ╭──────────────────────────────────────────────────────────────╮
 # │                       BUY PIPELINE                          │
 # ╰──────────────────────────────────────────────────────────────╯
-async def _evaluate_and_buy(token: dict, session: SessionLocal) -> None:
+async def _evaluate_and_buy(
+    token: TokenCandidate,
+    session: SessionLocal,
+    feed: price_feed.PriceFeed | None = None,
+    prefiltered: bool = False,
+) -> None:
     """
     Enriquece `token` con señales avanzadas y ejecuta compra si procede.
     Persiste tanto el token como la posición abierta.
+
+    `prefiltered=True` cuando el lote ya pasó por `filters.batch_filter`.
     """
-    log.debug("▶ Eval %s", token.get('symbol', token['address'][:4]))
+    with trace.bind(token.address, "buy"):
+        log.debug("▶ Eval %s", token.label)
+
+        # Fast-fail
+        if not prefiltered:
+            failed = filters.rejection_reason(token)
+            if failed:
+                log.debug("   ✗ filtros básicos (%s)", failed[0])
+                rechazados.registrar(token.address, *failed)
+                metrics.count("rejected_filters")
+                return
+
+        # Señales externas 💡 (sólo las necesarias para decidir)
+        with metrics.stage("scoring"):
+            token.score_total, upper = await planner.score_range(token)
+        go = token.score_total >= planner.threshold
+        trace.event(token.address, "decision", score=token.score_total, go=go)
+        eval_log.record(token, token.score_total, upper, go)
+
+        if shadow_engine is not None and shadow_engine.on_scored(token, token.score_total, upper):
+            if feed is not None:
+                feed.subscribe(token.address, pool=token.pair_address)
+
+        log.debug("   → score=%s", token.score_total)
+
+        if not go:
+            log.info("DESCARTADO %s (score=%s)", token.label, token.score_total)
+            rechazados.registrar(token.address, "score")
+            metrics.count("rejected_score")
+            return
+        rechazados.olvidar(token.address)
+
+        # tendencia: informativa (peso 0), sólo para tokens que pasan
+        with metrics.stage("enrich_trend"):
+            token.trend = await trend.trend_signal(token.address)
+
+        # Guarda token en BD (idempotente gracias a merge)
+        try:
+            with metrics.stage("db_commit"):
+                await session.merge(token.to_token())
+                await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            log.warning("DB merge Token: %s", e)
 
-    # Fast-fail
-    if not filters.basic_filters(token):
-        log.debug("   ✗ filtros básicos")
-        return
+        # ⇢ COMPRA
+        if TRADE_AMOUNT_SOL <= 0:
+            log.warning("TRADE_AMOUNT_SOL=0  – modo simulación, no se opera")
+            return
 
-    # Señales externas 💡
-    token["rug_score"] = await rugcheck.check_token(token["address"])
-    token["cluster_bad"] = await clusters.suspicious_cluster(token["address"])
-    token["social_ok"] = await socials.has_socials(token["address"])
-    token["trend"] = await trend.trend_signal(token["address"])
-    token["insider_sig"] = insider.insider_alert(token["address"])
-    token["score_total"] = filters.total_score(token)
+        try:
+            with metrics.stage("buy"):
+                buy_resp = await buyer.buy(token.address, TRADE_AMOUNT_SOL)
+        except Exception as e:             # ruta, simulación o envío fallidos
+            log.error("Compra fallida %s: %s", token.address, e)
+            metrics.count("buy_failed")
+            return
+        qty = buy_resp.get("qty_lamports", 0)
+        # sin firma o sin cantidad no hay nada que vender: no se abre posición
+        if not buy_resp.get("signature") or qty <= 0:
+            log.error("Compra sin firma/cantidad %s: %s", token.address, buy_resp)
+            metrics.count("buy_failed")
+            return
+        price_usd = buy_resp.get("price_usd") or token.price_usd
+
+        pos = token.to_position(qty, price_usd)
+        try:
+            session.add(pos)
+            with metrics.stage("db_commit"):
+                await session.commit()
+            trace.event(token.address, "stored")
+        except SQLAlchemyError as e:
+            await session.rollback()
+            log.warning("DB add Position: %s", e)
+        trace.confirm(token.address, "buy", buy_resp.get("signature"))
 
-    log.debug("   → score=%s", token["score_total"])
+        if feed is not None:
+            feed.subscribe(token.address, pool=token.pair_address)
 
-    if token["score_total"] < config.MIN_SCORE_TOTAL:
-        log.info("DESCARTADO %s (score=%s)",
-                 token.get("symbol", token['address'][:4]), token["score_total"])
-        return
-
-    # Guarda token en BD (idempotente gracias a merge)
-    try:
-        session.merge(Token(**token))
-        await session.commit()
-    except SQLAlchemyError as e:
-        await session.rollback()
-        log.warning("DB merge Token: %s", e)
-
-    # ⇢ COMPRA
-    if TRADE_AMOUNT_SOL <= 0:
-        log.warning("TRADE_AMOUNT_SOL=0  – modo simulación, no se opera")
-        return
-
-    buy_resp = await buyer.buy(token["address"], TRADE_AMOUNT_SOL)
-    qty = buy_resp.get("qty", 0)            # depende de trader.buyer implementation
-    price_usd = buy_resp.get("price_usd")   # idem (si GMGN lo devuelve)
-
-    pos = Position(
-        address=token["address"],
-        symbol=token.get("symbol"),
-        qty=qty,
-        buy_price_usd=price_usd,
-        opened_at=_dt.datetime.utcnow(),
-        highest_pnl_pct=0.0,
-    )
-    try:
-        session.add(pos)
-        await session.commit()
-    except SQLAlchemyError as e:
-        await session.rollback()
-        log.warning("DB add Position: %s", e)
-
-    log.warning("✔ COMPRADO %s %s", token.get("symbol", "?"), token["address"])
+        metrics.count("bought")
+        log.warning("✔ COMPRADO %s %s", token.symbol or "?", token.address)
 
 
 # ╭──────────────────────────────────────────────────────────────╮
@@ -164,60 +220,219 @@ async def _should_exit(
     return trailing_cond or tp_cond or sl_cond or max_hold_cond
 
 
-async def _check_positions(session: SessionLocal) -> None:
+async def _close_position(
+    pos: Position,
+    price_usd: float,
+    now: _dt.datetime,
+    session: SessionLocal,
+) -> None:
+    """Envía la orden de venta y cierra la posición en BD."""
+    with metrics.stage("sell"):
+        sell_resp = await seller.sell(pos.address, pos.qty)
+    pos.closed = True
+    pos.closed_at = now
+    pos.close_price_usd = price_usd
+    pos.exit_tx_sig = sell_resp.get("signature")
+
+    try:
+        with metrics.stage("db_commit"):
+            await session.commit()
+        trace.event(pos.address, "stored", "sell")
+    except SQLAlchemyError as e:
+        await session.rollback()
+        log.warning("DB update Position: %s", e)
+    trace.confirm(pos.address, "sell", pos.exit_tx_sig)
+    metrics.count("sold")
+
+    log.warning("💸 VENDIDO %s  pnl=%.1f%%  sig=%s",
+                pos.symbol or pos.address[:4],
+                ((pos.close_price_usd - pos.buy_price_usd) /
+                 pos.buy_price_usd) * 100,
+                pos.exit_tx_sig[:6] if pos.exit_tx_sig else "–")
+
+
+async def _exit_watcher(feed: price_feed.PriceFeed) -> None:
     """
-    Recorre las posiciones abiertas y aplica las reglas de salida.
-    Si corresponde, envía la orden de venta y cierra la posición en BD.
+    Consume los ticks del feed y aplica las reglas de salida al instante.
+
+    • Cada tick dispara la decisión sólo para su token (latencia tick →
+      decisión registrada en `feed.latency`, separada por "ws"/"poll").
+    • Cada SLEEP_SECONDS hace un barrido completo con el último precio
+      conocido: recoge compras nuevas y cubre MAX_HOLDING_H aunque el
+      pool esté parado.
+
+    Los ticks alimentan también a las estrategias en sombra; un token
+    sigue suscrito mientras lo tenga el bot o alguna de ellas.
+
+    Usa su propia sesión de BD para no compartirla con el loop de compra.
     """
-    positions = await _load_open_positions(session)
-    if not positions:
-        return
+    session = SessionLocal()
+    held: dict[str, Position] = {}
 
-    for pos in positions:
-        pair = await dexscreener.get_pair(pos.address)
-        if not pair or not pair.get("price_usd"):
-            continue
+    async def _refresh() -> None:
+        held.clear()
+        for p in await _load_open_positions(session):
+            held[p.address] = p
+            feed.subscribe(p.address)
+            clusters.tracker.watch(p.address)
 
+    async def _decide(pos: Position, tick: price_feed.PriceTick, fresh: bool) -> None:
         now = _dt.datetime.utcnow()
-        if not await _should_exit(pos, pair["price_usd"], now):
-            continue
+        with metrics.stage("exit_check"):
+            exit_now = await _should_exit(pos, tick.price_usd, now)
+        if fresh:
+            feed.latency.record(tick.source, time.monotonic() - tick.ts)
+        if exit_now:
+            held.pop(pos.address, None)
+            if shadow_engine is None or not shadow_engine.holds(pos.address):
+                feed.unsubscribe(pos.address)
+            clusters.tracker.unwatch(pos.address)
+            trace.event(
+                pos.address, "exit_signal", "sell",
+                pnl=round((tick.price_usd / pos.buy_price_usd - 1) * 100, 1),
+                tick=round(time.time() - (time.monotonic() - tick.ts), 4),
+            )
+            with trace.bind(pos.address, "sell"):
+                await _close_position(pos, tick.price_usd, now, session)
+
+    await _refresh()
+    last_sweep = time.monotonic()
+    while True:
+        try:
+            tick = await feed.next_tick(timeout=SLEEP_SECONDS)
+            if tick is not None:
+                clusters.tracker.touch(tick.address)
+                shadowed = shadow_engine is not None and shadow_engine.on_price(
+                    tick.address, tick.price_usd)
+                if tick.address not in held and not shadowed:
+                    await _refresh()
+                    if tick.address not in held:
+                        feed.unsubscribe(tick.address)      # ya no lo sigue nadie
+                pos = held.get(tick.address)
+                if pos is not None and pos.buy_price_usd:
+                    await _decide(pos, tick, fresh=True)
+
+            if time.monotonic() - last_sweep >= SLEEP_SECONDS:
+                await _refresh()
+                for pos in list(held.values()):
+                    last = feed.latest(pos.address)
+                    if last is not None and pos.buy_price_usd:
+                        await _decide(pos, last, fresh=False)
+                for addr in shadow_engine.addresses() if shadow_engine is not None else ():
+                    last = feed.latest(addr)
+                    if (last is not None and not shadow_engine.on_price(addr, last.price_usd)
+                            and addr not in held):
+                        feed.unsubscribe(addr)
+                last_sweep = time.monotonic()
+                if held:
+                    log.debug("⏱️  tick→decisión (%s): %s", feed.mode, feed.latency.summary())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception("exit watcher: %s", e)
 
-        # 👉 VENTA
-        sell_resp = await seller.sell(pos.address, pos.qty)
-        pos.closed = True
-        pos.closed_at = now
-        pos.close_price_usd = pair["price_usd"]
-        pos.exit_tx_sig = sell_resp.get("signature")
 
+# ╭──────────────────────────────────────────────────────────────╮
+# │                     PUMPFUN STREAM                          │
+# ╰──────────────────────────────────────────────────────────────╯
+async def _pumpfun_market(tok: TokenCandidate) -> bool:
+    """
+    Completa las métricas de mercado del mint (el CreateEvent no trae
+    liquidez, volumen ni holders) con su par de DexScreener.  False si
+    DexScreener aún no lo tiene indexado.
+    """
+    with metrics.stage("pair_fetch"):
+        pair = await dexscreener.get_pair(tok.address)
+    if pair is None:
+        return False
+    tok.pair_address = pair.pair_address or tok.pair_address
+    tok.price_usd = pair.price_usd
+    tok.liquidity = pair.liquidity
+    tok.vol24h = pair.vol24h
+    tok.holders = pair.holders
+    tok.txns_last_5min = pair.txns_last_5min
+    return True
+
+
+async def _pumpfun_consumer(feed: price_feed.PriceFeed) -> None:
+    """
+    Evalúa cada mint de Pump Fun en cuanto llega por el stream, sin
+    esperar a la siguiente iteración del loop principal.  Antes de los
+    filtros se piden sus métricas de mercado; un mint que DexScreener aún
+    no indexa se anota en `rechazados` y vuelve por la cola normal tras
+    el back-off.
+    Sesión de BD propia (el loop principal usa la suya).
+    """
+    ingest = pumpfun.stream()
+    await ingest.start()
+    session = SessionLocal()
+    while True:
+        tok = await ingest.next_mint()
+        if tok is None:
+            continue
+        trace.event(tok.address, "first_seen", source="pumpfun")
         try:
-            await session.commit()
-        except SQLAlchemyError as e:
-            await session.rollback()
-            log.warning("DB update Position: %s", e)
-
-        log.warning("💸 VENDIDO %s  pnl=%.1f%%  sig=%s",
-                    pos.symbol or pos.address[:4],
-                    ((pos.close_price_usd - pos.buy_price_usd) /
-                     pos.buy_price_usd) * 100,
-                    pos.exit_tx_sig[:6] if pos.exit_tx_sig else "–")
+            if not await _pumpfun_market(tok):
+                rechazados.registrar(tok.address, "sin_par")
+                metrics.count("rejected_filters")
+                continue
+            trace.event(tok.address, "fetched")
+            await _evaluate_and_buy(tok, session, feed)
+        except Exception as e:
+            log.warning("PumpFun eval %s: %s", tok.address[:4], e)
 
 
 # ╭──────────────────────────────────────────────────────────────╮
 # │                         MAIN LOOP                           │
 # ╰──────────────────────────────────────────────────────────────╯
 async def main_loop() -> None:
+    loop_health = loop_monitor.start() if config.LOOP_MONITOR else None
+    if TRADE_AMOUNT_SOL > 0:
+        sol_signer.keypair()        # clave inválida/ausente → fallar al arrancar
+    if config.TAPE_RECORD:
+        tape.record(
+            config.TAPE_FILE
+            or config.DATA_DIR / "tape" / f"{_dt.date.today():%Y%m%d}.jsonl.gz"
+        )
     await async_init_db()
+    await _signals.warm()
+    await metrics.start_server()
+    if config.EVAL_LOG:
+        eval_log.start()
+    if config.TRACE_ENABLED:
+        trace.start(
+            config.TRACE_FILE
+            or config.DATA_DIR / "trace" / f"{_dt.date.today():%Y%m%d}.jsonl"
+        )
     session = SessionLocal()
 
+    feed = price_feed.make_price_feed()
+    await feed.start()
+    if shadow_engine is not None:
+        for addr in await shadow_engine.restore():
+            feed.subscribe(addr)
+    exit_task = asyncio.create_task(_exit_watcher(feed), name="exit-watcher")
+    holders_task = asyncio.create_task(clusters.tracker.run(), name="holder-tracker")
+    swaps = insider.make_tx_source()
+    insider_task = (
+        asyncio.create_task(insider.run(swaps), name="insider-swaps")
+        if swaps is not None else None
+    )
+    pumpfun_task = (
+        asyncio.create_task(_pumpfun_consumer(feed), name="pumpfun-consumer")
+        if config.PUMPFUN_STREAM else None
+    )
+
     last_discovery = 0.0
     log.info(
-        "Bot listo  (discover=%ss, lote=%s, pausa=%ss, sl/tp/trail=%s/%s/%s)",
+        "Bot listo  (discover=%ss, lote=%s, pausa=%ss, sl/tp/trail=%s/%s/%s, feed=%s)",
         DISCOVERY_INTERVAL,
         VALIDATION_BATCH_SIZE,
         SLEEP_SECONDS,
         SL_PCT,
         TP_PCT,
         TRAILING_PCT,
+        feed.mode,
     )
 
     while True:
@@ -226,26 +441,75 @@ async def main_loop() -> None:
         # ── 1) descubrimiento de nuevos pares ───────────────────
         if now - last_discovery >= DISCOVERY_INTERVAL:
             log.debug("🔎 Descubriendo candidatos")
-            for addr in await fetch_candidate_pairs():
-                agregar_si_nuevo(addr)
+            with metrics.stage("discovery"):
+                async for cand in iter_candidate_pairs():
+                    if agregar_si_nuevo(cand.address, cand.created_at, cand.source):
+                        trace.event(cand.address, "first_seen",
+                                    source=cand.source, launched=cand.created_at)
+                        trace.event(cand.address, "enqueued")
             last_discovery = now
-
-        # ── 2) stream PumpFun (tokens recién minteados) ─────────
-        for tok in await pumpfun.get_latest_pumpfun():
-            await _evaluate_and_buy(tok, session)
+            log.info("Scoring (llamadas/ahorro por señal): %s", planner.report())
+            log.info("Caché de señales: %s (%s entradas)", _signals.stats, len(_signals))
+            if loop_health is not None:
+                log.info("Event loop (lag): %s", loop_health.summary())
+            if shadow_engine is not None:
+                log.info("Estrategias en sombra: %s", shadow_engine.report())
+                await shadow_engine.flush()
+            rechazados.save()
+            await _signals.flush()
+            await eval_log.flush()
+
+        # ── 2) stream PumpFun: lo consume `pumpfun_task` ────────
+        if pumpfun_task is not None and pumpfun_task.done():
+            log.error("PumpFun consumer detenido — relanzando")
+            pumpfun_task = asyncio.create_task(
+                _pumpfun_consumer(feed), name="pumpfun-consumer"
+            )
 
         # ── 3) validación de la lista de pares pendientes ───────
-        pending = obtener_pares()[:VALIDATION_BATCH_SIZE]
+        for addr in rechazados.vencidos():          # re-checks por back-off
+            reencolar(addr)
+        pending = siguientes_pares(VALIDATION_BATCH_SIZE)
         log.debug("🗒️  Validando %s pares pendientes", len(pending))
+        metrics.count("candidates", len(pending))
+        for addr in pending:
+            trace.event(addr, "dequeued")
+        with metrics.stage("pair_fetch"):
+            fetched = await asyncio.gather(
+                *(dexscreener.get_pair(a) for a in pending), return_exceptions=True
+            )
+        batch = []
+        for pair_addr, tok in zip(pending, fetched):
+            if isinstance(tok, TokenCandidate):
+                trace.event(tok.address, "fetched")
+                batch.append(tok)
+            else:
+                rechazados.registrar(pair_addr, "sin_par" if tok is None else "error")
+        if batch:
+            with metrics.stage("filters"):
+                mask, _ = filters.batch_filter(batch)
+            for tok, ok in zip(batch, mask):
+                if ok:
+                    await _evaluate_and_buy(tok, session, feed, prefiltered=True)
+                else:
+                    reason = filters.rejection_reason(tok) or ("filtros", False)
+                    rechazados.registrar(tok.address, *reason)
+                    metrics.count("rejected_filters")
         for pair_addr in pending:
-            tok = await dexscreener.get_pair(pair_addr)
-            if tok:
-                await _evaluate_and_buy(tok, session)
             eliminar_par(pair_addr)
 
-        # ── 4) gestión de posiciones abiertas (salidas) ─────────
-        await _check_positions(session)
-
+        # ── 4) salidas: las gestiona `exit_task` a golpe de tick ──
+        if exit_task.done() and not exit_task.cancelled():
+            log.error("exit watcher detenido: %s — relanzando", exit_task.exception())
+            exit_task = asyncio.create_task(_exit_watcher(feed), name="exit-watcher")
+        if insider_task is not None and insider_task.done() and swaps.name != "replay":
+            log.error("fuente de swaps detenida — relanzando")
+            insider_task = asyncio.create_task(insider.run(swaps), name="insider-swaps")
+        if holders_task.done() and not holders_task.cancelled() and holders_task.exception():
+            log.error("holder tracker detenido: %s — relanzando", holders_task.exception())
+            holders_task = asyncio.create_task(clusters.tracker.run(), name="holder-tracker")
+
+        metrics.observe("tick", time.monotonic() - now)
         await asyncio.sleep(SLEEP_SECONDS)
 
 
@@ -254,6 +518,6 @@ async def main_loop() -> None:
 # ╰──────────────────────────────────────────────────────────────╯
 if __name__ == "__main__":
     try:
-        asyncio.run(main_loop())
+        eventloop.run(main_loop())
     except KeyboardInterrupt:
         log.info("⏹️  Bot detenido por usuario")
@@ -0,0 +1,12 @@
+# memebot2/tests/conftest.py
+"""
+Estado local aislado: DATA_DIR apunta a un directorio temporal antes de
+importar nada de memebot2 (colas, cachés y stores se crean ahí).
+
+    cd <padre de memebot2> && python -m pytest memebot2/tests
+"""
+
+import os
+import tempfile
+
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="memebot2-tests-")
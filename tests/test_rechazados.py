@@ -0,0 +1,106 @@
+# memebot2/tests/test_rechazados.py
+"""
+Re-evaluaciones de `rechazados`: tokens que salen de la cola sin
+evaluarse (shedding/caducidad) y fallos duros (antigüedad) que nunca
+vuelven.
+"""
+
+import time
+
+import pytest
+
+from memebot2.utils import lista_pares, rechazados
+
+INF = float("inf")
+
+
+@pytest.fixture(autouse=True)
+def _limpio(monkeypatch):
+    monkeypatch.setattr(rechazados, "REJECT_BACKOFF_S", (10, 20))
+    monkeypatch.setattr(rechazados, "SAVE_EVERY", 10**9)
+    rechazados._entries.clear()
+    rechazados._due.clear()
+    lista_pares._heap.clear()
+    lista_pares._pair_watch.clear()
+    yield
+    rechazados._entries.clear()
+    rechazados._due.clear()
+    lista_pares._heap.clear()
+    lista_pares._pair_watch.clear()
+
+
+def _en_vuelo(address: str) -> None:
+    """Registrado, vencido y re-encolado, como en run_bot."""
+    rechazados.registrar(address, "liquidity")
+    assert rechazados.vencidos(now=rechazados.motivo(address)["due"]) == [address]
+    lista_pares.reencolar(address)
+    assert rechazados.motivo(address)["due"] == INF
+
+
+def test_caducado_se_reprograma(monkeypatch):
+    _en_vuelo("retry")
+    monkeypatch.setattr(lista_pares, "PENDING_MAX_AGE_S", -1)   # todo caduca
+
+    assert lista_pares.siguientes_pares(5) == []
+    e = rechazados.motivo("retry")
+    assert e["attempts"] == 1 and e["reason"] == "liquidity"
+    assert e["due"] != INF
+    assert rechazados.vencidos(now=e["due"]) == ["retry"]
+
+
+def test_shed_se_reprograma(monkeypatch):
+    monkeypatch.setattr(lista_pares, "PENDING_CAPACITY", 1)
+    _en_vuelo("retry")
+    lista_pares.agregar_si_nuevo("fresco", created_at=None, source="pumpfun")
+    lista_pares._shed()
+
+    assert lista_pares.obtener_pares() == ["fresco"]
+    assert rechazados.motivo("retry")["due"] != INF
+
+
+def test_agotado_se_olvida(monkeypatch):
+    monkeypatch.setattr(lista_pares, "PENDING_MAX_AGE_S", -1)
+    rechazados.registrar("retry", "volume")
+    for _ in range(len(rechazados.REJECT_BACKOFF_S)):
+        due = rechazados.motivo("retry")["due"]
+        assert rechazados.vencidos(now=due) == ["retry"]
+        lista_pares.reencolar("retry")
+        lista_pares.siguientes_pares(5)
+
+    assert rechazados.motivo("retry") is None
+    assert not rechazados._entries
+
+
+def test_no_en_vuelo_no_se_toca():
+    rechazados.registrar("pendiente", "liquidity")
+    before = dict(rechazados.motivo("pendiente"))
+    assert rechazados.sin_evaluar("pendiente") is None
+    assert rechazados.sin_evaluar("desconocido") is None
+    assert rechazados.motivo("pendiente") == before
+
+
+def test_token_viejo_no_se_reencola():
+    from memebot2.analytics import filters
+    from memebot2.config import MAX_AGE_DAYS
+    from memebot2.fetcher import dexscreener
+
+    created_ms = int((time.time() - (MAX_AGE_DAYS + 2) * 86_400) * 1000)
+    tok = dexscreener._normalize({
+        "pairAddress": "PAIRviejo",
+        "baseToken": {"address": "viejo", "symbol": "OLD", "name": "viejo"},
+        "pairCreatedAt": created_ms,
+        "priceUsd": "0.01",
+        "volume": {"usd": 50_000},
+        "liquidity": {"usd": 20_000},
+        "txns": {"h24": {"buys": 150, "sells": 90}, "m5": {"buys": 4}},
+    })
+    assert tok is not None                         # no se confunde con "sin_par"
+
+    reason = filters.rejection_reason(tok)
+    assert reason == ("age_days", True)
+    mask, _ = filters.batch_filter([tok])
+    assert not mask[0]
+
+    rechazados.registrar(tok.address, *reason)
+    assert rechazados.motivo(tok.address) is None
+    assert rechazados.vencidos(now=INF) == []
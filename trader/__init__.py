@@ -2,16 +2,26 @@
 Entrada única para el sub-paquete *trader*:
 
     from memebot2.trader import buyer, seller, gmgn
+    from memebot2.trader import shadow          # paper trading multi-estrategia
 """
 
+from __future__ import annotations
+
 from importlib import import_module
 from types import ModuleType
-from typing import Dict
-
-_modules = ("gmgn", "sol_signer", "buyer", "seller")
 
-globals_: Dict[str, ModuleType] = globals()
-for _m in _modules:
-    globals_[_m] = import_module(f"{__name__}.{_m}")
+_modules = ("gmgn", "sol_signer", "buyer", "seller", "shadow")
 
 __all__ = list(_modules)
+
+
+def __getattr__(name: str) -> ModuleType:
+    # PEP 562: el sub-módulo se importa la primera vez que se pide
+    if name in _modules:
+        mod = globals()[name] = import_module(f"{__name__}.{name}")
+        return mod
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_modules})
@@ -22,7 +22,8 @@ log = logging.getLogger("buyer")
 
 def _parse_route(resp: dict) -> dict:
     route = resp.get("route", {})
-    quote = route.get("quote", {})
+    # respuesta GMGN: {"code", "msg", "data": {"quote": …, "raw_tx": …}}
+    quote = route.get("data", route).get("quote", {})
     qty_lamports = int(quote.get("outAmount", "0"))
     return {
         "qty_lamports": qty_lamports,
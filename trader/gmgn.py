@@ -14,6 +14,7 @@ con cambiar `sol_signer.sign_and_send()` por la llamada POST.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 from typing import Dict, Any
@@ -22,6 +23,7 @@ import aiohttp
 import tenacity
 
 from ..config import exits, TRADE_AMOUNT_SOL
+from ..utils import fastjson, metrics
 from . import sol_signer
 
 log = logging.getLogger("gmgn")
@@ -36,6 +38,7 @@ def _pretty(d: Dict[str, Any]) -> str:
     return json.dumps(d, separators=(",", ":"))
 
 
+@metrics.timed("route")
 async def _route(
     token_in: str,
     token_out: str,
@@ -57,7 +60,7 @@ async def _route(
     async with aiohttp.ClientSession() as s:
         async with s.get(url, timeout=20) as r:
             r.raise_for_status()
-            return await r.json()
+            return await fastjson.read_json(r)
 
 
 # ───────────── Operaciones públicas ────────────────────────────
@@ -72,13 +75,13 @@ async def buy(token_addr: str, amount_sol: float) -> dict:
         log.info("[GMGN] Simulación BUY – amount=0")
         return {"route": {}, "signature": "SIMULATION"}
 
-    owner = sol_signer.PUBLIC_KEY.to_string()
+    owner = str(sol_signer.public_key())
     lamports_in = int(amount_sol * LAMPORTS)
 
     route = await _route(SOL_MINT, token_addr, lamports_in, owner)
     unsigned_b64 = route["data"]["raw_tx"]["swapTransaction"]
 
-    sig = sol_signer.sign_and_send(unsigned_b64)
+    sig = await asyncio.to_thread(sol_signer.sign_and_send, unsigned_b64)
     log.info("[GMGN] BUY %.3f SOL → %s  sig=%s",
              amount_sol, token_addr, sig[:6])
 
@@ -96,12 +99,12 @@ async def sell(token_addr: str, qty_lamports: int) -> dict:
         log.info("[GMGN] Simulación SELL – qty=0")
         return {"route": {}, "signature": "SIMULATION"}
 
-    owner = sol_signer.PUBLIC_KEY.to_string()
+    owner = str(sol_signer.public_key())
 
     route = await _route(token_addr, SOL_MINT, qty_lamports, owner)
     unsigned_b64 = route["data"]["raw_tx"]["swapTransaction"]
 
-    sig = sol_signer.sign_and_send(unsigned_b64)
+    sig = await asyncio.to_thread(sol_signer.sign_and_send, unsigned_b64)
     log.info("[GMGN] SELL %.0f lamports %s  sig=%s",
              qty_lamports, token_addr, sig[:6])
 
@@ -18,6 +18,7 @@ log = logging.getLogger("seller")
 
 
 async def sell(token_addr: str, qty_lamports: int) -> Dict[str, object]:
+    qty_lamports = int(qty_lamports)        # Position.qty es Float en BD
     if qty_lamports <= 0:
         log.warning("[seller] Qty=0 — orden ignorada")
         return {"signature": "NO_QTY", "route": {}}
@@ -0,0 +1,401 @@
+# memebot2/trader/shadow.py
+"""
+Estrategias en sombra: paper trading de K configuraciones a la vez.
+
+Cada estrategia (umbral de score + TP/SL/trailing/max-holding) lleva su
+propio libro virtual de posiciones y su PnL, alimentado con **lo mismo**
+que ve el bot real:
+
+• `on_scored(token, score, upper)` tras el scoring de cada candidato que
+  pasa los filtros básicos.  `upper` es la cota superior del planner
+  (score + pesos de las señales que no se consultaron): si el umbral de
+  una estrategia cae entre ambos la decisión no se puede tomar sin más
+  llamadas y se cuenta como `undecided` (no compra).  Con
+  SHADOW_RESOLVE=1 el planner consulta lo necesario para todos los
+  umbrales (`thresholds()`).
+• `on_price(address, price)` con cada tick del feed de precios.  El bot
+  suscribe al feed los tokens que tenga alguna estrategia: una única
+  suscripción por token, la compartan una o K estrategias.
+
+Las reglas de salida son las de `run_bot._should_exit` con los
+parámetros de cada estrategia.  Las posiciones se vuelcan por lotes
+(upsert) a la tabla `shadow_positions`; al arrancar se recuperan las
+abiertas.  Comparativa de lo persistido:
+
+    python -m memebot2.trader.shadow [--hours 24] [--json]
+
+Formato de SHADOW_FILE (campos ausentes = valores del bot real):
+
+    {"strategies": [
+        {"name": "base"},
+        {"name": "laxa", "min_score": 55},
+        {"name": "scalper", "take_profit_pct": 30, "stop_loss_pct": 15,
+         "trailing_pct": 10, "max_holding_h": 1}
+    ]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as _dt
+import json
+import logging
+import pathlib
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from ..analytics.filters import RULES
+from ..config import SHADOW_FILE, exits
+from ..config import config as _cfg
+from ..db.candidate import TokenCandidate
+from ..db.database import SessionLocal, async_init_db
+from ..db.models import ShadowPosition as _Row
+
+log = logging.getLogger("shadow")
+
+FLUSH_EVERY = 200                 # cambios pendientes antes de volcar solo
+
+
+def _utcnow() -> _dt.datetime:
+    return _dt.datetime.utcnow()
+
+
+# ───────────────────────── estrategias ─────────────────────────
+class Strategy(NamedTuple):
+    name: str
+    min_score: int
+    take_profit_pct: float
+    stop_loss_pct: float
+    trailing_pct: float
+    max_holding_h: float
+
+
+def _strategy(raw: dict) -> Strategy:
+    return Strategy(
+        name=str(raw["name"])[:32],
+        min_score=int(raw.get("min_score", RULES.min_score)),
+        take_profit_pct=float(raw.get("take_profit_pct", exits.TAKE_PROFIT_PCT)),
+        stop_loss_pct=float(raw.get("stop_loss_pct", exits.STOP_LOSS_PCT)),
+        trailing_pct=float(raw.get("trailing_pct", exits.TRAILING_PCT)),
+        max_holding_h=float(raw.get("max_holding_h", exits.MAX_HOLDING_H)),
+    )
+
+
+def load_strategies(path: str | pathlib.Path = SHADOW_FILE) -> List[Strategy]:
+    path = pathlib.Path(path)
+    if not path.is_absolute():
+        path = _cfg.ROOT_DIR / path
+    try:
+        raw = json.loads(path.read_text())
+        strategies = [_strategy(s) for s in raw.get("strategies", ())]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise RuntimeError(f"No se pudieron leer estrategias {path}: {e}") from e
+    names = [s.name for s in strategies]
+    if len(set(names)) != len(names):
+        raise RuntimeError(f"Estrategias con nombre repetido en {path}: {names}")
+    return strategies
+
+
+def exit_reason(
+    s: Strategy, pnl_pct: float, highest_pnl_pct: float, age_h: float
+) -> Optional[str]:
+    """Motivo de salida (mismas reglas que `run_bot._should_exit`) o None."""
+    if pnl_pct <= highest_pnl_pct - s.trailing_pct:
+        return "trailing"
+    if pnl_pct >= s.take_profit_pct:
+        return "tp"
+    if pnl_pct <= -s.stop_loss_pct:
+        return "sl"
+    if age_h >= s.max_holding_h:
+        return "max_hold"
+    return None
+
+
+# ───────────────────────── libro virtual ───────────────────────
+class PaperPosition:
+    __slots__ = (
+        "strategy", "address", "symbol", "score", "opened_at", "buy_price_usd",
+        "highest_pnl_pct", "closed_at", "close_price_usd", "pnl_pct", "reason",
+    )
+
+    def __init__(
+        self,
+        strategy: str,
+        address: str,
+        symbol: str | None,
+        score: int,
+        opened_at: _dt.datetime,
+        buy_price_usd: float,
+        highest_pnl_pct: float = 0.0,
+    ) -> None:
+        self.strategy = strategy
+        self.address = address
+        self.symbol = symbol
+        self.score = score
+        self.opened_at = opened_at
+        self.buy_price_usd = buy_price_usd
+        self.highest_pnl_pct = highest_pnl_pct
+        self.closed_at: Optional[_dt.datetime] = None
+        self.close_price_usd: Optional[float] = None
+        self.pnl_pct: Optional[float] = None
+        self.reason: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, str, _dt.datetime]:
+        return self.strategy, self.address, self.opened_at
+
+    def row(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "address": self.address,
+            "opened_at": self.opened_at,
+            "symbol": self.symbol,
+            "score": self.score,
+            "buy_price_usd": self.buy_price_usd,
+            "highest_pnl_pct": self.highest_pnl_pct,
+            "closed": self.closed_at is not None,
+            "closed_at": self.closed_at,
+            "close_price_usd": self.close_price_usd,
+            "pnl_pct": self.pnl_pct,
+            "reason": self.reason,
+        }
+
+
+class Book:
+    """Posiciones abiertas y PnL acumulado (desde el arranque) de una estrategia."""
+
+    def __init__(self, strategy: Strategy) -> None:
+        self.strategy = strategy
+        self.open: Dict[str, PaperPosition] = {}
+        self.stats = {"seen": 0, "bought": 0, "undecided": 0, "closed": 0, "wins": 0}
+        self.pnl_sum = 0.0
+        self.best: Optional[float] = None
+        self.worst: Optional[float] = None
+        self.reasons: Counter[str] = Counter()
+
+    def close(self, pos: PaperPosition, price_usd: float, reason: str, now: _dt.datetime) -> None:
+        del self.open[pos.address]
+        pos.closed_at = now
+        pos.close_price_usd = price_usd
+        pos.pnl_pct = (price_usd / pos.buy_price_usd - 1) * 100
+        pos.reason = reason
+        self.stats["closed"] += 1
+        self.stats["wins"] += pos.pnl_pct > 0
+        self.pnl_sum += pos.pnl_pct
+        self.best = pos.pnl_pct if self.best is None else max(self.best, pos.pnl_pct)
+        self.worst = pos.pnl_pct if self.worst is None else min(self.worst, pos.pnl_pct)
+        self.reasons[reason] += 1
+
+    def summary(self) -> Dict[str, object]:
+        n = self.stats["closed"]
+        return {
+            **self.stats,
+            "open": len(self.open),
+            "win_rate": round(self.stats["wins"] / n, 3) if n else None,
+            "pnl_sum_pct": round(self.pnl_sum, 1),
+            "pnl_avg_pct": round(self.pnl_sum / n, 2) if n else None,
+            "best_pct": None if self.best is None else round(self.best, 1),
+            "worst_pct": None if self.worst is None else round(self.worst, 1),
+            "reasons": dict(self.reasons),
+        }
+
+
+# ───────────────────────── motor ───────────────────────────────
+class ShadowEngine:
+    def __init__(self, strategies: Iterable[Strategy], session_factory=SessionLocal) -> None:
+        self.books: Dict[str, Book] = {s.name: Book(s) for s in strategies}
+        self._session = session_factory
+        self._held: Counter[str] = Counter()          # token → nº de libros con él
+        self._dirty: Dict[tuple, PaperPosition] = {}
+        self._flushing: Optional[asyncio.Task] = None
+
+    def thresholds(self) -> List[int]:
+        return sorted({b.strategy.min_score for b in self.books.values()})
+
+    def holds(self, address: str) -> bool:
+        return self._held[address] > 0
+
+    def addresses(self) -> List[str]:
+        return [a for a, n in self._held.items() if n > 0]
+
+    def _touch(self, pos: PaperPosition) -> None:
+        self._dirty[pos.key] = pos
+        if len(self._dirty) >= FLUSH_EVERY and self._flushing is None:
+            self._flushing = asyncio.get_running_loop().create_task(self.flush())
+
+    # ── entradas ──
+    def on_scored(self, token: TokenCandidate, score: int, upper: int) -> bool:
+        """Abre posición virtual donde toque.  True si alguna estrategia compró."""
+        now = _utcnow()
+        opened = False
+        for book in self.books.values():
+            th = book.strategy.min_score
+            book.stats["seen"] += 1
+            if score < th:
+                if upper >= th:
+                    book.stats["undecided"] += 1
+                continue
+            if not token.price_usd or token.address in book.open:
+                continue
+            pos = PaperPosition(book.strategy.name, token.address, token.symbol or None,
+                                score, now, token.price_usd)
+            book.open[token.address] = pos
+            book.stats["bought"] += 1
+            self._held[token.address] += 1
+            self._touch(pos)
+            opened = True
+        return opened
+
+    # ── salidas ──
+    def on_price(self, address: str, price_usd: float) -> bool:
+        """Aplica las salidas de cada libro.  True si algún libro sigue con el token."""
+        if not self._held[address] or not price_usd:
+            return self.holds(address)
+        now = _utcnow()
+        for book in self.books.values():
+            pos = book.open.get(address)
+            if pos is None:
+                continue
+            pnl_pct = (price_usd / pos.buy_price_usd - 1) * 100
+            changed = pnl_pct > pos.highest_pnl_pct
+            if changed:
+                pos.highest_pnl_pct = pnl_pct
+            age_h = (now - pos.opened_at).total_seconds() / 3600
+            reason = exit_reason(book.strategy, pnl_pct, pos.highest_pnl_pct, age_h)
+            if reason is not None:
+                book.close(pos, price_usd, reason, now)
+                self._held[address] -= 1
+                changed = True
+                log.debug("[shadow] %s cierra %s %s pnl=%.1f%%",
+                          book.strategy.name, pos.symbol or address[:4], reason, pos.pnl_pct)
+            if changed:
+                self._touch(pos)
+        if not self._held[address]:
+            del self._held[address]
+            return False
+        return True
+
+    # ── persistencia ──
+    async def restore(self) -> List[str]:
+        """Recupera las posiciones abiertas de las estrategias configuradas."""
+        async with self._session() as s:
+            rows = (await s.execute(select(_Row).where(
+                _Row.closed.is_(False), _Row.strategy.in_(list(self.books))
+            ))).scalars().all()
+        for r in rows:
+            self.books[r.strategy].open[r.address] = PaperPosition(
+                r.strategy, r.address, r.symbol, r.score, r.opened_at,
+                r.buy_price_usd, r.highest_pnl_pct,
+            )
+            self._held[r.address] += 1
+        log.info("[shadow] %s estrategias, %s posiciones abiertas recuperadas",
+                 len(self.books), len(rows))
+        return self.addresses()
+
+    async def flush(self) -> int:
+        """Vuelca (upsert) las posiciones cambiadas.  Devuelve cuántas."""
+        try:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            rows = [pos.row() for pos in batch.values()]
+            stmt = insert(_Row).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[_Row.strategy, _Row.address, _Row.opened_at],
+                set_={c: stmt.excluded[c] for c in (
+                    "highest_pnl_pct", "closed", "closed_at",
+                    "close_price_usd", "pnl_pct", "reason",
+                )},
+            )
+            try:
+                async with self._session() as s:
+                    await s.execute(stmt)
+                    await s.commit()
+            except Exception as e:
+                log.warning("[shadow] no se pudo volcar: %s", e)
+                self._dirty = {**batch, **self._dirty}
+                return 0
+            return len(rows)
+        finally:
+            self._flushing = None
+
+    def report(self) -> Dict[str, dict]:
+        return {name: book.summary() for name, book in self.books.items()}
+
+
+def make_engine(path: str = SHADOW_FILE) -> Optional[ShadowEngine]:
+    """Motor con las estrategias de SHADOW_FILE, o None si está vacío."""
+    if not path:
+        return None
+    return ShadowEngine(load_strategies(path))
+
+
+# ───────────────────────── informe (CLI) ───────────────────────
+def compare(rows: Iterable[_Row]) -> Dict[str, dict]:
+    """Resumen por estrategia de filas de `shadow_positions`."""
+    books: Dict[str, dict] = {}
+    for r in rows:
+        b = books.setdefault(r.strategy, {"pnl": [], "open": 0, "reasons": Counter()})
+        if r.closed and r.pnl_pct is not None:
+            b["pnl"].append(r.pnl_pct)
+            b["reasons"][r.reason] += 1
+        else:
+            b["open"] += 1
+    out = {}
+    for name, b in books.items():
+        pnl, n = b["pnl"], len(b["pnl"])
+        out[name] = {
+            "closed": n,
+            "open": b["open"],
+            "win_rate": round(sum(p > 0 for p in pnl) / n, 3) if n else None,
+            "pnl_sum_pct": round(sum(pnl), 1),
+            "pnl_avg_pct": round(sum(pnl) / n, 2) if n else None,
+            "best_pct": round(max(pnl), 1) if n else None,
+            "worst_pct": round(min(pnl), 1) if n else None,
+            "reasons": dict(b["reasons"]),
+        }
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]["pnl_sum_pct"]))
+
+
+async def _load(hours: float) -> List[_Row]:
+    await async_init_db()
+    stmt = select(_Row)
+    if hours > 0:
+        stmt = stmt.where(_Row.opened_at >= _utcnow() - _dt.timedelta(hours=hours))
+    async with SessionLocal() as s:
+        return list((await s.execute(stmt)).scalars().all())
+
+
+def _print(report: Dict[str, dict]) -> None:
+    if not report:
+        print("sin posiciones en sombra")
+        return
+    print(f"{'estrategia':<20} {'cerradas':>8} {'abiertas':>8} {'aciertos':>8} "
+          f"{'pnl Σ%':>9} {'pnl x̄%':>8} {'mejor%':>8} {'peor%':>8}  salidas")
+    for name, r in report.items():
+        rate = "–" if r["win_rate"] is None else f"{100 * r['win_rate']:.0f}%"
+        fmt = lambda v: "–" if v is None else f"{v:.1f}"  # noqa: E731
+        print(f"{name:<20} {r['closed']:>8} {r['open']:>8} {rate:>8} "
+              f"{r['pnl_sum_pct']:>9.1f} {fmt(r['pnl_avg_pct']):>8} "
+              f"{fmt(r['best_pct']):>8} {fmt(r['worst_pct']):>8}  {r['reasons']}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Comparativa de estrategias en sombra")
+    ap.add_argument("--hours", type=float, default=0, help="sólo posiciones abiertas en las últimas N h")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    report = compare(asyncio.run(_load(args.hours)))
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,41 @@
 # memebot2/trader/sol_signer.py
+"""
+Firma y envío de transacciones con la clave de SOL_PRIVATE_KEY.
+
+Nada se construye al importar: la clave se decodifica y el `Client` RPC se
+crea en el primer uso (`keypair()`, `rpc_client()` o los alias de módulo
+`KEYPAIR`, `PUBLIC_KEY`, `client`).  Así las herramientas que sólo tocan la
+BD o los fetchers no cargan solders/solana ni exigen la clave.
+"""
+
 from __future__ import annotations
 
 import base64
-import base58
 import json
 import os
-from typing import Final, Union
+from typing import TYPE_CHECKING, Final, Optional, Union
+
+from ..config import SOL_SKIP_PREFLIGHT
+from ..utils import metrics
 
-from solders.keypair import Keypair
-from solders.pubkey import Pubkey as PublicKey
-from solders.transaction import Transaction
-from solana.rpc.api import Client
+if TYPE_CHECKING:
+    from solana.rpc.api import Client
+    from solders.keypair import Keypair
+    from solders.pubkey import Pubkey as PublicKey
+    from solders.transaction import VersionedTransaction
 
 # ─────────────────────── variables entorno ────────────────────
 RAW_SECRET: Final[str | None] = os.getenv("SOL_PRIVATE_KEY")
 RPC_URL: Final[str] = os.getenv("SOL_RPC_URL", "https://api.mainnet-beta.solana.com")
 
-if not RAW_SECRET:
-    raise RuntimeError("Falta SOL_PRIVATE_KEY en .env")
+_keypair: Optional["Keypair"] = None
+_client: Optional["Client"] = None
+
 
 # ───────────────────────── Helpers ─────────────────────────────
 def _decode(raw: str) -> bytes:
+    import base58
+
     raw = raw.strip().split()[0]
     if raw.startswith("["):
         return bytes(json.loads(raw))
@@ -30,41 +45,82 @@ def _decode(raw: str) -> bytes:
         return base64.b64decode(raw)
 
 
-def _to_tx(obj: Union[str, bytes, Transaction]) -> Transaction:
-    if isinstance(obj, Transaction):
+def _to_tx(obj: Union[str, bytes, "VersionedTransaction"]) -> "VersionedTransaction":
+    from solders.transaction import VersionedTransaction
+
+    if isinstance(obj, VersionedTransaction):
         return obj
     if isinstance(obj, str):
         obj = base64.b64decode(obj)
-    return Transaction.deserialize(obj)
+    return VersionedTransaction.from_bytes(obj)
+
+
+# ───────────────────────── Keypair / RPC ───────────────────────
+def keypair() -> "Keypair":
+    """Keypair de SOL_PRIVATE_KEY (se decodifica una sola vez)."""
+    global _keypair
+    if _keypair is None:
+        if not RAW_SECRET:
+            raise RuntimeError("Falta SOL_PRIVATE_KEY en .env")
+        from solders.keypair import Keypair
+
+        try:
+            secret = _decode(RAW_SECRET)
+            if len(secret) == 64:
+                _keypair = Keypair.from_bytes(secret)
+            elif len(secret) == 32:
+                _keypair = Keypair.from_seed(secret)
+            else:
+                raise ValueError("Longitud de clave inválida")
+        except Exception as e:
+            raise RuntimeError(f"No se pudo crear Keypair: {e}")
+    return _keypair
 
 
-# ───────────────────────── Keypair ─────────────────────────────
-SECRET_BYTES: Final[bytes] = _decode(RAW_SECRET)
+def public_key() -> "PublicKey":
+    return keypair().pubkey()
 
-try:
-    if len(SECRET_BYTES) == 64:
-        KEYPAIR = Keypair.from_bytes(SECRET_BYTES)
-    elif len(SECRET_BYTES) == 32:
-        KEYPAIR = Keypair.from_seed(SECRET_BYTES)
-    else:
-        raise ValueError("Longitud de clave inválida")
-except Exception as e:
-    raise RuntimeError(f"No se pudo crear Keypair: {e}")
 
-PUBLIC_KEY: Final[PublicKey] = KEYPAIR.pubkey()
-client: Final[Client] = Client(RPC_URL)
+def rpc_client() -> "Client":
+    global _client
+    if _client is None:
+        from solana.rpc.api import Client
+
+        _client = Client(RPC_URL)
+    return _client
+
+
+_LAZY = {"KEYPAIR": keypair, "PUBLIC_KEY": public_key, "client": rpc_client}
+
+
+def __getattr__(name: str):
+    # compatibilidad: sol_signer.KEYPAIR / PUBLIC_KEY / client
+    if name in _LAZY:
+        value = globals()[name] = _LAZY[name]()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # ───────────────────────── API Pública ─────────────────────────
-def sign_and_send(tx: Union[str, bytes, Transaction]) -> str:
+def sign_and_send(tx: Union[str, bytes, "VersionedTransaction"]) -> str:
     """
-    Firma y envía una transacción (base64 | bytes | Transaction).
+    Firma y envía una transacción (base64 | bytes | VersionedTransaction).
+
+    La transacción llega ya montada por el router (blockhash incluido y
+    nuestra clave como fee payer): sólo se firma.  El RPC la simula antes
+    de difundirla (salvo SOL_SKIP_PREFLIGHT=1), así que un swap que fallaría
+    lanza excepción aquí en vez de aterrizar en la cadena pagando comisión.
+    Llamada bloqueante (RPC síncrono): desde código async, vía
+    `asyncio.to_thread`.
 
     Devuelve la `signature` en base-58.
     """
-    tx = _to_tx(tx)
-    latest = client.get_latest_blockhash()["result"]["value"]["blockhash"]
-    tx.recent_blockhash = latest
-    tx.fee_payer = PUBLIC_KEY
-    tx.sign([KEYPAIR])
-    sig = client.send_raw_transaction(bytes(tx))
-    return sig["result"]
+    from solana.rpc.types import TxOpts
+    from solders.transaction import VersionedTransaction
+
+    with metrics.stage("sign"):
+        unsigned = _to_tx(tx)
+        signed = VersionedTransaction(unsigned.message, [keypair()])
+    with metrics.stage("send"):
+        resp = rpc_client().send_raw_transaction(bytes(signed), opts=TxOpts(skip_preflight=SOL_SKIP_PREFLIGHT))
+    return str(resp.value)
@@ -4,14 +4,23 @@ Utilidades auxiliares desacopladas de negocio principal:
     from memebot2.utils import lista_pares, descubridor_pares
 """
 
+from __future__ import annotations
+
 from importlib import import_module
 from types import ModuleType
-from typing import Dict
-
-_modules = ("lista_pares", "descubridor_pares")
 
-globals_: Dict[str, ModuleType] = globals()
-for _m in _modules:
-    globals_[_m] = import_module(f"{__name__}.{_m}")
+_modules = ("lista_pares", "descubridor_pares", "rechazados", "fastjson", "tape", "metrics", "trace", "loop_monitor", "log_setup", "eventloop")
 
 __all__ = list(_modules)
+
+
+def __getattr__(name: str) -> ModuleType:
+    # PEP 562: el sub-módulo se importa la primera vez que se pide
+    if name in _modules:
+        mod = globals()[name] = import_module(f"{__name__}.{name}")
+        return mod
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_modules})
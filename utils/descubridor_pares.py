@@ -4,29 +4,63 @@ Scraper ultra-ligero de DexScreener que lista tokens *recién creados* en la
 red Solana.  Sólo aplica el filtro de antigüedad (`MAX_AGE_DAYS`); el resto de
 filtros los ejecuta `analytics.filters` posterior.
 
-Devuelve una lista con los **mint addresses** candidatos.
+• Consulta **todas** las fuentes en paralelo y emite candidatos según va
+  respondiendo cada una (`iter_candidate_pairs`, async-generator de
+  `Candidate(address, source, created_at)`).
+• Deduplica entre fuentes dentro de la misma pasada.
+• Cursor incremental por fuente (persistido en DATA_DIR/discovery_cursors.json):
+    – si el item trae fecha de creación → high-water mark `ts`
+    – si no → ids vistos en la pasada anterior
+  así cada pasada sólo procesa lo nuevo.
+• Las fuentes que devuelven pares alimentan `fetcher.pair_index`
+  (mint → par principal) para que `get_pair` vaya directo al pool.
+
+• Las respuestas (hasta 500 items) se decodifican con `utils.fastjson`
+  directamente a `DexItem` (sólo los campos que se usan); el árbol de
+  dicts completo no sobrevive a la decodificación.
+
+`fetch_candidate_pairs()` conserva la API antigua (lista de mint addresses).
 """
 
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
-import os
-from typing import List
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Union
 
 import aiohttp
 
-from ..config import DEX_API_BASE, MAX_AGE_DAYS
+from ..config import DATA_DIR, DEX_API_BASE, MAX_AGE_DAYS
+from ..fetcher import pair_index
+from . import fastjson
 
 log = logging.getLogger("descubridor")
-log.setLevel(logging.DEBUG)
 
 DEX = DEX_API_BASE.rstrip("/")
-URLS = [
-    f"{DEX}/token-profiles/latest/v1?chainId=solana&limit=500",
-    f"{DEX}/token-profiles/latest?chainId=solana&limit=500",
-    f"{DEX}/latest/dex/tokens/solana?limit=500",
-]
+SOURCES: Dict[str, str] = {
+    "profiles_v1": f"{DEX}/token-profiles/latest/v1?chainId=solana&limit=500",
+    "profiles": f"{DEX}/token-profiles/latest?chainId=solana&limit=500",
+    "tokens": f"{DEX}/latest/dex/tokens/solana?limit=500",
+}
+URLS = list(SOURCES.values())
+
+CURSOR_FILE = DATA_DIR / "discovery_cursors.json"
+CURSOR_IDS_MAX = 1_000          # ids recordados por fuente sin timestamp
+
+
+class DexItem(NamedTuple):
+    address: str
+    created_ms: int                 # pairCreatedAt (0 si no viene)
+    age_days: float                 # ageDays/age declarada (99 si no viene)
+    pair_address: Optional[str]
+    liquidity: float
+
+
+class Candidate(NamedTuple):
+    address: str
+    source: str
+    created_at: Optional[float]     # epoch s del lanzamiento (si la fuente lo da)
 
 
 # ---------------------------- helpers --------------------------
@@ -37,13 +71,13 @@ def _to_float(v, default=0.0):
         return default
 
 
-async def _json(s: aiohttp.ClientSession, url: str):
+async def _raw(s: aiohttp.ClientSession, url: str) -> bytes | None:
     try:
         async with s.get(url, timeout=20, headers={"User-Agent": "Mozilla/5.0"}) as r:
             if r.status == 404:
                 return None
             r.raise_for_status()
-            return await r.json()
+            return await r.read()
     except Exception:
         return None
 
@@ -58,45 +92,198 @@ def _items(raw) -> list:
     return []
 
 
-# ---------------------- función principal ----------------------
-async def fetch_candidate_pairs() -> List[str]:
-    """
-    Escanea los 3 endpoints públicos y extrae los mint-addresses cuya edad
-    (en días) sea ≤ MAX_AGE_DAYS.
+def _address(t: dict) -> str | None:
+    return (
+        t.get("tokenAddress")
+        or t.get("baseToken", {}).get("address")
+        or t.get("address")
+    )
 
-    Devuelve lista sin duplicados.
-    """
-    async with aiohttp.ClientSession() as s:
-        raw = None
-        for u in URLS:
-            raw = await _json(s, u)
-            if raw:
-                log.debug("DexScreener OK → %s", u.split(DEX)[1])
-                break
-        if not raw:
-            log.error("DexScreener: ningún endpoint disponible")
-            return []
-
-    out = []
-    for t in _items(raw):
-        addr = (
-            t.get("tokenAddress")
-            or t.get("baseToken", {}).get("address")
-            or t.get("address")
-        )
+
+_struct_decode: Optional[Callable[[bytes | str], list[DexItem]]] = None
+
+
+def _build_struct_decoder() -> Callable[[bytes | str], list[DexItem]]:
+    """Esquema msgspec con sólo los campos de `DexItem`."""
+    from msgspec import defstruct       # defstruct: anotaciones reales, no str
+
+    _Ref = defstruct("_Ref", [("address", Optional[str], None)])
+    _Liq = defstruct("_Liq", [("usd", Any, None)])
+    _Item = defstruct("_Item", [
+        ("tokenAddress", Optional[str], None),
+        ("address", Optional[str], None),
+        ("baseToken", Optional[_Ref], None),
+        ("chainId", Optional[str], None),
+        ("pairAddress", Optional[str], None),
+        ("pairCreatedAt", Any, None),
+        ("ageDays", Any, None),
+        ("age", Any, None),
+        ("liquidity", Optional[_Liq], None),
+    ])
+    _Envelope = defstruct("_Envelope", [
+        (k, Optional[list[_Item]], None) for k in ("pairs", "tokens", "dexTokens", "data")
+    ])
+
+    decode = fastjson.struct_decoder(Union[list[_Item], _Envelope, None])
+
+    def _decode(raw: bytes | str) -> list[DexItem]:
+        doc = decode(raw)
+        if doc is None or isinstance(doc, list):
+            items = doc or []
+        else:
+            items = doc.pairs or doc.tokens or doc.dexTokens or doc.data or []
+        out = []
+        for t in items:
+            addr = t.tokenAddress or (t.baseToken and t.baseToken.address) or t.address
+            if not addr:
+                continue
+            pair = t.pairAddress if (t.chainId or "solana") == "solana" else None
+            out.append(DexItem(
+                addr,
+                int(_to_float(t.pairCreatedAt, 0)),
+                _to_float(t.ageDays or t.age, 99),
+                pair,
+                _to_float(t.liquidity.usd, 0) if pair and t.liquidity else 0.0,
+            ))
+        return out
+
+    return _decode
+
+
+def decode_items(raw: bytes | str) -> list[DexItem]:
+    """Respuesta de cualquier fuente → lista compacta de `DexItem`."""
+    global _struct_decode
+    if fastjson.TYPED:
+        if _struct_decode is None:
+            _struct_decode = _build_struct_decoder()
+        return _struct_decode(raw)
+
+    out: list[DexItem] = []
+    for t in _items(fastjson.loads(raw)):
+        if not isinstance(t, dict):
+            continue
+        addr = _address(t)
         if not addr:
             continue
+        pair = t.get("pairAddress") if t.get("chainId", "solana") == "solana" else None
+        out.append(DexItem(
+            addr,
+            int(_to_float(t.get("pairCreatedAt"), 0)),
+            _to_float(t.get("ageDays") or t.get("age"), 99),
+            pair,
+            _to_float((t.get("liquidity") or {}).get("usd"), 0) if pair else 0.0,
+        ))
+    return out
+
 
-        age = _to_float(t.get("ageDays") or t.get("age"), 99)
-        log.debug("⏱ %s age=%.1f", addr[:4], age)
+# ---------------------------- cursores --------------------------
+def _load_cursors() -> Dict[str, dict]:
+    try:
+        return json.loads(CURSOR_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
 
-        if age <= MAX_AGE_DAYS:
-            out.append(addr)
 
-    log.info("Descubridor: %s candidatos", len(out))
+_cursors: Dict[str, dict] = _load_cursors()
+
+
+def _save_cursors() -> None:
+    try:
+        CURSOR_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CURSOR_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_cursors))
+        tmp.replace(CURSOR_FILE)
+    except OSError as e:
+        log.warning("Descubridor: no se pudo guardar cursores: %s", e)
+
+
+def _new_items(source: str, items: list[DexItem]) -> list[DexItem]:
+    """Filtra por el cursor de `source` y lo avanza."""
+    cur = _cursors.get(source, {})
+    hwm = cur.get("ts", 0)
+    seen_before = set(cur.get("ids", ()))
+
+    out: list[DexItem] = []
+    max_ts = hwm
+    ids: list[str] = []
+    for t in items:
+        addr, ts = t.address, t.created_ms
+        if ts:
+            max_ts = max(max_ts, ts)
+            if ts <= hwm:
+                continue
+        else:
+            ids.append(addr)
+            if addr in seen_before:
+                continue
+        out.append(t)
+
+    _cursors[source] = {"ts": max_ts, "ids": ids[:CURSOR_IDS_MAX]}
     return out
 
 
+def reset_cursors() -> None:
+    """Olvida los cursores (la próxima pasada procesa todo otra vez)."""
+    _cursors.clear()
+    _save_cursors()
+
+
+# ---------------------- función principal ----------------------
+async def iter_candidate_pairs() -> AsyncIterator[Candidate]:
+    """
+    Escanea todas las fuentes en paralelo y va emitiendo los candidatos
+    **nuevos** (según cursor) cuya edad sea ≤ MAX_AGE_DAYS, sin duplicados.
+    """
+    emitted: set[str] = set()
+    ok_sources = 0
+
+    async with aiohttp.ClientSession() as s:
+        async def _fetch(source: str, url: str):
+            return source, await _raw(s, url)
+
+        tasks = [_fetch(src, url) for src, url in SOURCES.items()]
+        for fut in asyncio.as_completed(tasks):
+            source, raw = await fut
+            if not raw:
+                log.debug("DexScreener ✗ %s", source)
+                continue
+            ok_sources += 1
+
+            try:
+                items = decode_items(raw)
+            except ValueError as e:
+                log.debug("DexScreener ✗ %s (JSON: %s)", source, e)
+                continue
+            pair_index.note_rows(                   # fuentes con pares → índice
+                (t.address, t.pair_address, t.liquidity) for t in items if t.pair_address
+            )
+            fresh = _new_items(source, items)
+            n_new = 0
+            for t in fresh:
+                if t.address in emitted or t.age_days > MAX_AGE_DAYS:
+                    continue
+                emitted.add(t.address)
+                n_new += 1
+                yield Candidate(t.address, source, t.created_ms / 1000 or None)
+            log.debug("DexScreener OK → %s  items=%s nuevos=%s",
+                      source, len(items), n_new)
+
+    if not ok_sources:
+        log.error("DexScreener: ningún endpoint disponible")
+        return
+    _save_cursors()
+    log.info("Descubridor: %s candidatos (%s fuentes)", len(emitted), ok_sources)
+
+
+async def fetch_candidate_pairs() -> List[str]:
+    """
+    Versión lista de `iter_candidate_pairs` (API histórica).
+
+    Devuelve lista sin duplicados.
+    """
+    return [c.address async for c in iter_candidate_pairs()]
+
+
 # Quick CLI test:  python -m memebot2.utils.descubridor_pares
 if __name__ == "__main__":
     async def _test():
@@ -0,0 +1,53 @@
+# memebot2/utils/eventloop.py
+"""
+Event loop de arranque con **uvloop** opcional.
+
+EVENT_LOOP = "auto" (por defecto: uvloop si está instalado, si no el de
+asyncio) | "uvloop" (obligatorio: falla si no está) | "asyncio".
+
+    from memebot2.utils import eventloop
+    eventloop.run(main_loop())          # en vez de asyncio.run(...)
+
+`pip install uvloop` basta para notarlo (Linux/macOS; en Windows no
+existe y "auto" cae a asyncio).  Comparativa en `bench/loop_compare.py`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+log = logging.getLogger("eventloop")
+
+T = TypeVar("T")
+
+
+def loop_factory(name: Optional[str] = None) -> tuple[str, Optional[Callable[[], asyncio.AbstractEventLoop]]]:
+    """
+    (nombre efectivo, fábrica) — fábrica None = loop por defecto de asyncio.
+
+    Con `name` explícito no se importa `config` (los benchmarks eligen el
+    loop antes de fijar su entorno).
+    """
+    if name is None:
+        from ..config import EVENT_LOOP as name
+    if name not in ("auto", "uvloop", "asyncio"):
+        raise ValueError(f"EVENT_LOOP desconocido: {name} (auto | uvloop | asyncio)")
+    if name == "asyncio":
+        return "asyncio", None
+    try:
+        import uvloop
+    except ImportError:
+        if name == "uvloop":
+            raise RuntimeError("EVENT_LOOP=uvloop pero uvloop no está instalado") from None
+        return "asyncio", None
+    return "uvloop", uvloop.new_event_loop
+
+
+def run(main: Coroutine[Any, Any, T], name: Optional[str] = None) -> T:
+    """`asyncio.run(main)` con el loop elegido por EVENT_LOOP."""
+    chosen, factory = loop_factory(name)
+    log.info("event loop: %s", chosen)
+    with asyncio.Runner(loop_factory=factory) as runner:
+        return runner.run(main)
@@ -0,0 +1,95 @@
+# memebot2/utils/fastjson.py
+"""
+Decodificación JSON compartida con backend rápido opcional.
+
+Orden de preferencia: **orjson** → **msgspec** → `json` de la stdlib.
+Ninguno es obligatorio; con `pip install orjson` basta para notarlo.
+
+    from memebot2.utils import fastjson
+    data = await fastjson.read_json(resp)      # aiohttp.ClientResponse
+    data = fastjson.loads(ws_msg.data)          # str | bytes
+
+Decodificadores tipados: con **msgspec** instalado (y sin backend forzado
+a otro) `TYPED` es True y los módulos pueden decodificar directamente a
+`msgspec.Struct` con sólo los campos que usan (`struct_decoder`); el resto
+del documento se salta sin crear objetos.  Si no, usan `loads` + proyección.
+
+`BACKEND` indica el que está activo (forzable con JSON_BACKEND=json, útil
+para comparar en `bench/json_parse.py`).  Consultar siempre
+`fastjson.loads` (no importar `loads` suelto) para respetar `_select`.
+Un JSON inválido lanza siempre `ValueError` (sea cual sea el backend).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+from ..config import JSON_BACKEND
+
+BACKEND: str
+TYPED: bool
+loads: Callable[[str | bytes], Any]
+
+
+def _select(name: str | None = None) -> None:
+    """Elige backend (el mejor disponible si `name` es None)."""
+    global BACKEND, TYPED, loads
+    try:
+        import msgspec  # noqa: F401
+        TYPED = name in (None, "msgspec")
+    except ImportError:
+        TYPED = False
+    for cand in ([name] if name else ["orjson", "msgspec", "json"]):
+        if cand == "orjson":
+            try:
+                import orjson
+            except ImportError:
+                continue
+            BACKEND, loads = "orjson", orjson.loads
+            return
+        if cand == "msgspec":
+            try:
+                import msgspec
+            except ImportError:
+                continue
+            decode = msgspec.json.Decoder().decode
+
+            def _loads(raw: str | bytes) -> Any:
+                try:
+                    return decode(raw)
+                except msgspec.DecodeError as e:     # mismo contrato que json
+                    raise ValueError(str(e)) from e
+
+            BACKEND, loads = "msgspec", _loads
+            return
+        if cand == "json":
+            BACKEND, loads = "json", json.loads
+            return
+    raise ValueError(f"backend JSON no disponible: {name}")
+
+
+_select(JSON_BACKEND or None)
+
+
+def struct_decoder(type_: Any) -> Callable[[str | bytes], Any]:
+    """
+    Decodificador msgspec para `type_` (requiere msgspec).  Errores de
+    sintaxis o de esquema → ValueError.
+    """
+    import msgspec
+
+    decode = msgspec.json.Decoder(type_).decode
+
+    def _decode(raw: str | bytes) -> Any:
+        try:
+            return decode(raw)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return _decode
+
+
+async def read_json(resp) -> Any:
+    """Cuerpo de una respuesta aiohttp decodificado con el backend activo."""
+    return loads(await resp.read())
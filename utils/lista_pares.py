@@ -7,59 +7,169 @@ Uso típico:
 
     from memebot2.utils.lista_pares import agregar_si_nuevo, obtener_pares
 
+Los pendientes viven en una cola de prioridad (heap): primero los
+lanzamientos más recientes, con un pequeño sesgo por fuente de
+descubrimiento.  Los candidatos que llevan más de PENDING_MAX_AGE_S en
+cola caducan y, si la cola supera PENDING_CAPACITY, se descartan los de
+menor prioridad (load shedding).
+
+La caché de procesados es un `ProcessedStore` (pubkeys de 32 bytes en un
+fichero ordenado vía mmap + delta en memoria): el arranque no depende del
+nº de direcciones vistas y las escrituras van con buffer.
+`pares_procesados.txt` (formato antiguo) se migra una sola vez.
+
 Este módulo es **thread-safe** dentro del event-loop: usa sólo estructuras
 locales y escrituras append a disco; no hay locks externos.
 """
 
 from __future__ import annotations
 
+import atexit
+import heapq
+import itertools
 import logging
-import pathlib
+import time
+from typing import Optional
+
+from ..config import DATA_DIR, PENDING_CAPACITY, PENDING_MAX_AGE_S, PROCESSED_TTL_H
+from . import rechazados
+from .processed_store import ProcessedStore
+
+BASE_DIR = DATA_DIR
+BASE_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_FILE = BASE_DIR / "pares_procesados.txt"          # formato antiguo
 
-BASE_DIR = pathlib.Path(__file__).resolve().parent.parent / "data"
-BASE_DIR.mkdir(exist_ok=True)
-CACHE_FILE = BASE_DIR / "pares_procesados.txt"
+# bonus de prioridad por fuente (segundos "más joven" que su launch real)
+SOURCE_BONUS: dict[str, float] = {"pumpfun": 120.0, "tokens": 60.0}
+UNKNOWN_LAUNCH_PENALTY_S = 3600.0   # sin fecha de lanzamiento → cuenta como 1 h
+
+_heap: list[tuple[float, int, str]] = []   # (-prioridad, seq, address)
+_pair_watch: dict[str, tuple[float, float, int]] = {}   # address → (prio, enqueued, seq)
+_seq = itertools.count()
+stats = {"expired": 0, "shed": 0}
+_processed = ProcessedStore(BASE_DIR, ttl_s=PROCESSED_TTL_H * 3600)
+atexit.register(_processed.flush)
 
-_pair_watch: set[str] = set()
-_processed: set[str] = set()
 
 # ───────────────────────── helpers internos ───────────────────
-def _load_cache() -> set[str]:
+def _migrate_legacy_cache() -> None:
+    """Importa `pares_procesados.txt` al store compacto (una vez)."""
     if not CACHE_FILE.exists():
-        return set()
-    with CACHE_FILE.open() as f:
-        return {line.strip() for line in f if line.strip()}
+        return
+    try:
+        with CACHE_FILE.open() as f:
+            _processed.add_many(line.strip() for line in f if line.strip())
+        _processed.compact()
+        CACHE_FILE.rename(CACHE_FILE.with_suffix(".txt.migrated"))
+        logging.info("[lista_pares] caché antigua migrada (%s entradas)", len(_processed))
+    except Exception as e:
+        logging.warning("[lista_pares] No se pudo migrar caché antigua: %s", e)
+
 
+_migrate_legacy_cache()
 
-# carga al importar el módulo
-_processed.update(_load_cache())
+
+def _priority(created_at: Optional[float], source: Optional[str], now: float) -> float:
+    launch = created_at if created_at else now - UNKNOWN_LAUNCH_PENALTY_S
+    return launch + SOURCE_BONUS.get(source or "", 0.0)
+
+
+def _shed() -> None:
+    """Deja sólo los PENDING_CAPACITY de mayor prioridad."""
+    keep = heapq.nsmallest(PENDING_CAPACITY, (
+        e for e in _heap if _pair_watch.get(e[2], (0, 0, -1))[2] == e[1]
+    ))
+    kept = {e[2] for e in keep}
+    dropped = [a for a in _pair_watch if a not in kept]
+    for a in dropped:
+        del _pair_watch[a]
+        rechazados.sin_evaluar(a)           # re-encolado → se reprograma
+    stats["shed"] += len(dropped)
+    _heap[:] = keep
+    heapq.heapify(_heap)
+    if dropped:
+        logging.info("[lista_pares] cola llena: descartados %s candidatos", len(dropped))
 
 
 # ───────────────────────── API pública ─────────────────────────
-def agregar_si_nuevo(address: str) -> None:
-    """Añade `address` a la lista de pendientes si no estaba visto."""
-    if address in _processed or address in _pair_watch:
+def agregar_si_nuevo(
+    address: str,
+    created_at: Optional[float] = None,
+    source: Optional[str] = None,
+) -> bool:
+    """
+    Añade `address` a la cola de pendientes si no estaba visto.
+
+    `created_at` (epoch s del lanzamiento) y `source` fijan la prioridad.
+    Devuelve True si se encoló.
+    """
+    if address in _pair_watch or address in _processed:
+        return False
+    now = time.time()
+    prio = _priority(created_at, source, now)
+    seq = next(_seq)
+    _pair_watch[address] = (prio, now, seq)
+    heapq.heappush(_heap, (-prio, seq, address))
+    if len(_pair_watch) > PENDING_CAPACITY * 1.25:      # amortizado
+        _shed()
+    return True
+
+
+def reencolar(address: str) -> None:
+    """
+    Vuelve a poner en cola un token ya procesado (re-evaluación tras
+    back-off de `rechazados`).  Prioridad de lanzamiento desconocida.
+    Si sale de la cola sin evaluarse (shedding/caducidad) se avisa a
+    `rechazados.sin_evaluar` para que no quede en vuelo para siempre.
+    """
+    if address in _pair_watch:
         return
-    _pair_watch.add(address)
+    now = time.time()
+    seq = next(_seq)
+    prio = _priority(None, "retry", now)
+    _pair_watch[address] = (prio, now, seq)
+    heapq.heappush(_heap, (-prio, seq, address))
+
+
+def siguientes_pares(n: int) -> list[str]:
+    """
+    Saca de la cola los `n` pendientes de mayor prioridad, descartando
+    por el camino los caducados (más de PENDING_MAX_AGE_S en cola).
+    """
+    out: list[str] = []
+    now = time.time()
+    while _heap and len(out) < n:
+        _, seq, address = heapq.heappop(_heap)
+        entry = _pair_watch.get(address)
+        if entry is None or entry[2] != seq:
+            continue                                   # entrada obsoleta
+        del _pair_watch[address]
+        if now - entry[1] > PENDING_MAX_AGE_S:
+            stats["expired"] += 1
+            rechazados.sin_evaluar(address)
+            continue
+        out.append(address)
+    return out
 
 
 def obtener_pares() -> list[str]:
-    """Devuelve copia de la lista de pares pendientes."""
-    return list(_pair_watch)
+    """Devuelve copia de los pares pendientes, por prioridad descendente."""
+    return sorted(_pair_watch, key=lambda a: _pair_watch[a][0], reverse=True)
+
+
+def pendientes() -> int:
+    return len(_pair_watch)
 
 
 def eliminar_par(address: str) -> None:
     """
     Saca el par de la lista activa y lo marca como procesado
-    (también lo escribe en caché para persistencia entre ejecuciones).
+    (se persiste con buffer; ver `ProcessedStore`).
     """
-    if address in _pair_watch:
-        _pair_watch.discard(address)
-
-    if address not in _processed:
-        try:
-            with CACHE_FILE.open("a") as f:
-                f.write(address + "\n")
-        except Exception as e:
-            logging.warning("[lista_pares] No se pudo escribir en caché: %s", e)
-        _processed.add(address)
+    _pair_watch.pop(address, None)                   # su entrada en heap caduca sola
+    _processed.add(address)
+
+
+def flush() -> None:
+    """Fuerza el volcado a disco de los procesados pendientes."""
+    _processed.flush()
@@ -0,0 +1,182 @@
+# memebot2/utils/log_setup.py
+"""
+Logging fuera del camino caliente.
+
+`setup()` (lo llama `run_bot` al importarse) sustituye a
+`logging.basicConfig`:
+
+• El root sólo tiene un `QueueHandler`: `log.x()` deja el registro en una
+  cola en memoria y vuelve.  Un `QueueListener` (hilo) lo formatea y lo
+  escribe en stderr.  Si la cola se llena (LOG_QUEUE_MAX) el registro se
+  descarta en vez de bloquear; el siguiente que entra lo indica.
+• Muestreo por plantilla: cada (logger, mensaje sin formatear) admite
+  LOG_RATE registros por segundo; el resto se omite y se cuenta, y el
+  siguiente admitido lleva "(+N omitidos)".  Así un "DESCARTADO %s" por
+  token no inunda la terminal en una ráfaga de descubrimiento.  WARNING
+  y superiores nunca se muestrean.
+• LOG_FORMAT=json → una línea JSON por registro (ts, level, logger, msg
+  y exc si la hay), para ingestión estructurada.
+• LOG_LEVELS="pumpfun=DEBUG,descubridor=DEBUG" sube/baja loggers concretos
+  sin tocar el código.
+
+Omitidos y descartados se cuentan en `utils.metrics` (log_sampled,
+log_dropped).
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import datetime as _dt
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+from ..config import LOG_FORMAT, LOG_LEVEL, LOG_LEVELS, LOG_QUEUE_MAX, LOG_RATE
+from . import metrics
+
+TEXT_FORMAT = "%(asctime)s  %(levelname)-8s %(name)s: %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+
+# ───────────────────────── muestreo ────────────────────────────
+class RateLimit(logging.Filter):
+    """Como mucho `rate` registros/s por plantilla (< WARNING)."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+        # plantilla → [ventana (s entero), admitidos, omitidos]
+        self._windows: Dict[Tuple[str, object], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate <= 0:
+            return True
+        msg = record.msg
+        key = (record.name, msg if isinstance(msg, str) else type(msg).__name__)
+        now = int(record.created)
+        with self._lock:
+            w = self._windows.get(key)
+            if w is None or w[0] != now:
+                skipped = w[2] if w is not None else 0
+                w = self._windows[key] = [now, 0, skipped]
+                if len(self._windows) > 10_000:         # plantillas dinámicas
+                    self._windows = {key: w}
+            if w[1] >= self.rate:
+                w[2] += 1
+                metrics.count("log_sampled")
+                return False
+            w[1] += 1
+            skipped, w[2] = w[2], 0
+        if skipped:
+            record.msg = f"{record.msg}  (+{skipped} omitidos)"
+        return True
+
+
+# ───────────────────────── cola ────────────────────────────────
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """`QueueHandler` que descarta (y cuenta) si la cola está llena."""
+
+    def __init__(self, q: queue.Queue) -> None:
+        super().__init__(q)
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # mensaje ya interpolado (los args pueden cambiar después) y la
+        # traza aparte, para que el formateador de salida la coloque
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _plain.formatException(record.exc_info)
+            record.exc_info = None
+        if self.dropped > self._reported:
+            record.msg = f"{record.msg}  ({self.dropped - self._reported} descartados: cola llena)"
+            self._reported = self.dropped
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.count("log_dropped")
+
+
+_plain = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": _dt.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _levels(spec: str) -> Dict[str, str]:
+    out = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, level = part.partition("=")
+        if level:
+            out[name.strip()] = level.strip().upper()
+    return out
+
+
+def setup(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    rate: float = LOG_RATE,
+    stream=None,
+) -> logging.handlers.QueueListener:
+    """Configura el root (idempotente: una segunda llamada no hace nada)."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    sink = logging.StreamHandler(stream or sys.stderr)
+    if fmt == "json":
+        sink.setFormatter(JsonFormatter())
+    else:
+        sink.setFormatter(logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+
+    handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_MAX))
+    handler.addFilter(RateLimit(rate))
+
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+        h.close()
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, lvl in _levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(lvl)
+
+    _listener = logging.handlers.QueueListener(handler.queue, sink, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop)
+    return _listener
+
+
+def stop() -> None:
+    """Vacía la cola y para el hilo escritor."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,279 @@
+# memebot2/utils/loop_monitor.py
+"""
+Salud del event loop: lag, bloqueos y perfilado bajo demanda.
+
+`run_bot` lo arranca al principio de `main_loop` (LOOP_MONITOR=1):
+
+• Latido: un callback cada HEARTBEAT_S con `loop.call_at`; el retraso con
+  que se ejecuta es el lag del loop (histograma
+  `memebot_loop_lag_seconds` si hay métricas, resumen en `summary()`).
+• Vigía (hilo): si el latido no llega en LOOP_STALL_MS, captura la pila
+  del hilo del loop **mientras sigue bloqueado** y la registra como
+  WARNING: ahí aparece la llamada culpable (RPC síncrono, json.loads de
+  un cuerpo enorme…).  Al volver el latido se registra la duración total.
+• Perfilador por muestreo (hilo): cada LOOP_PROFILE_INTERVAL_MS apunta la
+  pila del hilo del loop.  Al pararlo vuelca las pilas plegadas
+  (formato flamegraph.pl / speedscope) en DATA_DIR/profile/ y registra
+  las funciones con más muestras.  Se activa con SIGUSR1 (conmuta) o con
+  LOOP_PROFILE_S=N (los primeros N segundos).
+• Volcado de tareas: SIGUSR2 registra todas las tareas pendientes con su
+  edad y dónde están esperando.
+
+    kill -USR1 <pid>   # empieza a perfilar … otra vez para volcar
+    kill -USR2 <pid>   # tareas pendientes
+
+Todo usa `loop.time()` / `time.perf_counter()`: no lo afecta el reloj
+virtual de `utils.tape`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import Counter as _Counter, deque
+from statistics import median
+from typing import Dict, List, Optional
+
+from ..config import DATA_DIR, LOOP_PROFILE_INTERVAL_MS, LOOP_PROFILE_S, LOOP_STALL_MS
+from . import metrics
+
+log = logging.getLogger("loop")
+
+HEARTBEAT_S = 0.1
+KEEP = 3_000                       # lags recientes para `summary()`
+STACK_LIMIT = 20
+IDLE = "<idle>"                    # muestras con el loop esperando en select()
+
+
+def _where(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+# ───────────────────────── perfilador ──────────────────────────
+class Sampler:
+    """Muestreo de pilas de un hilo desde otro hilo (sin instrumentar)."""
+
+    def __init__(self, thread_id: int, interval_s: float) -> None:
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: _Counter[str] = _Counter()
+        self.samples = 0
+        self.started = time.time()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loop-sampler", daemon=True)
+
+    def start(self) -> "Sampler":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            if frame.f_code.co_name == "select" and "selectors" in frame.f_code.co_filename:
+                self.stacks[IDLE] += 1
+                continue
+            names = []
+            while frame is not None:
+                names.append(_where(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def top(self, n: int = 15) -> List[tuple[str, int, int]]:
+        """[(función, muestras propias, muestras acumuladas)] sin contar IDLE."""
+        own: _Counter[str] = _Counter()
+        total: _Counter[str] = _Counter()
+        for stack, count in self.stacks.items():
+            if stack == IDLE:
+                continue
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return [(name, own[name], total[name]) for name, _ in own.most_common(n)]
+
+    def dump(self, directory) -> str:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"profile-{_dt.datetime.fromtimestamp(self.started):%Y%m%d-%H%M%S}.folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return str(path)
+
+
+# ───────────────────────── monitor ─────────────────────────────
+class LoopMonitor:
+    def __init__(self, stall_s: float = LOOP_STALL_MS / 1000) -> None:
+        self.stall_s = stall_s
+        self.lags: deque[float] = deque(maxlen=KEEP)
+        self.stalls = 0
+        self.worst_stall_s = 0.0
+        self.sampler: Optional[Sampler] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id = 0
+        self._due = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._beat_at = time.perf_counter()
+        self._stalled_since: Optional[float] = None
+        self._stop = threading.Event()
+        self._created: "weakref.WeakKeyDictionary[asyncio.Task, float]" = weakref.WeakKeyDictionary()
+
+    # ── arranque / parada ──
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> "LoopMonitor":
+        self._loop = loop or asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._install_task_factory()
+        self._due = self._loop.time() + HEARTBEAT_S
+        self._handle = self._loop.call_at(self._due, self._beat)
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        for sig, fn in ((getattr(signal, "SIGUSR1", None), self.toggle_profiler),
+                        (getattr(signal, "SIGUSR2", None), self.dump_tasks)):
+            if sig is None:
+                continue
+            try:
+                self._loop.add_signal_handler(sig, fn)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass                    # Windows / hilo no principal
+        if LOOP_PROFILE_S > 0:
+            self.toggle_profiler()
+            self._loop.call_later(LOOP_PROFILE_S, self.toggle_profiler)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self.sampler is not None:
+            self.toggle_profiler()
+
+    # ── latido (en el loop) ──
+    def _beat(self) -> None:
+        now = self._loop.time()
+        lag = max(0.0, now - self._due)
+        self._beat_at = time.perf_counter()
+        self.lags.append(lag)
+        if metrics.ENABLED:
+            metrics.LOOP_LAG.observe("main", lag)
+        if self._stalled_since is not None:
+            self.worst_stall_s = max(self.worst_stall_s, lag)
+            log.warning("event loop desbloqueado tras %.0f ms", lag * 1000)
+            self._stalled_since = None
+        self._due = now + HEARTBEAT_S
+        self._handle = self._loop.call_at(self._due, self._beat)
+
+    # ── vigía (hilo) ──
+    def _watch(self) -> None:
+        while not self._stop.wait(self.stall_s / 2):
+            late = time.perf_counter() - self._beat_at - HEARTBEAT_S
+            if late < self.stall_s or self._stalled_since is not None:
+                continue
+            self._stalled_since = self._beat_at
+            self.stalls += 1
+            metrics.count("loop_stall")
+            frame = sys._current_frames().get(self._thread_id)
+            stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else "?"
+            log.warning("event loop bloqueado > %.0f ms en:\n%s", late * 1000, stack.rstrip())
+
+    # ── perfilador ──
+    def toggle_profiler(self) -> None:
+        """Arranca el muestreo o, si ya estaba en marcha, lo para y vuelca."""
+        if self.sampler is None:
+            self.sampler = Sampler(self._thread_id, LOOP_PROFILE_INTERVAL_MS / 1000).start()
+            log.warning("perfilador activo (cada %s ms); SIGUSR1 para volcar",
+                        LOOP_PROFILE_INTERVAL_MS)
+            return
+        sampler, self.sampler = self.sampler, None
+        sampler.stop()
+        path = sampler.dump(DATA_DIR / "profile")
+        busy = sampler.samples - sampler.stacks[IDLE]
+        lines = [f"{own:>6} {tot:>6}  {name}" for name, own, tot in sampler.top()]
+        log.warning(
+            "perfil: %s muestras (%.0f%% ocupado) → %s\n  propias acumul.  función\n  %s",
+            sampler.samples, 100 * busy / max(sampler.samples, 1), path, "\n  ".join(lines),
+        )
+
+    # ── tareas ──
+    def _install_task_factory(self) -> None:
+        previous = self._loop.get_task_factory()
+        created = self._created
+
+        def factory(loop, coro, **kwargs):
+            task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+            created[task] = loop.time()
+            return task
+
+        self._loop.set_task_factory(factory)
+
+    def tasks(self) -> List[Dict[str, object]]:
+        """Tareas pendientes, de la más antigua a la más reciente."""
+        now = self._loop.time()
+        out = []
+        for task in asyncio.all_tasks(self._loop):
+            born = self._created.get(task)
+            out.append({
+                "name": task.get_name(),
+                "age_s": round(now - born, 1) if born is not None else None,
+                "waiting": _awaiting(task),
+            })
+        out.sort(key=lambda t: -(t["age_s"] if t["age_s"] is not None else float("inf")))
+        return out
+
+    def dump_tasks(self) -> None:
+        tasks = self.tasks()
+        lines = [
+            f"{'?' if t['age_s'] is None else t['age_s']:>9}s  {t['name']:<28} {t['waiting']}"
+            for t in tasks
+        ]
+        log.warning("%s tareas pendientes:\n  %s", len(tasks), "\n  ".join(lines))
+
+    # ── resumen ──
+    def summary(self) -> Dict[str, object]:
+        lags = sorted(self.lags)
+        if not lags:
+            return {"n": 0, "stalls": self.stalls}
+        return {
+            "n": len(lags),
+            "p50_ms": round(median(lags) * 1000, 2),
+            "p99_ms": round(lags[int(0.99 * (len(lags) - 1))] * 1000, 2),
+            "max_ms": round(lags[-1] * 1000, 1),
+            "stalls": self.stalls,
+            "worst_stall_ms": round(self.worst_stall_s * 1000, 1),
+        }
+
+
+def _awaiting(task: asyncio.Task, depth: int = 2) -> str:
+    """Los `depth` awaits más internos de la tarea ('fichero:línea función')."""
+    coro, chain = task.get_coro(), []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        chain.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}")
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None)
+    return " → ".join(chain[-depth:]) or "?"
+
+
+monitor: Optional[LoopMonitor] = None
+
+
+def start() -> LoopMonitor:
+    """Arranca (una vez) el monitor del loop en curso."""
+    global monitor
+    if monitor is None:
+        monitor = LoopMonitor().start()
+    return monitor
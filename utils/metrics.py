@@ -0,0 +1,228 @@
+# memebot2/utils/metrics.py
+"""
+Métricas por etapa del pipeline (histogramas + contadores) y endpoint
+HTTP en formato de texto Prometheus, sin dependencias externas.
+
+Se activa con METRICS_PORT > 0; `run_bot` levanta entonces
+`http://METRICS_HOST:METRICS_PORT/metrics`.  Con el puerto a 0:
+
+• `timed(stage)` devuelve la función tal cual (coste cero), y
+• `stage(name)` devuelve un context manager vacío compartido, y
+• `count(event)` / `observe(stage, s)` retornan sin tocar nada,
+
+así que la instrumentación puede quedarse en el camino caliente.  Con
+TRACE=1 las etapas se miden igualmente para `utils.trace` (listeners).
+
+    @metrics.timed("route")
+    async def _route(...): ...
+
+    with metrics.stage("db_commit"):
+        await session.commit()
+
+    metrics.count("bought")
+
+Series expuestas:
+
+• memebot_stage_seconds{stage}        histograma de duración por etapa.
+• memebot_stage_errors_total{stage}   etapas que terminaron en excepción.
+• memebot_events_total{event}         decisiones (candidato, descartado,
+                                      comprado, vendido…) y bloqueos del loop.
+• memebot_loop_lag_seconds{loop}      lag del event loop (utils.loop_monitor).
+
+Las observaciones pueden llegar desde hilos (`sign` / `send` corren en
+`asyncio.to_thread`), por eso cada serie se actualiza bajo un lock.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from ..config import METRICS_HOST, METRICS_PORT, TRACE_ENABLED
+
+log = logging.getLogger("metrics")
+
+ENABLED: bool = METRICS_PORT > 0
+# las trazas por token (utils.trace) escuchan estas mismas etapas
+_ACTIVE: bool = ENABLED or TRACE_ENABLED
+_listeners: List[Callable[[str, float, bool], None]] = []
+
+# segundos: de 1 ms (decisión local) a 30 s (timeouts HTTP)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+T = TypeVar("T")
+
+
+# ───────────────────────── series ──────────────────────────────
+class Histogram:
+    """Histograma acumulativo con una etiqueta."""
+
+    def __init__(self, name: str, help: str, label: str, buckets=BUCKETS) -> None:
+        self.name, self.help, self.label = name, help, label
+        self.buckets = tuple(buckets)
+        self._series: Dict[str, List[float]] = {}      # [*buckets, +Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for key in sorted(series):
+            s, acc = series[key], 0
+            for le, n in zip((*map(_fmt, self.buckets), "+Inf"), s):
+                acc += n
+                out.append(f'{self.name}_bucket{{{self.label}="{key}",le="{le}"}} {acc}')
+            out.append(f'{self.name}_sum{{{self.label}="{key}"}} {s[-1]:.6f}')
+            out.append(f'{self.name}_count{{{self.label}="{key}"}} {acc}')
+        return out
+
+    def summary(self) -> Dict[str, dict]:
+        """{key: {"n", "avg_ms", "total_s"}} para logs y benchmarks."""
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        out = {}
+        for key, s in sorted(series.items()):
+            n = sum(s[:-1])
+            out[key] = {
+                "n": n,
+                "avg_ms": round(s[-1] / n * 1000, 2) if n else 0.0,
+                "total_s": round(s[-1], 3),
+            }
+        return out
+
+
+class Counter:
+    """Contador monótono con una etiqueta."""
+
+    def __init__(self, name: str, help: str, label: str) -> None:
+        self.name, self.help, self.label = name, help, label
+        self._values: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        out += [f'{self.name}{{{self.label}="{k}"}} {v}' for k, v in sorted(values.items())]
+        return out
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
+
+
+def _fmt(x: float) -> str:
+    return repr(float(x))
+
+
+STAGES = Histogram("memebot_stage_seconds", "Duración de cada etapa del pipeline.", "stage")
+ERRORS = Counter("memebot_stage_errors_total", "Etapas terminadas en excepción.", "stage")
+EVENTS = Counter("memebot_events_total", "Decisiones y eventos del pipeline.", "event")
+LOOP_LAG = Histogram("memebot_loop_lag_seconds", "Retraso del latido del event loop.", "loop")
+REGISTRY = (STAGES, ERRORS, EVENTS, LOOP_LAG)
+
+
+# ───────────────────────── instrumentación ─────────────────────
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self.t0
+        failed = exc_type is not None and issubclass(exc_type, Exception)  # no cancelaciones
+        if ENABLED:
+            STAGES.observe(self.name, elapsed)
+            if failed:
+                ERRORS.inc(self.name)
+        for fn in _listeners:
+            fn(self.name, elapsed, failed)
+
+
+_NOOP = nullcontext()
+
+
+def stage(name: str):
+    """Context manager que mide `name` (vacío si las métricas están apagadas)."""
+    return _Stage(name) if _ACTIVE else _NOOP
+
+
+def timed(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorador para corrutinas; sin métricas devuelve la función original."""
+
+    def deco(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        if not _ACTIVE:
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with _Stage(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return deco
+
+
+def observe(name: str, seconds: float) -> None:
+    """Registra una duración medida fuera de `stage()`."""
+    if ENABLED:
+        STAGES.observe(name, seconds)
+
+
+def count(event: str, n: int = 1) -> None:
+    if ENABLED:
+        EVENTS.inc(event, n)
+
+
+def add_listener(fn: Callable[[str, float, bool], None]) -> None:
+    """`fn(stage, segundos, falló)` al cerrar cada etapa (hilo que la midió)."""
+    _listeners.append(fn)
+
+
+def render() -> str:
+    return "\n".join(line for m in REGISTRY for line in m.render()) + "\n"
+
+
+# ───────────────────────── endpoint HTTP ───────────────────────
+async def start_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[object]:
+    """Sirve GET /metrics; devuelve el `AppRunner` (None si está apagado)."""
+    if not ENABLED:
+        return None
+    from aiohttp import web
+
+    async def _metrics(_request: web.Request) -> web.Response:
+        return web.Response(body=render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log.info("Métricas en http://%s:%s/metrics", host, port)
+    return runner
@@ -0,0 +1,232 @@
+# memebot2/utils/processed_store.py
+"""
+Almacén compacto de direcciones ya procesadas.
+
+Formato en disco (registros de 36 bytes = clave 32 B + u32 epoch):
+
+    procesados.bin    – base **ordenada** por clave, se lee vía mmap
+                        (búsqueda binaria, arranque O(1) sin cargar nada)
+    procesados.delta  – log append-only con lo añadido desde la última
+                        compactación (se carga al arrancar; acotado)
+
+• Clave = pubkey decodificada (base-58 → 32 bytes).  Lo que no sea una
+  pubkey válida se guarda como sha256(address) (también 32 bytes).
+• Escrituras con buffer: se vuelcan cada FLUSH_EVERY registros o
+  FLUSH_SECONDS, y al salir del proceso.
+• Al superar COMPACT_EVERY registros en delta se fusiona con la base
+  (merge ordenado en streaming) y se descartan los caducados por TTL.
+  Dentro de un event loop el merge (~1 s por millón de entradas) corre
+  en un hilo (`asyncio.to_thread`) sobre una foto del delta; al acabar
+  se cambia el mmap bajo lock y el delta se queda con lo añadido
+  mientras tanto.  Sin loop (arranque, atexit) es síncrono.
+• TTL opcional: una entrada más vieja que `ttl_s` cuenta como no vista,
+  así el token puede re-evaluarse.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import logging
+import mmap
+import os
+import pathlib
+import struct
+import threading
+import time
+from typing import Iterator
+
+import base58
+
+log = logging.getLogger("processed_store")
+
+REC = struct.Struct("<32sI")
+FLUSH_EVERY = 256
+FLUSH_SECONDS = 5.0
+COMPACT_EVERY = 50_000
+
+
+def encode_key(address: str) -> bytes:
+    """Dirección → clave de 32 bytes."""
+    try:
+        raw = base58.b58decode(address)
+        if len(raw) == 32:
+            return raw
+    except ValueError:
+        pass
+    return hashlib.sha256(address.encode()).digest()
+
+
+class ProcessedStore:
+    def __init__(self, directory: pathlib.Path, ttl_s: float = 0) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.base_path = directory / "procesados.bin"
+        self.delta_path = directory / "procesados.delta"
+        self.ttl_s = ttl_s
+        self._delta: dict[bytes, int] = {}
+        self._buffer: list[bytes] = []
+        self._last_flush = time.monotonic()
+        self._mm: mmap.mmap | None = None
+        self._n = 0
+        self._lock = threading.Lock()            # merge (hilo) ↔ cambio de mmap
+        self._compacting: asyncio.Task | None = None
+        self._open_base()
+        self._load_delta()
+
+    # ── base mmap ──
+    def _open_base(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._n = 0
+        if not self.base_path.exists() or self.base_path.stat().st_size < REC.size:
+            return
+        with self.base_path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._n = len(self._mm) // REC.size
+
+    def _base_lookup(self, key: bytes) -> int | None:
+        mm = self._mm
+        if mm is None:
+            return None
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off = mid * REC.size
+            k = mm[off : off + 32]
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return REC.unpack_from(mm, off)[1]
+        return None
+
+    def _iter_base(self) -> Iterator[tuple[bytes, int]]:
+        if self._mm is None:
+            return iter(())
+        return (REC.unpack_from(self._mm, i * REC.size) for i in range(self._n))
+
+    # ── delta ──
+    def _load_delta(self) -> None:
+        if not self.delta_path.exists():
+            return
+        data = self.delta_path.read_bytes()
+        usable = len(data) - len(data) % REC.size       # ignora cola truncada
+        for key, ts in REC.iter_unpack(data[:usable]):
+            self._delta[key] = ts
+
+    def _write_buffer(self) -> None:
+        if self._buffer:
+            try:
+                with self.delta_path.open("ab") as f:
+                    f.write(b"".join(self._buffer))
+            except OSError as e:
+                log.warning("[procesados] no se pudo escribir delta: %s", e)
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Vuelca el buffer al log delta (y compacta si toca)."""
+        self._write_buffer()
+        if len(self._delta) < COMPACT_EVERY or self._compacting is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.compact()
+            return
+        self._compacting = loop.create_task(self._compact_async(), name="processed-compact")
+
+    def _merge(self, delta: dict[bytes, int]) -> int:
+        """
+        Escribe base ⋃ `delta` ordenado y sin caducados en el .tmp.
+        No toca el estado en memoria: puede correr en otro hilo.
+        """
+        cutoff = int(time.time() - self.ttl_s) if self.ttl_s else 0
+        tmp = self.base_path.with_suffix(".tmp")
+        n = 0
+        with self._lock, tmp.open("wb", buffering=1 << 20) as out:
+            prev: tuple[bytes, int] | None = None
+            for key, ts in heapq.merge(self._iter_base(), sorted(delta.items())):
+                if prev is not None and key == prev[0]:
+                    prev = (key, max(ts, prev[1]))
+                    continue
+                if prev is not None and prev[1] >= cutoff:
+                    out.write(REC.pack(*prev))
+                    n += 1
+                prev = (key, ts)
+            if prev is not None and prev[1] >= cutoff:
+                out.write(REC.pack(*prev))
+                n += 1
+        return n
+
+    def _swap(self, merged: dict[bytes, int], n: int) -> None:
+        """Instala la base nueva y deja en delta sólo lo posterior a `merged`."""
+        self._write_buffer()
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            os.replace(self.base_path.with_suffix(".tmp"), self.base_path)
+            self._open_base()
+        rest = {k: ts for k, ts in self._delta.items() if merged.get(k) != ts}
+        tmp = self.delta_path.with_suffix(".delta.tmp")
+        tmp.write_bytes(b"".join(REC.pack(k, ts) for k, ts in rest.items()))
+        os.replace(tmp, self.delta_path)
+        self._delta = rest
+        log.info("[procesados] compactado → %s entradas", n)
+
+    def compact(self) -> None:
+        """Fusiona base + delta en una base nueva ordenada, sin caducados."""
+        if self._compacting is not None:
+            return                      # ya hay una en curso en el loop
+        self._write_buffer()
+        merged = dict(self._delta)
+        self._swap(merged, self._merge(merged))
+
+    async def _compact_async(self) -> None:
+        """Como `compact`, con el merge en un hilo (no bloquea el loop)."""
+        try:
+            self._write_buffer()
+            merged = dict(self._delta)
+            n = await asyncio.to_thread(self._merge, merged)
+            self._swap(merged, n)
+        except OSError as e:
+            log.warning("[procesados] no se pudo compactar: %s", e)
+        finally:
+            self._compacting = None
+
+    # ── API ──
+    def __contains__(self, address: str) -> bool:
+        key = encode_key(address)
+        ts = self._delta.get(key)
+        if ts is None:
+            ts = self._base_lookup(key)
+        if ts is None:
+            return False
+        return not self.ttl_s or ts >= time.time() - self.ttl_s
+
+    def add(self, address: str) -> None:
+        key = encode_key(address)
+        ts = int(time.time())
+        self._delta[key] = ts
+        self._buffer.append(REC.pack(key, ts))
+        if (
+            len(self._buffer) >= FLUSH_EVERY
+            or time.monotonic() - self._last_flush >= FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def add_many(self, addresses: Iterator[str]) -> None:
+        for a in addresses:
+            key = encode_key(a)
+            ts = int(time.time())
+            self._delta[key] = ts
+            self._buffer.append(REC.pack(key, ts))
+        self.flush()
+
+    def __len__(self) -> int:
+        """Aproximado: base + delta (puede contar duplicados no compactados)."""
+        return self._n + len(self._delta)
@@ -0,0 +1,137 @@
+# memebot2/utils/rechazados.py
+"""
+Caché negativa de tokens descartados + re-evaluación con back-off.
+
+Un token que falla por algo que puede cambiar (liquidez, volumen, holders,
+score…) vuelve a la cola de pendientes tras REJECT_BACKOFF_S[n] segundos
+(por defecto 2 min → 10 min → 1 h).  Agotados los intentos, o si el fallo
+es **duro** (p.ej. antigüedad), queda descartado para siempre (sigue en
+la caché de procesados de `lista_pares`).
+
+Uso:
+
+    rechazados.registrar(addr, "liquidity")        # blando → se reprograma
+    rechazados.registrar(addr, "age_days", hard=True)
+    for addr in rechazados.vencidos(): lista_pares.reencolar(addr)
+    rechazados.sin_evaluar(addr)    # lista_pares lo soltó sin evaluarlo
+
+Estado en memoria (dict + heap de vencimientos) con volcado a
+DATA_DIR/rechazados.json para sobrevivir a reinicios.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import time
+from typing import Optional
+
+from ..config import DATA_DIR, REJECT_BACKOFF_S
+
+log = logging.getLogger("rechazados")
+
+STORE_FILE = DATA_DIR / "rechazados.json"
+SAVE_EVERY = 50                  # registros entre volcados
+
+_entries: dict[str, dict] = {}   # address → {reason, at, attempts, due}
+_due: list[tuple[float, str]] = []
+_dirty = 0
+stats = {"soft": 0, "hard": 0, "exhausted": 0, "requeued": 0}
+
+
+# ───────────────────────── persistencia ────────────────────────
+def _load() -> None:
+    try:
+        data = json.loads(STORE_FILE.read_text())
+    except (OSError, ValueError):
+        return
+    for addr, e in data.items():
+        if e["due"] == float("inf"):       # estaba en vuelo al parar → ya
+            e["due"] = 0.0
+        _entries[addr] = e
+        heapq.heappush(_due, (e["due"], addr))
+
+
+def save() -> None:
+    global _dirty
+    try:
+        STORE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = STORE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_entries))
+        tmp.replace(STORE_FILE)
+        _dirty = 0
+    except OSError as e:
+        log.warning("[rechazados] no se pudo guardar: %s", e)
+
+
+_load()
+
+
+# ───────────────────────── API pública ─────────────────────────
+def registrar(address: str, reason: str, hard: bool = False) -> Optional[float]:
+    """
+    Anota el descarte.  Devuelve el epoch de la próxima re-evaluación
+    o None si el token queda descartado definitivamente.
+    """
+    global _dirty
+    now = time.time()
+    prev = _entries.pop(address, None)
+    attempts = prev["attempts"] + 1 if prev else 0
+
+    if hard:
+        stats["hard"] += 1
+        due = None
+    elif attempts >= len(REJECT_BACKOFF_S):
+        stats["exhausted"] += 1
+        due = None
+    else:
+        stats["soft"] += 1
+        due = now + REJECT_BACKOFF_S[attempts]
+        _entries[address] = {"reason": reason, "at": now, "attempts": attempts, "due": due}
+        heapq.heappush(_due, (due, address))
+
+    _dirty += 1
+    if _dirty >= SAVE_EVERY:
+        save()
+    return due
+
+
+def vencidos(now: Optional[float] = None) -> list[str]:
+    """Saca los tokens cuyo back-off ya venció (listos para re-evaluar)."""
+    now = time.time() if now is None else now
+    out = []
+    while _due and _due[0][0] <= now:
+        due, addr = heapq.heappop(_due)
+        e = _entries.get(addr)
+        if e is None or e["due"] != due:
+            continue                       # entrada obsoleta
+        e["due"] = float("inf")            # en vuelo hasta nuevo registrar/olvidar
+        out.append(addr)
+    stats["requeued"] += len(out)
+    return out
+
+
+def sin_evaluar(address: str) -> Optional[float]:
+    """
+    Un token re-encolado salió de la cola sin evaluarse (shedding o
+    caducidad en `lista_pares`).  Cuenta como un intento más con el mismo
+    motivo: se reprograma con el siguiente back-off o, agotados los
+    intentos, se olvida.  No-op si el token no estaba en vuelo.
+    """
+    e = _entries.get(address)
+    if e is None or e["due"] != float("inf"):
+        return None
+    return registrar(address, e["reason"])
+
+
+def olvidar(address: str) -> None:
+    """El token pasó: deja de estar en la caché negativa."""
+    if _entries.pop(address, None) is not None:
+        global _dirty
+        _dirty += 1
+
+
+def motivo(address: str) -> Optional[dict]:
+    """Último descarte registrado (reason, at, attempts, due) o None."""
+    return _entries.get(address)
@@ -0,0 +1,400 @@
+# memebot2/utils/tape.py
+"""
+Grabación y reproducción de sesiones HTTP ("cinta").
+
+Grabar (en vivo, TAPE_RECORD=1 en run_bot):
+
+    rec = tape.record("data/tape/20240501.jsonl.gz")
+
+intercepta `aiohttp.ClientSession._request`: cada petición saliente de
+los fetchers y de `trader/gmgn` (método, URL, cuerpo) y su respuesta
+(status, content-type, cuerpo) o su error de red se añaden como una línea
+JSON a un gzip **sólo-añadir** con la hora de pared.  Los parámetros de
+query con credenciales (api-key, token…) se enmascaran antes de escribir.
+
+Reproducir (offline, `python -m memebot2.bench.replay`):
+
+    rp = await tape.replay(path, speed=300)
+    …                     # run_bot.main_loop() sin red
+    await rp.close()
+
+• `StandIn`: servidor aiohttp local que responde desde la cinta.  Para
+  cada petición sirve la última respuesta grabada para esa misma petición
+  con hora ≤ reloj virtual (o la primera, si aún no hay ninguna).  Una
+  petición que no se hizo en la sesión grabada recibe 404; un error de
+  red grabado se reproduce como `ClientConnectionError`.
+• `VirtualClock`: arranca en la hora de la primera grabación y avanza
+  `speed`× más rápido.  `install_clock` sustituye `time`, `asyncio.sleep`
+  y `datetime.utcnow/now` **sólo en los módulos de memebot2** (y las
+  esperas de sus `@tenacity.retry`); asyncio y aiohttp siguen en tiempo
+  real.
+
+Los websockets (stream de precios, Pump Fun) no se graban: en reproducción
+`ws_connect` falla y el runner fuerza feed por polling y stream apagado.
+La firma/envío de transacciones (`sol_signer`, RPC síncrono) tampoco pasa
+por aquí: en reproducción `sign_and_send` no envía nada.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import base64
+import datetime as _datetime
+import gzip
+import json
+import logging
+import pathlib
+import sys
+import time as _time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+import aiohttp
+from yarl import URL
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+log = logging.getLogger("tape")
+
+FLUSH_S = 1.0                       # volcado a disco (gzip sync) como mucho cada …
+SECRET_PARAMS = frozenset({"api-key", "api_key", "apikey", "key", "token", "access_token"})
+PACKAGE = __name__.split(".")[0]    # "memebot2"
+
+_real_request = aiohttp.ClientSession._request
+_real_ws_connect = aiohttp.ClientSession._ws_connect
+_real_sleep = asyncio.sleep
+_real_monotonic = _time.monotonic
+
+
+# ───────────────────────── petición → clave ────────────────────
+def _redact(url: URL) -> URL:
+    if not url.query or not SECRET_PARAMS & {k.lower() for k in url.query}:
+        return url
+    return url.with_query([
+        (k, "***" if k.lower() in SECRET_PARAMS else v) for k, v in url.query.items()
+    ])
+
+
+def request_key(method: str, url: Any, params: Any = None, json_body: Any = None, data: Any = None) -> str:
+    """'METHOD url[?query] [cuerpo]' — igual al grabar y al reproducir."""
+    u = URL(str(url))
+    if params:
+        u = u.update_query(params)
+    key = f"{method.upper()} {_redact(u)}"
+    if json_body is not None:
+        key += " " + json.dumps(json_body, sort_keys=True, separators=(",", ":"))
+    elif isinstance(data, (str, bytes)):
+        key += " " + (data.decode(errors="replace") if isinstance(data, bytes) else data)
+    return key
+
+
+# ───────────────────────── grabación ───────────────────────────
+class Recorder:
+    """Escritor gzip sólo-añadir (cada arranque abre un miembro gzip nuevo)."""
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = gzip.open(self.path, "at", encoding="utf-8")
+        self._flushed = _real_monotonic()
+        self.count = 0
+
+    def write(self, rec: dict) -> None:
+        self._f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        self.count += 1
+        now = _real_monotonic()
+        if now - self._flushed >= FLUSH_S:
+            self._f.flush()
+            self._flushed = now
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+
+def _body_fields(body: bytes) -> dict:
+    try:
+        return {"b": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b": base64.b64encode(body).decode(), "b64": True}
+
+
+def record(path: str | pathlib.Path) -> Recorder:
+    """Empieza a grabar todas las peticiones aiohttp del proceso en `path`."""
+    rec = Recorder(path)
+    atexit.register(rec.close)
+
+    async def _request(self, method, str_or_url, **kwargs):
+        key = request_key(method, str_or_url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        t = _time.time()
+        try:
+            resp = await _real_request(self, method, str_or_url, **kwargs)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            rec.write({"t": t, "k": key, "e": f"{type(e).__name__}: {e}"})
+            raise
+        body = await resp.read()          # queda en caché para el llamador
+        rec.write({
+            "t": t, "k": key, "s": resp.status,
+            "ct": resp.content_type, **_body_fields(body),
+        })
+        return resp
+
+    aiohttp.ClientSession._request = _request
+    log.info("[tape] grabando peticiones HTTP en %s", rec.path)
+    return rec
+
+
+def stop() -> None:
+    """Deja de interceptar (grabación o reproducción)."""
+    aiohttp.ClientSession._request = _real_request
+    aiohttp.ClientSession._ws_connect = _real_ws_connect
+
+
+# ───────────────────────── cinta en memoria ────────────────────
+class Entry(NamedTuple):
+    t: float
+    status: int
+    content_type: str
+    body: bytes
+    error: Optional[str]
+
+
+class Tape:
+    def __init__(self, entries: dict[str, list[Entry]]) -> None:
+        self._entries = entries
+        self._cursor: dict[str, int] = defaultdict(int)
+        times = [e.t for es in entries.values() for e in (es[0], es[-1])]
+        self.start = min(times, default=0.0)
+        self.end = max(times, default=0.0)
+        self.stats = {"served": 0, "errors": 0, "miss": 0}
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> "Tape":
+        entries: dict[str, list[Entry]] = defaultdict(list)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    try:
+                        r = json.loads(line)
+                    except ValueError:        # línea a medias
+                        continue
+                    body = r.get("b", "")
+                    entries[r["k"]].append(Entry(
+                        r["t"], r.get("s", 0), r.get("ct", "application/json"),
+                        base64.b64decode(body) if r.get("b64") else body.encode(),
+                        r.get("e"),
+                    ))
+            except (EOFError, gzip.BadGzipFile):
+                # proceso cortado sin cerrar el gzip: vale lo ya volcado
+                log.warning("[tape] %s truncada; se usa lo leído", path)
+        for es in entries.values():
+            es.sort(key=lambda e: e.t)
+        return cls(dict(entries))
+
+    def __len__(self) -> int:
+        return sum(len(es) for es in self._entries.values())
+
+    def lookup(self, key: str, now: float) -> Optional[Entry]:
+        """Respuesta vigente a la hora `now` (la cinta sólo avanza)."""
+        es = self._entries.get(key)
+        if not es:
+            self.stats["miss"] += 1
+            return None
+        i = self._cursor[key]
+        while i + 1 < len(es) and es[i + 1].t <= now:
+            i += 1
+        self._cursor[key] = i
+        self.stats["errors" if es[i].error else "served"] += 1
+        return es[i]
+
+
+# ───────────────────────── reloj virtual ───────────────────────
+class VirtualClock:
+    def __init__(self, start: float, speed: float = 1.0) -> None:
+        self.start = start
+        self.speed = speed
+        self._t0 = _real_monotonic()
+
+    def elapsed(self) -> float:
+        """Segundos virtuales desde el arranque."""
+        return (_real_monotonic() - self._t0) * self.speed
+
+    def time(self) -> float:
+        return self.start + self.elapsed()
+
+    def monotonic(self) -> float:
+        return self._t0 + self.elapsed()
+
+    async def sleep(self, delay: float, result: Any = None) -> Any:
+        return await _real_sleep(max(0.0, delay) / self.speed, result)
+
+
+class _Proxy:
+    """Módulo sustituto: los atributos dados y el resto del original."""
+
+    def __init__(self, target: Any, **overrides: Any) -> None:
+        self._target = target
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
+
+
+def _datetime_proxy(clock: VirtualClock) -> _Proxy:
+    class datetime(_datetime.datetime):
+        @classmethod
+        def utcnow(cls) -> _datetime.datetime:
+            return _datetime.datetime.utcfromtimestamp(clock.time())
+
+        @classmethod
+        def now(cls, tz: Optional[_datetime.tzinfo] = None) -> _datetime.datetime:
+            return _datetime.datetime.fromtimestamp(clock.time(), tz)
+
+    return _Proxy(_datetime, datetime=datetime)
+
+
+def install_clock(clock: VirtualClock) -> list[tuple[dict, str, Any]]:
+    """
+    Sustituye `time`, `asyncio` y `datetime` en los módulos de memebot2 ya
+    importados, y la espera de sus reintentos `@tenacity.retry`.  Devuelve
+    lo necesario para `uninstall_clock`.
+    """
+    from tenacity.asyncio import AsyncRetrying
+
+    proxies = {
+        id(_time): _Proxy(_time, time=clock.time, monotonic=clock.monotonic),
+        id(asyncio): _Proxy(asyncio, sleep=clock.sleep),
+        id(_datetime): _datetime_proxy(clock),
+    }
+    patched = []
+    for name, mod in list(sys.modules.items()):
+        if (
+            mod is None
+            or not name.startswith(PACKAGE + ".")
+            or name == __name__
+            or name.startswith(PACKAGE + ".bench")     # los runners miden tiempo real
+        ):
+            continue
+        g = vars(mod)
+        for attr, value in list(g.items()):
+            proxy = proxies.get(id(value))
+            if proxy is not None:
+                patched.append((g, attr, value))
+                g[attr] = proxy
+            retrying = getattr(value, "retry", None)
+            if isinstance(retrying, AsyncRetrying):
+                patched.append((vars(retrying), "sleep", retrying.sleep))
+                retrying.sleep = clock.sleep
+    return patched
+
+
+def uninstall_clock(patched: list[tuple[dict, str, Any]]) -> None:
+    for g, attr, value in patched:
+        g[attr] = value
+
+
+# ───────────────────────── reproducción ────────────────────────
+class StandIn:
+    """Servidor local que contesta desde la cinta según el reloj virtual."""
+
+    def __init__(self, tape: Tape, clock: VirtualClock) -> None:
+        self.tape = tape
+        self.clock = clock
+        self.base = ""
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _serve(self, request: web.Request) -> web.Response:
+        from aiohttp import web
+
+        key = (await request.read()).decode()
+        entry = self.tape.lookup(key, self.clock.time())
+        if entry is None:
+            return web.Response(status=404, text="{}", content_type="application/json")
+        if entry.error:
+            return web.Response(status=599, headers={"X-Tape": entry.error})
+        return web.Response(status=entry.status, body=entry.body, content_type=entry.content_type)
+
+    async def start(self) -> str:
+        from aiohttp import web      # sólo al reproducir
+
+        app = web.Application(client_max_size=0)
+        app.router.add_post("/", self._serve)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]     # type: ignore[union-attr]
+        self.base = f"http://127.0.0.1:{port}/"
+        return self.base
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class Replay:
+    def __init__(self, tape: Tape, clock: VirtualClock, stand_in: StandIn) -> None:
+        self.tape = tape
+        self.clock = clock
+        self.stand_in = stand_in
+        self._patched: list = []
+        self._send = None
+
+    @property
+    def done(self) -> bool:
+        return self.clock.time() > self.tape.end
+
+    def install(self) -> None:
+        """Redirige aiohttp al stand-in y pone el reloj virtual."""
+        base = self.stand_in.base
+
+        async def _request(session, method, str_or_url, **kwargs):
+            key = request_key(method, str_or_url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+            resp = await _real_request(session, "POST", base, data=key.encode())
+            if resp.status == 599:
+                why = resp.headers.get("X-Tape", "?")
+                resp.release()
+                raise aiohttp.ClientConnectionError(f"tape: {why} ({key[:80]})")
+            if kwargs.get("raise_for_status"):
+                resp.raise_for_status()
+            return resp
+
+        async def _ws_connect(session, url, **kwargs):
+            raise aiohttp.ClientConnectionError("tape: los websockets no se graban")
+
+        aiohttp.ClientSession._request = _request
+        aiohttp.ClientSession._ws_connect = _ws_connect
+
+        from ..trader import sol_signer
+        self._send = sol_signer.sign_and_send
+        sol_signer.sign_and_send = lambda tx: "REPLAY"     # nunca firmar/enviar
+
+        self._patched = install_clock(self.clock)
+
+    async def close(self) -> None:
+        uninstall_clock(self._patched)
+        stop()
+        if self._send is not None:
+            from ..trader import sol_signer
+            sol_signer.sign_and_send = self._send
+        await self.stand_in.stop()
+
+
+async def replay(path: str | pathlib.Path, speed: float = 1.0) -> Replay:
+    """
+    Carga la cinta, arranca el stand-in y lo instala.  Importar antes los
+    módulos que se van a ejecutar: el reloj sólo se pone en los cargados.
+    """
+    tape = Tape.load(path)
+    clock = VirtualClock(tape.start, speed)
+    stand_in = StandIn(tape, clock)
+    await stand_in.start()
+    rp = Replay(tape, clock, stand_in)
+    rp.install()
+    log.info(
+        "[tape] reproduciendo %s (%s respuestas, %.0f s virtuales a %s×)",
+        path, len(tape), tape.end - tape.start, speed,
+    )
+    return rp
@@ -0,0 +1,370 @@
+# memebot2/utils/trace.py
+"""
+Trazas por token: del primer avistamiento a la firma de compra (y de la
+señal de salida a la de venta), en JSON lines.
+
+Con TRACE=1 `run_bot` llama a `trace.start(path)` y cada línea es un hito
+o un tramo de un token:
+
+    {"t": 1717000000.12, "id": "<mint>", "ph": "buy", "ev": "route", "ms": 41.3}
+
+• Hitos (`event`): first_seen (source, launched), enqueued, dequeued,
+  fetched, decision (score, go), stored, confirmed (status) y, en la
+  venta, exit_signal (pnl, tick).
+• Tramos: las etapas de `utils.metrics` (enrich_*, scoring, route, sign,
+  send, db_commit…) que se cierran dentro de `bind(mint, fase)` se
+  escriben con su duración, sin instrumentación extra.  El contexto viaja
+  por `contextvars`, así que también cubre `asyncio.to_thread`.
+• `confirm(mint, fase, firma)` sondea getSignatureStatuses en segundo
+  plano y escribe `confirmed` cuando la red la confirma.
+
+Sin TRACE, `bind` devuelve un context manager vacío y `event` retorna al
+instante.
+
+Análisis (desglose de latencias por salto, tramos y operaciones lentas):
+
+    python -m memebot2.utils.trace data/trace/20240501.jsonl [--phase buy] [--top 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import atexit
+import contextvars
+import json
+import logging
+import pathlib
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from statistics import median
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import metrics
+
+log = logging.getLogger("trace")
+
+FLUSH_S = 1.0                   # volcado a disco como mucho cada …
+CONFIRM_POLL_S = 0.5            # getSignatureStatuses: intervalo …
+CONFIRM_TIMEOUT_S = 90.0        # … y abandono (blockhash caducado)
+
+_current: contextvars.ContextVar[Optional[Tuple[str, str]]] = contextvars.ContextVar(
+    "trace", default=None
+)
+_NOOP = nullcontext()
+
+
+# ───────────────────────── escritura ───────────────────────────
+class Writer:
+    """JSONL sólo-añadir; admite escrituras desde hilos (sign/send)."""
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._flushed = time.monotonic()
+        self.count = 0
+
+    def write(self, rec: dict) -> None:
+        line = json.dumps(rec, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.write(line)
+            self.count += 1
+            now = time.monotonic()
+            if now - self._flushed >= FLUSH_S:
+                self._f.flush()
+                self._flushed = now
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
+
+
+_writer: Optional[Writer] = None
+_pending: set[asyncio.Task] = set()
+
+
+def _on_stage(name: str, seconds: float, failed: bool) -> None:
+    ctx = _current.get()
+    if ctx is None or _writer is None:
+        return
+    rec = {"t": round(time.time() - seconds, 4), "id": ctx[0], "ph": ctx[1],
+           "ev": name, "ms": round(seconds * 1000, 2)}
+    if failed:
+        rec["err"] = True
+    _writer.write(rec)
+
+
+def start(path: str | pathlib.Path) -> Writer:
+    """
+    Empieza a escribir trazas en `path`.  Los tramos necesitan TRACE=1 al
+    importar (decide si `metrics` mide las etapas con las métricas apagadas).
+    """
+    global _writer
+    if _writer is None:
+        _writer = Writer(path)
+        atexit.register(_writer.close)
+        metrics.add_listener(_on_stage)
+        log.info("Trazas en %s", _writer.path)
+    return _writer
+
+
+def active() -> bool:
+    return _writer is not None
+
+
+async def close(timeout: float = 2.0) -> None:
+    """Espera (como mucho `timeout`) las confirmaciones en curso y cierra."""
+    if _pending:
+        _, late = await asyncio.wait(set(_pending), timeout=timeout)
+        for task in late:
+            task.cancel()
+        await asyncio.gather(*late, return_exceptions=True)
+    if _writer is not None:
+        _writer.close()
+
+
+# ───────────────────────── API de instrumentación ──────────────
+def event(address: str, name: str, phase: str = "buy", **attrs) -> None:
+    """Hito puntual de `address` (no-op sin trazas)."""
+    if _writer is None:
+        return
+    _writer.write({"t": round(time.time(), 4), "id": address, "ph": phase, "ev": name, **attrs})
+
+
+@contextmanager
+def _bound(address: str, phase: str) -> Iterator[None]:
+    token = _current.set((address, phase))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def bind(address: str, phase: str = "buy"):
+    """Las etapas de `metrics` cerradas dentro se atribuyen a `address`."""
+    return _bound(address, phase) if _writer is not None else _NOOP
+
+
+def confirm(address: str, phase: str, signature: Optional[str]) -> None:
+    """Sondea la confirmación de `signature` en segundo plano."""
+    if _writer is None or not signature or signature == "SIMULATION":
+        return
+    task = asyncio.get_running_loop().create_task(
+        _confirm(address, phase, signature), name=f"trace-confirm-{signature[:6]}"
+    )
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _confirm(address: str, phase: str, signature: str) -> None:
+    from solders.signature import Signature
+
+    from ..trader import sol_signer
+
+    sig = Signature.from_string(signature)
+    sent = time.monotonic()
+    while time.monotonic() - sent < CONFIRM_TIMEOUT_S:
+        try:
+            resp = await asyncio.to_thread(sol_signer.rpc_client().get_signature_statuses, [sig])
+            status = resp.value[0]
+        except Exception as e:
+            log.debug("estado %s: %s", signature[:6], e)
+            status = None
+        if status is not None and (status.err is not None or status.confirmation_status is not None):
+            event(address, "confirmed", phase,
+                  status="error" if status.err is not None else str(status.confirmation_status).split(".")[-1].lower())
+            return
+        await asyncio.sleep(CONFIRM_POLL_S)
+    event(address, "confirmed", phase, status="timeout")
+
+
+# ╭──────────────────────────────────────────────────────────────╮
+# │                          ANÁLISIS                           │
+# ╰──────────────────────────────────────────────────────────────╯
+# Hitos en orden; cada salto se mide desde el hito previo presente en la
+# operación (Pump Fun no pasa por la cola).  `launch` y `tick` salen de
+# atributos (lanzamiento del par, recepción del tick de precio).
+CHAINS = {
+    "buy": ("launch", "first_seen", "enqueued", "dequeued", "fetched", "decision",
+            "route", "sign", "send", "stored", "confirmed"),
+    "sell": ("tick", "exit_signal", "route", "sign", "send", "stored", "confirmed"),
+}
+AFTER_SEND = ("stored", "confirmed")         # se miden desde `send`
+TOTALS = {"buy": ("first_seen", "send"), "sell": ("tick", "send")}
+
+
+def load(paths: Iterable[str]) -> List[dict]:
+    out = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue                 # línea cortada (proceso muerto)
+    out.sort(key=lambda r: r["t"])
+    return out
+
+
+def _end(rec: dict) -> float:
+    return rec["t"] + rec.get("ms", 0) / 1000
+
+
+def operations(records: List[dict], phase: str) -> List[dict]:
+    """
+    Una operación por `send` de la fase: {id, hitos {nombre: fin}, tramos}.
+
+    Hitos previos al envío: la última aparición anterior (re-evaluaciones),
+    salvo first_seen (la primera).  Posteriores: la primera tras el envío.
+    """
+    by_id: Dict[str, List[dict]] = defaultdict(list)
+    for r in records:
+        if r.get("ph") == phase:
+            by_id[r["id"]].append(r)
+
+    ops = []
+    for tid, recs in by_id.items():
+        sends = [r for r in recs if r["ev"] == "send"]
+        prev_send = 0.0
+        for send in sends:
+            t_send = _end(send)
+            marks: Dict[str, float] = {}
+            spans: Dict[str, float] = defaultdict(float)
+            for r in recs:
+                end, ev = _end(r), r["ev"]
+                if ev == "first_seen":
+                    marks.setdefault(ev, end)
+                    if r.get("launched"):
+                        marks.setdefault("launch", r["launched"])
+                elif ev in AFTER_SEND:
+                    if end >= t_send and ev not in marks:
+                        marks[ev] = end
+                elif prev_send < end <= t_send:
+                    marks[ev] = end
+                    if ev == "exit_signal" and r.get("tick"):
+                        marks["tick"] = r["tick"]
+                    if "ms" in r:
+                        spans[ev] += r["ms"]
+            prev_send = t_send
+            ops.append({"id": tid, "marks": marks, "spans": dict(spans)})
+    return ops
+
+
+def _hops(marks: Dict[str, float], chain: Tuple[str, ...]) -> Dict[str, float]:
+    hops, prev = {}, None
+    for name in chain:
+        if name not in marks:
+            continue
+        anchor = "send" if name in AFTER_SEND and "send" in marks else prev
+        if anchor is not None:
+            hops[f"{anchor}→{name}"] = (marks[name] - marks[anchor]) * 1000
+        if name not in AFTER_SEND:
+            prev = name
+    return hops
+
+
+def _in_total(hop: str, phase: str) -> bool:
+    """¿El salto cae dentro de TOTALS[phase]?"""
+    chain, (first, last) = CHAINS[phase], TOTALS[phase]
+    a, b = hop.split("→")
+    return chain.index(first) <= chain.index(a) and chain.index(b) <= chain.index(last)
+
+
+def _stats(values: List[float]) -> dict:
+    v = sorted(values)
+    return {
+        "n": len(v),
+        "p50": round(median(v), 1),
+        "p90": round(v[int(0.9 * (len(v) - 1))], 1),
+        "max": round(v[-1], 1),
+    }
+
+
+def breakdown(records: List[dict], phase: str, top: int = 5) -> dict:
+    """Desglose por salto y por tramo + las `top` operaciones más lentas."""
+    chain = CHAINS[phase]
+    ops = operations(records, phase)
+    hops: Dict[str, List[float]] = defaultdict(list)
+    spans: Dict[str, List[float]] = defaultdict(list)
+    totals = []
+    first, last = TOTALS[phase]
+    for op in ops:
+        h = _hops(op["marks"], chain)
+        op["hops"] = h
+        for k, v in h.items():
+            hops[k].append(v)
+        for k, v in op["spans"].items():
+            spans[k].append(v)
+        m = op["marks"]
+        if first in m and last in m:
+            op["total_ms"] = (m[last] - m[first]) * 1000
+            totals.append(op["total_ms"])
+
+    order = {f"{a}→{b}": i for i, b in enumerate(chain) for a in chain}
+    slow = sorted((o for o in ops if "total_ms" in o), key=lambda o: o["total_ms"], reverse=True)
+    return {
+        "phase": phase,
+        "operations": len(ops),
+        "total_ms": _stats(totals) if totals else {"n": 0},
+        "hops_ms": {k: _stats(v) for k, v in sorted(hops.items(), key=lambda kv: order.get(kv[0], 99))},
+        "spans_ms": {k: _stats(v) for k, v in sorted(spans.items())},
+        "slowest": [
+            {
+                "id": o["id"],
+                "total_ms": round(o["total_ms"], 1),
+                "worst_hop": max(
+                    ((k, v) for k, v in o["hops"].items() if _in_total(k, phase)),
+                    key=lambda kv: kv[1], default=(None, 0),
+                )[0],
+            }
+            for o in slow[:top]
+        ],
+    }
+
+
+def _print(report: dict) -> None:
+    print(f"── {report['phase']}: {report['operations']} operaciones  "
+          f"(total {TOTALS[report['phase']][0]}→{TOTALS[report['phase']][1]}: {report['total_ms']})")
+    if not report["operations"]:
+        return
+    p50_total = report["total_ms"].get("p50") or 0
+    print(f"  {'salto':<24}{'n':>5}{'p50':>10}{'p90':>10}{'max':>10}{'%p50':>7}")
+    for name, s in report["hops_ms"].items():
+        share = f"{s['p50'] / p50_total:.0%}" if p50_total and _in_total(name, report["phase"]) else ""
+        print(f"  {name:<24}{s['n']:>5}{s['p50']:>10}{s['p90']:>10}{s['max']:>10}{share:>7}")
+    print(f"  {'tramo':<24}{'n':>5}{'p50':>10}{'p90':>10}{'max':>10}")
+    for name, s in report["spans_ms"].items():
+        print(f"  {name:<24}{s['n']:>5}{s['p50']:>10}{s['p90']:>10}{s['max']:>10}")
+    if report["slowest"]:
+        print("  más lentas:")
+        for o in report["slowest"]:
+            print(f"    {o['id'][:12]:<14}{o['total_ms']:>10} ms   peor salto: {o['worst_hop']}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Desglose de latencias de las trazas TRACE=1")
+    ap.add_argument("files", nargs="+", help="ficheros .jsonl de trazas")
+    ap.add_argument("--phase", choices=("buy", "sell", "all"), default="all")
+    ap.add_argument("--top", type=int, default=5, help="operaciones más lentas a listar")
+    ap.add_argument("--json", action="store_true", help="salida JSON en vez de tabla")
+    args = ap.parse_args()
+
+    records = load(args.files)
+    phases = ("buy", "sell") if args.phase == "all" else (args.phase,)
+    reports = [breakdown(records, ph, args.top) for ph in phases]
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+    else:
+        for r in reports:
+            _print(r)
+
+
+if __name__ == "__main__":
+    main()